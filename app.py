@@ -14,8 +14,9 @@ import json
 from datetime import datetime
 import sys
 
-# Add utils to path
+# Add utils and src to path (src is needed to unpickle the outlier detector)
 sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent / 'src'))
 from utils.feature_processor import FeatureProcessor, SHAPExplainer
 
 app = Flask(__name__)
@@ -26,19 +27,21 @@ model = None
 feature_processor = None
 shap_explainer = None
 model_metadata = None
+outlier_detector = None
 
 # Paths
 MODELS_DIR = Path(__file__).parent / 'models'
 MODEL_PATH = MODELS_DIR / 'xgboost_best.pkl'
 FEATURE_NAMES_PATH = MODELS_DIR / 'feature_names.pkl'
 METADATA_PATH = MODELS_DIR / 'model_metadata.json'
+OUTLIER_DETECTOR_PATH = MODELS_DIR / 'outlier_detector.pkl'
 
 
 def load_model_and_explainer():
     """
     Load model, feature names, and initialize SHAP explainer at startup
     """
-    global model, feature_processor, shap_explainer, model_metadata
+    global model, feature_processor, shap_explainer, model_metadata, outlier_detector
     
     print("=" * 70)
     print("LOADING MODEL AND INITIALIZING SHAP EXPLAINER")
@@ -61,6 +64,11 @@ def load_model_and_explainer():
                 model_metadata = json.load(f)
             print(f"✓ Model metadata loaded (version: {model_metadata.get('version', 'unknown')})")
         
+        # Load per-machine outlier baselines fitted during data cleaning
+        if OUTLIER_DETECTOR_PATH.exists():
+            outlier_detector = joblib.load(OUTLIER_DETECTOR_PATH)
+            print(f"✓ Outlier detector loaded ({outlier_detector.n_machines} machine baselines)")
+        
         # Initialize feature processor
         feature_processor = FeatureProcessor(feature_names)
         print("✓ Feature processor initialized")
@@ -159,6 +167,12 @@ def predict():
                 "error": f"Invalid input: {error_msg}"
             }), 400
         
+        # Score readings against this machine's baseline
+        sensor_anomalies = (
+            outlier_detector.update(sensor_data['machine_id'], sensor_data)
+            if outlier_detector is not None else {}
+        )
+        
         # Process features
         features_df = feature_processor.process_single_request(sensor_data)
         
@@ -200,6 +214,7 @@ def predict():
             "risk_level": "high" if failure_probability > 0.7 else "moderate" if failure_probability > 0.4 else "low",
             "top_features": top_features,
             "explanation": explanation,
+            "sensor_anomalies": sensor_anomalies,
             "timestamp": datetime.now().isoformat(),
             "latency_ms": round(latency_ms, 2),
             "machine_id": sensor_data.get('machine_id', 'unknown')
@@ -23,6 +23,11 @@ from sklearn.metrics import (
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
+
+sys.path.append('src')
+from stage_cache import get_stage_cache
+from storage import read_dataset
 
 
 def load_modeling_data(filepath='data/processed/model_ready_data.csv'):
@@ -31,8 +36,7 @@ def load_modeling_data(filepath='data/processed/model_ready_data.csv'):
     print("LOADING MODELING DATA")
     print("=" * 70)
     
-    df = pd.read_csv(filepath)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df = read_dataset(filepath)
     
     print(f"\n✓ Loaded {len(df):,} records")
     print(f"✓ Total features: {len(df.columns)}")
@@ -96,6 +100,15 @@ def temporal_train_test_split(X, y, timestamps, train_ratio=0.7):
     return X_train, X_test, y_train, y_test
 
 
+def load_and_split_data(filepath='data/processed/model_ready_data.csv'):
+    """Load, prepare and temporally split the modeling data in one cacheable stage"""
+    df = load_modeling_data(filepath)
+    X, y, feature_cols, timestamps = prepare_features(df)
+    X_train, X_test, y_train, y_test = temporal_train_test_split(X, y, timestamps)
+    
+    return X_train, X_test, y_train, y_test, feature_cols
+
+
 def analyze_correlations(X_train, y_train, feature_cols):
     """
     Analyze and visualize feature correlations
@@ -291,14 +304,16 @@ def main():
     print("FactoryGuard AI - Week 2")
     print("=" * 70 + "\n")
     
-    # Load data
-    df = load_modeling_data()
-    
-    # Prepare features
-    X, y, feature_cols, timestamps = prepare_features(df)
-    
-    # Temporal split
-    X_train, X_test, y_train, y_test = temporal_train_test_split(X, y, timestamps)
+    # Load data, prepare features and split temporally (cached on the CSV content)
+    filepath = 'data/processed/model_ready_data.csv'
+    cache = get_stage_cache()
+    X_train, X_test, y_train, y_test, feature_cols = cache.cached(
+        'baseline_data_split',
+        load_and_split_data,
+        inputs=[filepath],
+        params={'filepath': filepath},
+        depends=[load_modeling_data, prepare_features, temporal_train_test_split]
+    )
     
     # Correlation analysis
     target_corr = analyze_correlations(X_train, y_train, feature_cols)
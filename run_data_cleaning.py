@@ -9,7 +9,13 @@ import sys
 import os
 sys.path.append('src')
 
-from data_cleaning import clean_pipeline, handle_missing_values, remove_outliers, create_target_variable
+from data_cleaning import (
+    clean_pipeline, handle_missing_values, remove_outliers, create_target_variable,
+    interpolate_by_machine, label_failure_windows
+)
+from outlier_detection import StreamingOutlierDetector
+from data_ingestion import load_sensor_data, read_sensor_csv
+from stage_cache import get_stage_cache
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -40,9 +46,23 @@ def main():
     print("STARTING CLEANING PIPELINE")
     print("=" * 70)
     
-    cleaned_df = clean_pipeline(
-        input_path='data/raw/sensor_logs.csv',
-        output_path='data/processed/clean_data.csv'
+    # Skipped (and loaded from cache) when the raw data and code are unchanged
+    cache = get_stage_cache()
+    cleaned_df = cache.cached(
+        'clean_pipeline',
+        clean_pipeline,
+        inputs=['data/raw/sensor_logs.csv'],
+        params={
+            'input_path': 'data/raw/sensor_logs.csv',
+            'output_path': 'data/processed/clean_data.csv',
+            'detector_path': 'models/outlier_detector.pkl',
+            'bad_rows_path': 'reports/bad_rows.csv'
+        },
+        outputs=['data/processed/clean_data.csv', 'models/outlier_detector.pkl'],
+        depends=[
+            load_sensor_data, read_sensor_csv, handle_missing_values, interpolate_by_machine, remove_outliers,
+            StreamingOutlierDetector, create_target_variable, label_failure_windows
+        ]
     )
     
     # Step 3: Generate validation report
@@ -55,7 +75,7 @@ def main():
     print("  * Clean dataset: data/processed/clean_data.csv")
     print("  * Target variable: 'failure_within_24h' created")
     print("  * Missing values handled")
-    print("  * Outliers removed")
+    print("  * Outliers removed (per-machine baselines)")
     print("\nNext Steps:")
     print("  -> Hand off to Harish for feature engineering")
     print("  -> Prepare for Week 2 baseline modeling")
@@ -135,7 +155,7 @@ def generate_cleaning_report(df):
         f.write("TASKS COMPLETED\n")
         f.write("-" * 70 + "\n")
         f.write("* Missing value imputation (interpolation method)\n")
-        f.write("* Outlier removal (4 standard deviations)\n")
+        f.write("* Outlier removal (8 robust standard deviations per machine)\n")
         f.write("* Target variable creation (24-hour failure window)\n")
         f.write("* Data validation checks\n\n")
         
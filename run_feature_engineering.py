@@ -1,6 +1,12 @@
 import os
+import sys
 import pandas as pd
 
+sys.path.append('src')
+from stage_cache import get_stage_cache
+from schema import optimize_dtypes, memory_mb, default_memory_mb, report_memory
+from storage import read_dataset, write_dataset
+
 
 print("SCRIPT STARTED")
 
@@ -20,7 +26,7 @@ def create_lag_features(df, lags=[1, 2, 3]):
 
     for col in sensor_cols:
         for lag in lags:
-            df[f'{col}_lag_{lag}'] = df.groupby('machine_id')[col].shift(lag)
+            df[f'{col}_lag_{lag}'] = df.groupby('machine_id', observed=True)[col].shift(lag)
 
     return df
 
@@ -31,7 +37,7 @@ def create_rolling_features(df, windows=[3, 6, 12]):
     for col in sensor_cols:
         for window in windows:
             df[f'{col}_roll_mean_{window}'] = (
-                df.groupby('machine_id')[col]
+                df.groupby('machine_id', observed=True)[col]
                 .rolling(window)
                 .mean()
                 .reset_index(0, drop=True)
@@ -42,26 +48,13 @@ def create_rolling_features(df, windows=[3, 6, 12]):
 
 # ---------------- MAIN PIPELINE ---------------- #
 
-def main():
-
-    print("=" * 60)
-    print("HARISH FEATURE ENGINEERING PIPELINE")
-    print("=" * 60)
-
-    input_path = "data/processed/clean_data.csv"
-    output_path = "data/processed/model_ready_data.csv"
-
-    if not os.path.exists(input_path):
-        print("ERROR: clean_data.csv not found")
-        return
+def build_model_ready_data(input_path, output_path):
 
     print("Loading cleaned dataset...")
-    df = pd.read_csv(input_path)
+    df = read_dataset(input_path)
 
     print("Rows:", len(df))
 
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-
     print("Creating time features...")
     df = create_time_features(df)
 
@@ -73,8 +66,38 @@ def main():
 
     df.dropna(inplace=True)
 
-    os.makedirs("data/processed", exist_ok=True)
-    df.to_csv(output_path, index=False)
+    # Rolling means are computed in float64; store everything compactly
+    df = optimize_dtypes(df)
+    report_memory(default_memory_mb(df), memory_mb(df))
+
+    write_dataset(df, output_path)
+
+    return df
+
+
+def main():
+
+    print("=" * 60)
+    print("HARISH FEATURE ENGINEERING PIPELINE")
+    print("=" * 60)
+
+    input_path = "data/processed/clean_data.csv"
+    output_path = "data/processed/model_ready_data.csv"
+
+    if not os.path.exists(input_path):
+        print("ERROR: clean_data.csv not found")
+        return
+
+    # Skipped when clean_data.csv and the feature code are unchanged
+    cache = get_stage_cache()
+    df = cache.cached(
+        'feature_engineering',
+        build_model_ready_data,
+        inputs=[input_path],
+        params={'input_path': input_path, 'output_path': output_path},
+        outputs=[output_path],
+        depends=[create_time_features, create_lag_features, create_rolling_features]
+    )
 
     print("\nSUCCESS ")
     print("Saved:", output_path)
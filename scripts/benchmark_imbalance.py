@@ -0,0 +1,136 @@
+"""
+FactoryGuard AI - Imbalance Strategy Benchmark
+
+Compares the imbalance strategies of src/resampling.py on the prepared
+train/test split: for each one, the resampling wall time and peak memory
+(tracemalloc, which sees numpy and scikit-learn allocations), the number of
+rows handed to the model, the fit time, and test recall, precision and F1.
+
+The model is the Random Forest of imbalance_handling.py; --n-estimators
+lowers its tree count for quicker runs, and --model xgboost fits an
+XGBClassifier (hist) instead. Every strategy is fitted with the same model
+settings, so only the training rows and weights differ.
+
+Results are saved as JSON with the git commit.
+
+Usage:
+    python scripts/benchmark_imbalance.py --n-estimators 50
+    python scripts/benchmark_imbalance.py --strategies smote approx_smote --model xgboost
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT / 'src'))
+from resampling import STRATEGIES, resample
+from training import DATA_PATH, evaluate, prepare_data
+
+
+def make_model(name, n_estimators, weighted=False):
+    if name == 'xgboost':
+        import xgboost as xgb
+        return xgb.XGBClassifier(n_estimators=n_estimators, tree_method='hist', random_state=42)
+    from sklearn.ensemble import RandomForestClassifier
+    # Same settings as imbalance_handling.train_random_forest
+    return RandomForestClassifier(n_estimators=n_estimators, max_depth=15, min_samples_split=10,
+                                  class_weight=None if weighted else 'balanced', random_state=42, n_jobs=-1)
+
+
+def run_strategy(data, strategy, model_name, n_estimators):
+    """Resample, fit and score one strategy"""
+    X_train, y_train = data.X_train, data.y_train
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    X, y, weight = resample(strategy, X_train, y_train,
+                            groups=data.train.groups, timestamps=data.train.timestamps)
+    resample_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    model = make_model(model_name, n_estimators, weighted=weight is not None)
+    start = time.perf_counter()
+    model.fit(X, y, sample_weight=weight)
+    fit_seconds = time.perf_counter() - start
+
+    metrics = evaluate(model, data.X_test, data.y_test)
+    y = np.asarray(y)
+    return {
+        'strategy': strategy,
+        'resample_seconds': round(resample_seconds, 3),
+        'resample_peak_mb': round(peak / 1024 ** 2, 1),
+        'rows': int(len(y)),
+        'positives': int((y == 1).sum()),
+        'weighted': weight is not None,
+        'fit_seconds': round(fit_seconds, 2),
+        'recall': metrics['recall'],
+        'precision': metrics['precision'],
+        'f1_score': metrics['f1_score'],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare class-imbalance strategies')
+    parser.add_argument('--data', default=str(DATA_PATH), help='Modeling-ready dataset')
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument('--model', default='rf', choices=['rf', 'xgboost'])
+    parser.add_argument('--n-estimators', type=int, default=200)
+    parser.add_argument('--output', default='results/bench_imbalance.json')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("IMBALANCE STRATEGY BENCHMARK")
+    print("=" * 70)
+    data = prepare_data(args.data)
+    print(f"Training rows: {len(data.train):,} ({int(data.y_train.sum()):,} positive), "
+          f"model: {args.model} x {args.n_estimators}\n")
+
+    print(f"{'strategy':18s} {'resample s':>10s} {'peak MB':>8s} {'rows':>9s} {'fit s':>7s} "
+          f"{'recall':>7s} {'prec':>7s} {'F1':>7s}")
+    results = []
+    for strategy in args.strategies:
+        record = run_strategy(data, strategy, args.model, args.n_estimators)
+        results.append(record)
+        print(f"{strategy:18s} {record['resample_seconds']:>10.2f} {record['resample_peak_mb']:>8.1f} "
+              f"{record['rows']:>9,} {record['fit_seconds']:>7.1f} {record['recall']:>7.4f} "
+              f"{record['precision']:>7.4f} {record['f1_score']:>7.4f}")
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__},
+        'model': args.model,
+        'n_estimators': args.n_estimators,
+        'train_rows': len(data.train),
+        'results': results,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+"""
+FactoryGuard AI - Inference Micro-Benchmark
+
+Times each stage of the /predict hot path in-process, without a server, so a
+latency change can be traced to the stage that caused it:
+
+    validate_input      FeatureProcessor.validate_input, per request
+    process_request     FeatureProcessor.process_single_request, per request
+    predict_proba       model.predict_proba on the batch
+    shap_values         explainer.shap_values on the batch
+    format_explanation  SHAPExplainer.format_explanation, per row
+    text_explanation    SHAPExplainer.generate_text_explanation, per row
+    json_serialize      json.dumps of the response bodies (Flask's defaults)
+
+Every stage runs at each batch size (1 to 10,000 rows). Timings are repeated
+until --min-time has passed and reported as p50/p99 per call and per row.
+A separate tracemalloc pass gives the peak Python/numpy memory allocated
+during a call and what is still held after it; allocations inside
+XGBoost's C++ core are not visible to tracemalloc.
+
+The model, feature names and explainer are loaded as app.py loads them. With
+--synthetic (or when models/xgboost_best.pkl is missing) a small XGBoost model
+is fitted on random data instead, so the harness runs on a fresh checkout;
+compare synthetic runs only with synthetic runs. Without shap installed,
+shap_values falls back to XGBoost's native TreeSHAP (pred_contribs).
+
+Results are saved as JSON with the git commit; pass --compare to print the
+p50 ratio against an earlier results file.
+
+Usage:
+    python scripts/benchmark_inference.py --output results/bench_inference.json
+    python scripts/benchmark_inference.py --batch-sizes 1 100 --compare results/bench_inference.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / 'src'))
+from utils.feature_processor import FeatureProcessor, SHAPExplainer
+from time_windows import ROLLING_STATS
+
+try:
+    import shap
+    HAS_SHAP = True
+except ImportError:
+    HAS_SHAP = False
+
+
+MODELS_DIR = ROOT / 'models'
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+STAGES = ['validate_input', 'process_request', 'predict_proba', 'shap_values',
+          'format_explanation', 'text_explanation', 'json_serialize']
+SENSOR_COLS = ['vibration', 'temperature', 'pressure']
+N_MACHINES = 20
+
+
+class NativeTreeShap:
+    """TreeSHAP from XGBoost itself, with the shap_values interface"""
+
+    def __init__(self, model):
+        import xgboost as xgb
+        self._dmatrix = xgb.DMatrix
+        self.booster = model.get_booster()
+
+    def shap_values(self, X):
+        contribs = self.booster.predict(self._dmatrix(X), pred_contribs=True)
+        return contribs[:, :-1]  # Last column is the bias term
+
+
+def synthetic_feature_names(rolling_windows=(1, 4, 8)):
+    """The feature layout FeatureProcessor produces for a time-window model"""
+    names = SENSOR_COLS + ['hour', 'day', 'month', 'day_of_week']
+    names += [f'{col}_lag_{lag}' for col in SENSOR_COLS for lag in (1, 2, 3)]
+    names += [f'{col}_roll_mean_{w}' for col in SENSOR_COLS for w in (3, 6, 12)]
+    names += [f'{col}_rolling_{stat}_{w}h' for w in rolling_windows for col in SENSOR_COLS
+              for stat in ROLLING_STATS]
+    return names
+
+
+def fit_synthetic_model(feature_names, n_rows=20_000, seed=0):
+    """Small XGBoost classifier on random features with a learnable signal"""
+    from xgboost import XGBClassifier
+
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, len(feature_names))), columns=feature_names)
+    y = (X['temperature'] + X['vibration'] + rng.normal(0, 1, n_rows) > 2).astype(int)
+    model = XGBClassifier(n_estimators=200, max_depth=6, learning_rate=0.1, n_jobs=1,
+                          random_state=seed, verbosity=0)
+    return model.fit(X, y)
+
+
+def load_artifacts(synthetic=False):
+    """
+    Model, feature names and explainer, as the API loads them
+
+    Returns:
+        tuple: (model, feature_names, explainer, description dict)
+    """
+    model_path = MODELS_DIR / 'xgboost_best.pkl'
+    if synthetic or not model_path.exists():
+        feature_names = synthetic_feature_names()
+        model = fit_synthetic_model(feature_names)
+        source = 'synthetic'
+    else:
+        model = joblib.load(model_path)
+        feature_names = joblib.load(MODELS_DIR / 'feature_names.pkl')
+        source = str(model_path.relative_to(ROOT))
+
+    if HAS_SHAP:
+        explainer = shap.TreeExplainer(model, feature_perturbation='interventional')
+        backend = f'shap {shap.__version__}'
+    else:
+        explainer = NativeTreeShap(model)
+        backend = 'xgboost pred_contribs'
+
+    return model, feature_names, explainer, {
+        'model': source,
+        'n_features': len(feature_names),
+        'shap_backend': backend,
+    }
+
+
+class RequestStream:
+    """Sample requests with per-machine timestamps that keep moving forward"""
+
+    def __init__(self, seed=42):
+        self.rng = np.random.default_rng(seed)
+        self.clock = pd.Timestamp('2024-01-01')
+
+    def batch(self, n):
+        times = self.clock + pd.to_timedelta(np.arange(n), unit='min')
+        self.clock = times[-1] + pd.Timedelta(minutes=1)
+        temperature = self.rng.normal(70, 8, n).round(2)
+        vibration = np.abs(self.rng.normal(0.5, 0.15, n)).round(3)
+        pressure = self.rng.normal(100, 5, n).round(2)
+        return [
+            {
+                'timestamp': times[i].strftime('%Y-%m-%d %H:%M:%S'),
+                'machine_id': f'M{i % N_MACHINES:03d}',
+                'temperature': float(temperature[i]),
+                'vibration': float(vibration[i]),
+                'pressure': float(pressure[i]),
+            }
+            for i in range(n)
+        ]
+
+
+def positive_class(shap_values):
+    """Positive-class matrix from any shap_values output format"""
+    if isinstance(shap_values, list):
+        shap_values = shap_values[1]
+    shap_values = np.asarray(shap_values)
+    return shap_values[..., 1] if shap_values.ndim == 3 else shap_values
+
+
+def build_stages(model, feature_names, explainer, stream):
+    """
+    One (setup, call) pair per stage
+
+    setup(n) prepares untimed inputs for a batch of n; call(inputs) is timed.
+    """
+    processor = FeatureProcessor(feature_names)
+    feature_source = FeatureProcessor(feature_names)
+
+    def requests(n):
+        # Fresh every call: the processor keeps per-machine window state
+        return stream.batch(n)
+
+    # Inputs of the stateless stages are built once per batch size
+    @lru_cache(maxsize=None)
+    def features(n):
+        rows = [feature_source.process_single_request(r) for r in stream.batch(n)]
+        return pd.concat(rows, ignore_index=True)
+
+    @lru_cache(maxsize=None)
+    def explained(n):
+        X = features(n)
+        probabilities = model.predict_proba(X)[:, 1]
+        return X, probabilities, positive_class(explainer.shap_values(X))
+
+    @lru_cache(maxsize=None)
+    def top_features(n):
+        X, probabilities, values = explained(n)
+        names = X.columns.tolist()
+        tops = [SHAPExplainer.format_explanation(values[i], X.values[i], names, top_n=5) for i in range(n)]
+        return probabilities, tops
+
+    @lru_cache(maxsize=None)
+    def responses(n):
+        probabilities, tops = top_features(n)
+        return [
+            {
+                'failure_probability': round(float(p), 4),
+                'prediction': int(p >= 0.5),
+                'risk_level': 'high' if p > 0.7 else 'moderate' if p > 0.4 else 'low',
+                'top_features': top,
+                'explanation': SHAPExplainer.generate_text_explanation(float(p), top),
+                'sensor_anomalies': {},
+                'timestamp': datetime.now().isoformat(),
+                'latency_ms': 12.34,
+                'machine_id': f'M{i % N_MACHINES:03d}',
+            }
+            for i, (p, top) in enumerate(zip(probabilities, tops))
+        ]
+
+    def format_all(inputs):
+        X, _, values = inputs
+        names = X.columns.tolist()
+        rows = X.values
+        return [SHAPExplainer.format_explanation(values[i], rows[i], names, top_n=5) for i in range(len(rows))]
+
+    return {
+        'validate_input': (requests, lambda batch: [processor.validate_input(r) for r in batch]),
+        'process_request': (requests, lambda batch: [processor.process_single_request(r) for r in batch]),
+        'predict_proba': (features, model.predict_proba),
+        'shap_values': (features, explainer.shap_values),
+        'format_explanation': (explained, format_all),
+        'text_explanation': (
+            top_features,
+            lambda inputs: [SHAPExplainer.generate_text_explanation(float(p), top)
+                            for p, top in zip(*inputs)]
+        ),
+        'json_serialize': (responses, lambda batch: [json.dumps(r, sort_keys=True) for r in batch]),
+    }
+
+
+def time_stage(setup, call, n, min_time, min_repeats, max_repeats):
+    """Per-call wall times in seconds, fresh inputs for every call"""
+    call(setup(n))  # Warm-up
+    times = []
+    spent = 0.0
+    while len(times) < min_repeats or (spent < min_time and len(times) < max_repeats):
+        inputs = setup(n)
+        start = time.perf_counter()
+        call(inputs)
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        spent += elapsed
+    return np.array(times)
+
+
+def measure_allocations(setup, call, n, repeats=3):
+    """Median peak and retained traced bytes per call"""
+    peaks, retained = [], []
+    for _ in range(repeats):
+        inputs = setup(n)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        result = call(inputs)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        peaks.append(peak - before)
+        retained.append(current - before)
+    return int(np.median(peaks)), int(np.median(retained))
+
+
+def run_benchmark(stages, batch_sizes, names=STAGES, min_time=1.0, min_repeats=3, max_repeats=1000,
+                  allocations=True):
+    """
+    Time the named stages at every batch size
+
+    Returns:
+        list of dict: one record per (stage, batch size)
+    """
+    results = []
+    for name in names:
+        setup, call = stages[name]
+        for n in batch_sizes:
+            times = time_stage(setup, call, n, min_time, min_repeats, max_repeats)
+            record = {
+                'stage': name,
+                'batch_size': n,
+                'repeats': len(times),
+                'p50_ms': round(float(np.percentile(times, 50)) * 1000, 4),
+                'p99_ms': round(float(np.percentile(times, 99)) * 1000, 4),
+                'p50_us_per_row': round(float(np.percentile(times, 50)) * 1e6 / n, 3),
+            }
+            if allocations:
+                peak, retained = measure_allocations(setup, call, n, repeats=3 if n < 1000 else 1)
+                record['alloc_peak_kb'] = round(peak / 1024, 1)
+                record['alloc_retained_kb'] = round(retained / 1024, 1)
+            results.append(record)
+            print(f"  {name:20s} n={n:<6d} p50 {record['p50_ms']:>10.3f} ms  "
+                  f"p99 {record['p99_ms']:>10.3f} ms  {record['p50_us_per_row']:>9.2f} us/row"
+                  + (f"  peak {record['alloc_peak_kb']:>9.1f} KB" if allocations else ''))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print current / baseline p50 per stage and batch size"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r['stage'], r['batch_size']): r for r in baseline['results']}
+
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    print(f"  {'stage':20s} {'batch':>6s} {'before ms':>11s} {'after ms':>11s} {'ratio':>7s}")
+    for record in results:
+        old = previous.get((record['stage'], record['batch_size']))
+        if old is None:
+            continue
+        ratio = record['p50_ms'] / old['p50_ms'] if old['p50_ms'] else float('nan')
+        print(f"  {record['stage']:20s} {record['batch_size']:>6d} {old['p50_ms']:>11.3f} "
+              f"{record['p50_ms']:>11.3f} {ratio:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the prediction hot path stage by stage')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=BATCH_SIZES)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--min-time', type=float, default=1.0, help='Seconds of timed calls per case')
+    parser.add_argument('--min-repeats', type=int, default=3)
+    parser.add_argument('--max-repeats', type=int, default=1000)
+    parser.add_argument('--no-alloc', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--synthetic', action='store_true', help='Use a synthetic model')
+    parser.add_argument('--output', default='results/bench_inference.json')
+    parser.add_argument('--compare', help='Earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("INFERENCE MICRO-BENCHMARK")
+    print("=" * 70)
+    model, feature_names, explainer, setup_info = load_artifacts(synthetic=args.synthetic)
+    print(f"Model: {setup_info['model']} ({setup_info['n_features']} features), "
+          f"SHAP: {setup_info['shap_backend']}\n")
+
+    stages = build_stages(model, feature_names, explainer, RequestStream())
+    names = [s for s in STAGES if s in args.stages]
+    results = run_benchmark(stages, args.batch_sizes, names=names, min_time=args.min_time,
+                            min_repeats=args.min_repeats, max_repeats=args.max_repeats,
+                            allocations=not args.no_alloc)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__},
+        **setup_info,
+        'results': results,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+FactoryGuard AI - Point Query Benchmark
+
+Times "one machine, one week" queries against a large raw sensor history:
+a full scan of the CSV filtered in pandas versus reads through the sidecar
+index. The scan goes chunk by chunk, since a multi-GB history does not fit in
+memory as one DataFrame.
+
+The history is generated once (hourly readings, sorted by machine and time)
+and kept, so later runs only rebuild the index and query.
+
+Usage:
+    python scripts/benchmark_point_queries.py --machines 2000 --days 730 --queries 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+from data_ingestion import read_indexed
+from schema import TIMESTAMP_FORMAT
+from sensor_index import build_index
+from storage import filter_rows
+
+
+def write_history(path, n_machines, n_days, machines_per_chunk=100, seed=42):
+    """Hourly readings for n_machines over n_days, written chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2022-01-01', periods=n_days * 24, freq='h').strftime(TIMESTAMP_FORMAT)
+    with open(path, 'w') as f:
+        for first in range(1, n_machines + 1, machines_per_chunk):
+            ids = np.arange(first, min(first + machines_per_chunk, n_machines + 1))
+            n = len(ids) * len(timestamps)
+            pd.DataFrame({
+                'timestamp': np.tile(timestamps, len(ids)),
+                'machine_id': np.repeat(ids, len(timestamps)),
+                'vibration': rng.normal(0.4, 0.05, n).round(3),
+                'temperature': rng.normal(65, 2, n).round(2),
+                'pressure': rng.normal(100, 1, n).round(2),
+                'failure': (rng.random(n) < 0.001).astype(np.int8),
+            }).to_csv(f, index=False, header=(first == 1))
+
+
+def full_scan(path, machines, start, end, chunk_size=2_000_000):
+    """Parse every row in chunks and keep the matching ones"""
+    dtype = {'machine_id': 'int64', 'vibration': 'float32', 'temperature': 'float32',
+             'pressure': 'float32', 'failure': 'int8'}
+    parts = []
+    for chunk in pd.read_csv(path, dtype=dtype, chunksize=chunk_size):
+        chunk['timestamp'] = pd.to_datetime(chunk['timestamp'], format=TIMESTAMP_FORMAT)
+        parts.append(filter_rows(chunk, machines, start, end))
+    return pd.concat(parts, ignore_index=True)
+
+
+def percentile_ms(times, q):
+    return np.percentile(times, q) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark machine/time point queries')
+    parser.add_argument('--path', default='data/benchmark/sensor_history.csv')
+    parser.add_argument('--machines', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--skip-full', action='store_true', help='Skip the full-scan baseline')
+    args = parser.parse_args()
+
+    path = Path(args.path)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        print(f"Writing {args.machines:,} machines x {args.days} days to {path}...")
+        start = time.perf_counter()
+        write_history(path, args.machines, args.days)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+    print("=" * 70)
+    print("POINT QUERY BENCHMARK")
+    print("=" * 70)
+    print(f"History: {path} ({path.stat().st_size / 1024 ** 3:.2f} GB)")
+
+    start = time.perf_counter()
+    index = build_index(path)
+    print(f"Index build: {time.perf_counter() - start:.1f}s "
+          f"({index.n_rows:,} rows, {index.n_runs:,} runs)")
+
+    rng = np.random.default_rng(0)
+    machine_ids = np.unique(index.machine)
+    first_day = pd.Timestamp(index.bucket.min())
+    n_days = int((index.bucket.max() - index.bucket.min()) // index.bucket_ns) + 1
+    queries = []
+    for _ in range(args.queries):
+        query_start = first_day + pd.Timedelta(days=int(rng.integers(0, max(n_days - 7, 1))))
+        queries.append(([int(rng.choice(machine_ids))], query_start, query_start + pd.Timedelta(days=7)))
+
+    times, rows = [], []
+    for machines, query_start, query_end in queries:
+        start = time.perf_counter()
+        df, _ = read_indexed(path, index, machines, query_start, query_end)
+        times.append(time.perf_counter() - start)
+        rows.append(len(df))
+
+    print(f"\nIndexed, 1 machine x 7 days ({args.queries} queries, {np.mean(rows):.0f} rows each):")
+    print(f"  p50 {percentile_ms(times, 50):.1f} ms   p95 {percentile_ms(times, 95):.1f} ms   "
+          f"max {max(times) * 1000:.1f} ms")
+
+    if not args.skip_full:
+        machines, query_start, query_end = queries[0]
+        start = time.perf_counter()
+        expected = full_scan(path, machines, query_start, query_end)
+        full_time = time.perf_counter() - start
+        print(f"\nFull scan + filter (1 query): {full_time:.1f}s")
+        print(f"Speedup at p50: {full_time / np.percentile(times, 50):,.0f}x")
+
+        indexed, _ = read_indexed(path, index, machines, query_start, query_end)
+        pd.testing.assert_frame_equal(indexed, expected, check_dtype=False)
+
+
+if __name__ == "__main__":
+    main()
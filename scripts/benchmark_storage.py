@@ -0,0 +1,96 @@
+"""
+FactoryGuard AI - Storage Load Benchmark
+
+Compares loading pipeline data from CSV (as the scripts used to, and with the
+compact schema) against the partitioned Parquet dataset: full loads, column
+projection, and a single-machine / single-week predicate.
+
+The input is replicated across extra machine ids to reach a realistic size.
+
+Usage:
+    python scripts/benchmark_storage.py --input data/sensor_logs.csv --copies 50
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+from schema import read_csv_compact
+from storage import read_dataset, write_dataset
+
+
+def replicate(df, copies):
+    """Stack copies of the data under new machine ids"""
+    machine_ids = df['machine_id'].astype('int64')
+    offset = int(machine_ids.max())
+    frames = [df.assign(machine_id=machine_ids + k * offset) for k in range(copies)]
+    return pd.concat(frames, ignore_index=True).sort_values(['machine_id', 'timestamp'], kind='stable')
+
+
+def best_of(func, repeats):
+    """Fastest of several runs, in seconds"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CSV vs partitioned Parquet loads')
+    parser.add_argument('--input', default='data/sensor_logs.csv')
+    parser.add_argument('--copies', type=int, default=50, help='Times to replicate the input machines')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    df = replicate(read_csv_compact(args.input), args.copies)
+    machine = int(df['machine_id'].iloc[0])
+    week_start = df['timestamp'].min().normalize()
+    week_end = week_start + pd.Timedelta(days=7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Different stems, so the CSV cases cannot resolve to the Parquet copy
+        csv_path = Path(tmp) / 'bench.csv'
+        df.to_csv(csv_path, index=False)
+        pq_path = write_dataset(df, Path(tmp) / 'bench_pq.csv', write_csv=False)
+        csv_mb = csv_path.stat().st_size / 1024 ** 2
+        pq_mb = sum(p.stat().st_size for p in pq_path.rglob('*.parquet')) / 1024 ** 2
+
+        def csv_default():
+            frame = pd.read_csv(csv_path)
+            frame['timestamp'] = pd.to_datetime(frame['timestamp'])
+            return frame
+
+        sensors = ['timestamp', 'machine_id', 'vibration']
+        cases = [
+            ('CSV, default dtypes', csv_default),
+            ('CSV, compact schema', lambda: read_csv_compact(csv_path)),
+            ('Parquet, all columns', lambda: read_dataset(pq_path)),
+            ('CSV, 3 columns', lambda: read_dataset(csv_path, columns=sensors)),
+            ('Parquet, 3 columns', lambda: read_dataset(pq_path, columns=sensors)),
+            ('CSV, 1 machine x 1 week', lambda: read_dataset(
+                csv_path, machines=[machine], start=week_start, end=week_end)),
+            ('Parquet, 1 machine x 1 week', lambda: read_dataset(
+                pq_path, machines=[machine], start=week_start, end=week_end)),
+        ]
+
+        print("=" * 70)
+        print("STORAGE LOAD BENCHMARK")
+        print("=" * 70)
+        print(f"Rows: {len(df):,}  Machines: {df['machine_id'].nunique():,}")
+        print(f"CSV: {csv_mb:.1f} MB  Parquet: {pq_mb:.1f} MB")
+        print(f"\n{'case':32s} {'seconds':>10s} {'rows':>12s}")
+
+        for name, func in cases:
+            seconds, result = best_of(func, args.repeats)
+            print(f"{name:32s} {seconds:>10.3f} {len(result):>12,}")
+
+
+if __name__ == "__main__":
+    main()
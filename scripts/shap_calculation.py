@@ -11,11 +11,17 @@ import numpy as np
 import shap
 import pickle
 import os
+import sys
+from pathlib import Path
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+from stage_cache import get_stage_cache
+from storage import read_dataset
+
 
 def load_best_model():
     """
@@ -52,8 +58,7 @@ def train_baseline_model():
     print("Training Logistic Regression baseline model...")
     
     # Load data
-    df = pd.read_csv('data/processed/model_ready_data.csv')
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df = read_dataset('data/processed/model_ready_data.csv')
     
     # Prepare features
     exclude_cols = ['timestamp', 'machine_id', 'failure', 'failure_within_24h']
@@ -111,8 +116,7 @@ def load_test_data():
     print("=" * 70)
     
     # Load full dataset
-    df = pd.read_csv('data/processed/model_ready_data.csv')
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df = read_dataset('data/processed/model_ready_data.csv')
     
     # Prepare features
     exclude_cols = ['timestamp', 'machine_id', 'failure', 'failure_within_24h']
@@ -385,13 +389,24 @@ def main():
     # Step 1: Load best model
     model, scaler = load_best_model()
     
-    # Step 2: Load test data
-    X_test_raw, y_test, feature_names = load_test_data()
+    # Step 2: Load test data (cached on the CSV content)
+    cache = get_stage_cache()
+    data_path = 'data/processed/model_ready_data.csv'
+    X_test_raw, y_test, feature_names = cache.cached(
+        'shap_test_data',
+        load_test_data,
+        inputs=[data_path]
+    )
     
-    # Step 3: Calculate SHAP values
+    # Step 3: Calculate SHAP values (cached on the fitted model/scaler state, model files and test data)
     # Note: Using sample_size=500 for speed. Remove this parameter to use all data.
-    shap_values, explainer, X_test_sample, X_test_raw_sample = calculate_shap_values(
-        model, scaler, X_test_raw, sample_size=500
+    model_files = [path for path in ['models/logistic_regression_baseline.pkl', 'models/scaler.pkl']
+                   if os.path.exists(path)]
+    shap_values, explainer, X_test_sample, X_test_raw_sample = cache.cached(
+        'shap_values',
+        calculate_shap_values,
+        inputs=model_files,
+        params={'model': model, 'scaler': scaler, 'X_test_raw': X_test_raw, 'sample_size': 500}
     )
     
     # Step 4: Analyze feature importance
@@ -5,75 +5,599 @@ Member A - Week 1, Days 1-2
 This module handles loading and initial processing of raw sensor data.
 """
 
+import io
+import re
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-from pathlib import Path
+
+try:
+    from .schema import (
+        SENSOR_COLUMNS, TIME_COLUMN, MACHINE_COLUMN, TIMESTAMP_FORMAT, FEATURE_DTYPE,
+        optimize_dtypes, read_dtypes, memory_mb, default_memory_mb, report_memory, peak_rss_mb
+    )
+    from .storage import read_dataset, resolve_source, filter_rows
+    from .sensor_index import build_index, load_index, read_ranges
+    from .profiling import profile_chunks
+except ImportError:  # run with src/ on sys.path
+    from schema import (
+        SENSOR_COLUMNS, TIME_COLUMN, MACHINE_COLUMN, TIMESTAMP_FORMAT, FEATURE_DTYPE,
+        optimize_dtypes, read_dtypes, memory_mb, default_memory_mb, report_memory, peak_rss_mb
+    )
+    from storage import read_dataset, resolve_source, filter_rows
+    from sensor_index import build_index, load_index, read_ranges
+    from profiling import profile_chunks
+
+
+CSV_ENGINES = ('c', 'pyarrow')
+
+# Columns a reading cannot be used without
+REQUIRED_COLUMNS = [TIME_COLUMN, MACHINE_COLUMN]
+
+BAD_ROW_COLUMNS = ['file', 'line', 'reason']
+
+JOIN_DIRECTIONS = ('forward', 'backward')
+
+_SKIPPED_LINE = re.compile(r'Skipping line (\d+): (.*)')
+
+
+def _numeric_columns(header):
+    return [col for col in header if col not in (TIME_COLUMN,)]
+
+
+def _read_c(filepath, header, typed, skipped):
+    """pandas C parser; malformed lines are collected from its warnings"""
+    if typed:
+        # machine_id as text: ids may be 'M001'; _validate_rows narrows numeric ones
+        dtype = {col: str if col == MACHINE_COLUMN else FEATURE_DTYPE
+                 for col in _numeric_columns(header)}
+        dtype[TIME_COLUMN] = str
+    else:
+        dtype = str
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        df = pd.read_csv(filepath, dtype=dtype, on_bad_lines='warn', engine='c')
+
+    for warning in caught:
+        for line, reason in _SKIPPED_LINE.findall(str(warning.message)):
+            skipped.append((int(line), reason))
+    return df
+
+
+def _read_pyarrow(filepath, header, typed, skipped):
+    """Multithreaded pyarrow parser; timestamps are parsed with the fixed format"""
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    def invalid_row(row):
+        # pyarrow only knows row numbers when parsing single-threaded,
+        # so the report has no line numbers for this engine
+        skipped.append((row.number, f'expected {row.expected_columns} fields, saw {row.actual_columns}'))
+        return 'skip'
+
+    if typed:
+        column_types = {col: pa.string() if col == MACHINE_COLUMN else pa.float32()
+                        for col in _numeric_columns(header)}
+        column_types[TIME_COLUMN] = pa.timestamp('ns')
+    else:
+        column_types = {col: pa.string() for col in header}
+
+    table = pa_csv.read_csv(
+        filepath,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=invalid_row),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            timestamp_parsers=[TIMESTAMP_FORMAT],
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+def _file_lines(n_rows, skipped):
+    """
+    1-based file line of each parsed row (the header is line 1), or None
+    when the parser could not say which lines it skipped
+    """
+    if any(line is None for line, _ in skipped):
+        return None
+    lines = np.arange(n_rows) + 2
+    for line in sorted(line for line, _ in skipped):
+        lines[lines >= line] += 1
+    return lines
+
+
+def _machine_ids(raw):
+    """
+    Machine ids as numbers when every present id is numeric, else as text
+
+    Blank ids become missing either way.
+    """
+    if pd.api.types.is_numeric_dtype(raw):
+        return raw.astype(np.float64)
+    text = raw.astype('string').str.strip()
+    text = text.mask(text == '')
+    numeric = pd.to_numeric(text, errors='coerce')
+    if (numeric.isna() == text.isna()).all():
+        return numeric.astype(np.float64)
+    return text.astype(object).where(text.notna(), None)
 
 
-def load_sensor_data(filepath):
+def _validate_rows(df, timestamp_format):
     """
-    Load raw sensor CSV files
+    Coerce columns to their types and find rows that cannot be used
+
+    Returns:
+        tuple: (typed DataFrame, bad-row mask, reason string per bad row)
+    """
+    checks = []
+    columns = {}
+    for col in df.columns:
+        raw = df[col]
+        if col == TIME_COLUMN and not pd.api.types.is_datetime64_any_dtype(raw):
+            parsed = pd.to_datetime(raw, format=timestamp_format, errors='coerce')
+        elif col == MACHINE_COLUMN:
+            continue
+        elif col != TIME_COLUMN and not pd.api.types.is_numeric_dtype(raw):
+            parsed = pd.to_numeric(raw, errors='coerce')
+        else:
+            continue
+        columns[col] = parsed
+        checks.append((parsed.isna().to_numpy() & raw.notna().to_numpy(), f'invalid {col}'))
+    columns[MACHINE_COLUMN] = _machine_ids(df[MACHINE_COLUMN])
+    df = df.assign(**columns)
+
+    for col in REQUIRED_COLUMNS + ['failure']:
+        if col in df.columns:
+            checks.append((df[col].isna().to_numpy(), f'missing {col}'))
+    if pd.api.types.is_numeric_dtype(df[MACHINE_COLUMN]):
+        ids = df[MACHINE_COLUMN].to_numpy(dtype=np.float64)
+        checks.append((np.isfinite(ids) & (ids != np.floor(ids)), f'invalid {MACHINE_COLUMN}'))
+
+    bad = np.zeros(len(df), dtype=bool)
+    for mask, _ in checks:
+        bad |= mask
+    # Invalid values also show up as missing; report the first problem only
+    reasons = np.full(bad.sum(), '', dtype=object)
+    for mask, reason in reversed(checks):
+        reasons[mask[bad]] = reason
+
+    return df, bad, list(reasons)
+
+
+def read_sensor_csv(filepath, engine='c', timestamp_format=TIMESTAMP_FORMAT, source_name=None):
+    """
+    Parse one raw sensor CSV with an explicit schema, reporting bad rows
+
+    The file is parsed straight into float32 sensors and datetime timestamps.
+    If a value does not parse, the file is re-read as text and every column is
+    coerced, so one bad value costs a slower read rather than the whole load.
+    Malformed lines (wrong field count) and rows with unusable values are
+    dropped and returned in the report.
+
+    Args:
+        filepath: CSV path, or CSV content (header included) as bytes
+        engine: 'c' (pandas) or 'pyarrow' (multithreaded)
+        timestamp_format: strptime format of the timestamp column
+        source_name: File named in the bad-row report when reading bytes;
+                     line numbers are only reported for whole files
+
+    Returns:
+        tuple: (DataFrame sorted by machine_id and timestamp,
+                bad rows DataFrame with file, line and reason)
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unknown CSV engine '{engine}', expected one of {CSV_ENGINES}")
+    read = _read_pyarrow if engine == 'pyarrow' else _read_c
+    in_memory = isinstance(filepath, bytes)
+    source = (lambda: io.BytesIO(filepath)) if in_memory else (lambda: filepath)
+    source_name = source_name or ('<bytes>' if in_memory else str(filepath))
+    header = list(pd.read_csv(source(), nrows=0).columns)
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing:
+        raise ValueError(f"{source_name} is missing required columns: {missing}")
+
+    skipped = []
+    try:
+        df = read(source(), header, typed=True, skipped=skipped)
+    except (ValueError, TypeError):  # includes pyarrow's ArrowInvalid
+        skipped = []
+        df = read(source(), header, typed=False, skipped=skipped)
+
+    df, bad, reasons = _validate_rows(df, timestamp_format)
+
+    if in_memory:
+        skipped = [(None, reason) for _, reason in skipped]
+    lines = _file_lines(len(df), skipped)
+    bad_rows = pd.DataFrame({
+        'file': source_name,
+        'line': pd.array(
+            [line for line, _ in skipped] + (list(lines[bad]) if lines is not None else [None] * bad.sum()),
+            dtype='Int64'
+        ),
+        'reason': [reason for _, reason in skipped] + reasons,
+    }, columns=BAD_ROW_COLUMNS)
+
+    df = df[~bad]
+    dtypes = {col: FEATURE_DTYPE for col in _numeric_columns(header)}
+    # Integer ids stay integers; text ids ('M001') stay strings
+    dtypes[MACHINE_COLUMN] = 'int64' if pd.api.types.is_numeric_dtype(df[MACHINE_COLUMN]) else str
+    if 'failure' in dtypes:
+        dtypes['failure'] = 'int8'
+    df = df.astype(dtypes)
+    df = df.sort_values([MACHINE_COLUMN, TIME_COLUMN], kind='stable').reset_index(drop=True)
+
+    return df, bad_rows.sort_values('line', na_position='last', ignore_index=True)
+
+
+def load_sensor_directory(directory, pattern='*.csv', engine='c', workers=None):
+    """
+    Ingest a directory of raw sensor files (e.g. one per day) in parallel
+
+    Args:
+        directory: Directory holding the files
+        pattern: Glob for the files to read
+        engine: CSV engine passed to read_sensor_csv
+        workers: Parallel readers (default: one per file, at most 8)
+
+    Returns:
+        tuple: (combined DataFrame sorted by machine_id and timestamp, bad rows)
+    """
+    files = sorted(Path(directory).glob(pattern))
+    if not files:
+        raise FileNotFoundError(f"No files matching {pattern} in {directory}")
+
+    # Both parsers release the GIL while tokenizing, so threads scale
+    workers = workers or min(len(files), 8)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda f: read_sensor_csv(f, engine=engine), files))
+
+    df = pd.concat([frame for frame, _ in results], ignore_index=True)
+    df = df.sort_values([MACHINE_COLUMN, TIME_COLUMN], kind='stable').reset_index(drop=True)
+    bad_rows = pd.concat([bad for _, bad in results], ignore_index=True)
+
+    return df, bad_rows
+
+
+def read_indexed(filepath, index, machines=None, start=None, end=None, engine='c'):
+    """
+    Read only the index runs that can match a machine/time query
+
+    Returns:
+        tuple: (matching rows sorted by machine_id and timestamp, bad rows)
+    """
+    data, _ = read_ranges(filepath, index, machines, start, end)
+    df, bad_rows = read_sensor_csv(data, engine=engine, source_name=str(filepath))
+    # Buckets are coarser than the query; trim to the exact bounds
+    df = filter_rows(df, machines, start, end).reset_index(drop=True)
+    return df, bad_rows
+
+
+def load_sensor_data(filepath, engine='c', bad_rows_path=None, machines=None, start=None, end=None,
+                     write_index=False):
+    """
+    Load raw sensor data
+    
+    Machine/time queries read only the matching slices: partitions and row
+    groups of a current Parquet copy, or the byte ranges listed in the CSV's
+    sidecar index. Without either, the whole file is read and filtered.
     
     Args:
-        filepath: Path to the sensor CSV file
+        filepath: Sensor CSV file, a directory of CSV files, or a CSV path
+                  whose current Parquet copy should be used
+        engine: CSV engine, 'c' or 'pyarrow' (multithreaded)
+        bad_rows_path: Optional CSV path for the bad-row report
+        machines: Machine ids to load; None loads all
+        start: Load readings at or after this timestamp
+        end: Load readings before this timestamp
+        write_index: Also build the sidecar index when a CSV is read in full
+                     and has no current index. Off by default: it is a
+                     second scan of the file, worth it only if the CSV will
+                     be queried (or run 'python src/sensor_index.py build')
         
     Returns:
-        DataFrame with sensor readings
+        DataFrame with sensor readings, sorted by machine_id then timestamp
     """
-    df = pd.read_csv(filepath)
+    path = Path(filepath)
+    bad_rows = pd.DataFrame(columns=BAD_ROW_COLUMNS)
+    query = machines is not None or start is not None or end is not None
     
-    # Ensure timestamp is datetime
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    if path.is_dir() and path.suffix != '.parquet':
+        df, bad_rows = load_sensor_directory(path, engine=engine)
+        df = filter_rows(df, machines, start, end)
+    elif resolve_source(path)[0] == 'parquet':
+        # Already typed and validated when the Parquet copy was written
+        df = read_dataset(path, machines=machines, start=start, end=end)
+    else:
+        index = load_index(path)
+        if query and index is not None:
+            df, bad_rows = read_indexed(path, index, machines, start, end, engine=engine)
+        else:
+            df, bad_rows = read_sensor_csv(path, engine=engine)
+            df = filter_rows(df, machines, start, end)
+            if write_index and index is None:
+                build_index(path)
     
-    # Sort by timestamp
-    df = df.sort_values('timestamp')
+    # Compact dtypes (float32 sensors, categorical machine_id)
+    df = optimize_dtypes(df)
     
     print(f"Loaded {len(df)} sensor records")
     print(f"Time range: {df['timestamp'].min()} to {df['timestamp'].max()}")
     print(f"Columns: {list(df.columns)}")
+    report_memory(default_memory_mb(df), memory_mb(df))
+    
+    if len(bad_rows):
+        print(f"WARNING: skipped {len(bad_rows)} bad rows")
+        print(bad_rows.head(10).to_string(index=False))
+        if bad_rows_path:
+            Path(bad_rows_path).parent.mkdir(parents=True, exist_ok=True)
+            bad_rows.to_csv(bad_rows_path, index=False)
+            print(f"Bad row report saved to: {bad_rows_path}")
     
     return df
 
 
-def merge_datasets(sensor_df, failure_log_df):
+def _sort_keys(df):
+    """(machine_id, timestamp as int64 ns) arrays of a frame"""
+    machines = df[MACHINE_COLUMN]
+    if isinstance(machines.dtype, pd.CategoricalDtype):
+        machines = machines.astype(machines.cat.categories.dtype)
+    ts = df[TIME_COLUMN].to_numpy(dtype='datetime64[ns]').view('int64')
+    return machines.to_numpy(), ts
+
+
+def _check_key_order(df, last_key, name):
+    """
+    Ensure a chunk continues a stream sorted by (machine_id, timestamp)
+
+    Returns:
+        The chunk's last key, or last_key for an empty chunk
+    """
+    if not len(df):
+        return last_key
+    machines, ts = _sort_keys(df)
+    if last_key is not None:
+        machines = np.concatenate(([last_key[0]], machines))
+        ts = np.concatenate(([last_key[1]], ts))
+    
+    same = machines[1:] == machines[:-1]
+    ordered = (machines[1:] > machines[:-1]) | (same & (ts[1:] >= ts[:-1]))
+    if not ordered.all():
+        raise ValueError(f"Streaming join needs {name} sorted by (machine_id, timestamp)")
+    return machines[-1], ts[-1]
+
+
+def _align_machine_ids(left, right):
+    """merge_asof needs identical key dtypes; align ids to one categorical"""
+    dtypes = (left[MACHINE_COLUMN].dtype, right[MACHINE_COLUMN].dtype)
+    if not any(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+        return left, right
+    
+    ids = [
+        frame[MACHINE_COLUMN].cat.categories if isinstance(frame[MACHINE_COLUMN].dtype, pd.CategoricalDtype)
+        else pd.Index(frame[MACHINE_COLUMN].unique())
+        for frame in (left, right)
+    ]
+    machine_dtype = pd.CategoricalDtype(ids[0].union(ids[1]))
+    return (left.assign(**{MACHINE_COLUMN: left[MACHINE_COLUMN].astype(machine_dtype)}),
+            right.assign(**{MACHINE_COLUMN: right[MACHINE_COLUMN].astype(machine_dtype)}))
+
+
+def _merge_chunk(chunk, failures, direction, tolerance):
+    """merge_asof of one sensor chunk, returned in the chunk's row order"""
+    left, right = _align_machine_ids(chunk.reset_index(drop=True), failures)
+    if right[TIME_COLUMN].dtype != left[TIME_COLUMN].dtype:
+        right = right.assign(**{TIME_COLUMN: right[TIME_COLUMN].astype(left[TIME_COLUMN].dtype)})
+    
+    # merge_asof wants both sides ordered by time; only this chunk is sorted
+    order = np.argsort(left[TIME_COLUMN].to_numpy(), kind='stable')
+    merged = pd.merge_asof(
+        left.iloc[order],
+        right.sort_values(TIME_COLUMN, kind='stable'),
+        on=TIME_COLUMN,
+        by=MACHINE_COLUMN,
+        direction=direction,
+        tolerance=tolerance,
+    )
+    merged = merged.iloc[np.argsort(order)].reset_index(drop=True)
+    return merged.assign(**{MACHINE_COLUMN: merged[MACHINE_COLUMN].astype(chunk[MACHINE_COLUMN].dtype)})
+
+
+def _trim_failures(failures, key, direction):
+    """Drop failure rows no reading at or after key can match"""
+    machines, ts = _sort_keys(failures)
+    machine, timestamp = key
+    keep = machines > machine
+    current = machines == machine
+    if direction == 'forward':
+        keep |= current & (ts >= timestamp)
+    else:
+        keep |= current & (ts > timestamp)
+        # The latest event at or before key still matches later readings
+        earlier = np.flatnonzero(current & (ts <= timestamp))
+        if len(earlier):
+            keep[earlier[-1]] = True
+    return failures[keep].reset_index(drop=True)
+
+
+def stream_merge(sensor_chunks, failure_chunks, direction='forward', tolerance=None):
+    """
+    Sorted-merge join of sensor readings with failure events, chunk by chunk
+    
+    Both inputs are iterables of DataFrames sorted by (machine_id, timestamp),
+    e.g. pd.read_csv(..., chunksize=n). Failure rows are pulled only until
+    they pass the current sensor chunk and dropped once no later reading can
+    match them, so memory stays proportional to the chunk size rather than
+    to the length of either history.
+    
+    Args:
+        sensor_chunks: Iterable of sensor DataFrames
+        failure_chunks: Iterable of failure log DataFrames
+        direction: 'forward' matches the next event at or after each reading,
+                   'backward' the last event at or before it
+        tolerance: Optional maximum distance (Timedelta or string) to the event
+        
+    Yields:
+        Merged chunks, in (machine_id, timestamp) order
+    """
+    if direction not in JOIN_DIRECTIONS:
+        raise ValueError(f"direction must be one of {JOIN_DIRECTIONS}, got {direction!r}")
+    if tolerance is not None:
+        tolerance = pd.Timedelta(tolerance)
+    
+    failure_iter = iter(failure_chunks)
+    failures = None
+    sensor_key = failure_key = None
+    exhausted = False
+    
+    for chunk in sensor_chunks:
+        if not len(chunk):
+            continue
+        sensor_key = _check_key_order(chunk, sensor_key, 'sensor data')
+        
+        # Read ahead until an event sorts after the chunk's last reading
+        while not exhausted and (failure_key is None or failure_key <= sensor_key):
+            more = next(failure_iter, None)
+            if more is None:
+                exhausted = True
+                break
+            failure_key = _check_key_order(more, failure_key, 'failure logs')
+            failures = more if failures is None else pd.concat([failures, more], ignore_index=True)
+        
+        if failures is None:
+            # No failure log at all; nothing to attach
+            yield chunk.reset_index(drop=True)
+            continue
+        
+        yield _merge_chunk(chunk, failures, direction, tolerance)
+        failures = _trim_failures(failures, sensor_key, direction)
+
+
+def merge_datasets(sensor_df, failure_log_df, direction='forward', tolerance=None, chunk_size=100_000):
     """
     Merge sensor data with failure logs
     
     Args:
         sensor_df: DataFrame with sensor readings
         failure_log_df: DataFrame with failure events
+        direction: 'forward' (next event) or 'backward' (last event)
+        tolerance: Optional maximum distance to the matched event
+        chunk_size: Sensor rows joined at a time
         
     Returns:
-        Merged DataFrame
+        Merged DataFrame, sorted by machine_id then timestamp
     """
-    # Merge on machine_id and timestamp
-    merged = pd.merge_asof(
-        sensor_df.sort_values('timestamp'),
-        failure_log_df.sort_values('timestamp'),
-        on='timestamp',
-        by='machine_id',
-        direction='forward'
-    )
+    keys = [MACHINE_COLUMN, TIME_COLUMN]
+    sensor_df = sensor_df.sort_values(keys, kind='stable')
+    failure_log_df = failure_log_df.sort_values(keys, kind='stable')
+    
+    chunks = (sensor_df.iloc[i:i + chunk_size] for i in range(0, len(sensor_df), chunk_size))
+    parts = list(stream_merge(chunks, [failure_log_df], direction=direction, tolerance=tolerance))
+    if parts:
+        merged = pd.concat(parts, ignore_index=True)
+    else:
+        merged = _merge_chunk(sensor_df, failure_log_df, direction, tolerance)
     
     print(f"Merged dataset size: {len(merged)} records")
     
     return merged
 
 
-def get_data_summary(df):
+def _read_sorted_chunks(path, chunk_size, dtype=None):
+    """CSV chunks with parsed timestamps, for stream_merge"""
+    for chunk in pd.read_csv(path, dtype=dtype, chunksize=chunk_size):
+        chunk[TIME_COLUMN] = pd.to_datetime(chunk[TIME_COLUMN], format=TIMESTAMP_FORMAT)
+        yield chunk
+
+
+def merge_sensor_files(sensor_path, failure_log_path, output_path, direction='forward', tolerance=None,
+                       chunk_size=100_000):
+    """
+    Join a sensor CSV with a failure log CSV without loading either fully
+    
+    Both files must be sorted by (machine_id, timestamp), the order the
+    storage layer writes partitions in. Output is appended chunk by chunk
+    in the same order.
+    
+    Args:
+        sensor_path: Sensor readings CSV
+        failure_log_path: Failure / maintenance log CSV
+        output_path: Merged CSV to write
+        direction: 'forward' (next event) or 'backward' (last event)
+        tolerance: Optional maximum distance to the matched event
+        chunk_size: Rows read per chunk from each file
+        
+    Returns:
+        dict: Rows written, matched rows, elapsed seconds and peak RSS
+    """
+    header = pd.read_csv(sensor_path, nrows=0).columns
+    sensor_chunks = _read_sorted_chunks(sensor_path, chunk_size, dtype=read_dtypes(header))
+    failure_chunks = _read_sorted_chunks(failure_log_path, chunk_size)
+    failure_columns = [c for c in pd.read_csv(failure_log_path, nrows=0).columns if c not in header]
+    
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    stats = {'rows_out': 0, 'matched': 0}
+    start = time.perf_counter()
+    
+    for merged in stream_merge(sensor_chunks, failure_chunks, direction=direction, tolerance=tolerance):
+        merged = optimize_dtypes(merged)
+        merged.to_csv(output_path, mode='w' if stats['rows_out'] == 0 else 'a',
+                      index=False, header=stats['rows_out'] == 0)
+        stats['rows_out'] += len(merged)
+        if failure_columns:
+            stats['matched'] += int(merged[failure_columns].notna().any(axis=1).sum())
+    
+    stats['seconds'] = time.perf_counter() - start
+    stats['peak_rss_mb'] = peak_rss_mb()
+    
+    print(f"Merged {stats['rows_out']:,} records ({stats['matched']:,} matched) "
+          f"in {stats['seconds']:.1f}s")
+    
+    return stats
+
+
+def get_data_summary(df, chunk_size=100_000, output_path=None):
     """
     Print summary statistics of the dataset
     
+    Statistics come from one streaming pass of the profiler rather than a
+    separate pass each for nulls, unique machines and describe().
+    
     Args:
         df: Input DataFrame
+        chunk_size: Rows profiled at a time
+        output_path: Optional JSON path for the full per-machine profile
+        
+    Returns:
+        dict: Profile summary (see StreamingProfiler.summary)
     """
+    profiler = profile_chunks(df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size))
+    if output_path:
+        profiler.to_json(output_path)
+    profile = profiler.summary(per_machine=False)
+    columns = profile['columns']
+    
     print("\n=== Data Summary ===")
-    print(f"Total records: {len(df)}")
-    print(f"Unique machines: {df['machine_id'].nunique()}")
+    print(f"Total records: {profile['rows']}")
+    print(f"Unique machines: {profile['machines']}")
     print(f"\nMissing values:")
-    print(df.isnull().sum())
+    print(pd.Series({col: stats['nulls'] for col, stats in columns.items()}).to_string())
     print(f"\nSensor statistics:")
-    print(df[['vibration', 'temperature', 'pressure']].describe())
+    sensors = {
+        col: {'count': stats['count'], 'mean': stats.get('mean'), 'std': stats.get('std'),
+              'min': stats.get('min'), **stats.get('quantiles', {}), 'max': stats.get('max')}
+        for col, stats in columns.items() if col in SENSOR_COLUMNS
+    }
+    print(pd.DataFrame(sensors).to_string())
+    
+    return profile
     
 
 if __name__ == "__main__":
@@ -0,0 +1,337 @@
+"""
+FactoryGuard AI - External-Memory XGBoost Training
+Train on datasets larger than RAM by streaming partitions through XGBoost
+
+The in-memory path (training.prepare_data) materialises X_train, which
+multi-plant data will not fit. Here the modeling-ready dataset is streamed
+batch by batch (storage.iter_dataset: Parquet row groups, or CSV chunks)
+through an xgboost.DataIter into an ExtMemQuantileDMatrix. XGBoost
+quantises each batch to histogram bins and keeps the pages in an on-disk
+cache, so only the current batch and the pages in use are resident.
+
+ExtMemQuantileDMatrix on CPU needs xgboost 3.0. The serving stack stays on
+the xgboost pinned in requirements.txt (its shap release cannot read
+boosters from newer xgboost), so this path is optional: it checks the
+installed version and is run from a training environment set up with
+requirements_extmem.txt (exercised by the external-memory CI workflow).
+
+The temporal 70/30 cut is computed from streamed timestamp counts, so it
+matches training.temporal_split without loading the data. A memory limit
+sizes the batches and is enforced after every boosting round, and each
+round's time, throughput and resident memory are recorded.
+
+Usage:
+    python src/external_memory.py --memory-limit-mb 1024 --rounds 300
+"""
+
+import argparse
+import gc
+import json
+import math
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import f1_score, recall_score
+
+try:
+    from .schema import TIME_COLUMN, current_rss_mb, peak_rss_mb
+    from .storage import iter_dataset
+    from .training import DATA_PATH, MODELS_DIR, PROJECT_ROOT, TARGET, TRAIN_FRACTION, feature_columns, save_model
+except ImportError:  # run as a script from src/
+    from schema import TIME_COLUMN, current_rss_mb, peak_rss_mb
+    from storage import iter_dataset
+    from training import DATA_PATH, MODELS_DIR, PROJECT_ROOT, TARGET, TRAIN_FRACTION, feature_columns, save_model
+
+
+# CPU external-memory matrices (ExtMemQuantileDMatrix with hist) first shipped in 3.0
+HAS_EXTMEM = (hasattr(xgb, 'ExtMemQuantileDMatrix')
+              and tuple(int(part) for part in xgb.__version__.split('.')[:2]) >= (3, 0))
+
+EXTMEM_CACHE_DIR = PROJECT_ROOT / 'data' / 'cache' / 'xgb_external'
+REPORT_PATH = PROJECT_ROOT / 'reports' / 'external_memory_training.json'
+
+DEFAULT_BATCH_ROWS = 64 * 1024
+MIN_BATCH_ROWS = 4096
+# Share of the memory limit one in-flight batch may take
+BATCH_MEMORY_SHARE = 0.1
+
+
+def batch_rows_for(memory_limit_mb, n_columns, share=BATCH_MEMORY_SHARE):
+    """
+    Rows per streamed batch under a memory limit
+
+    A batch is held as a pandas frame and as the float32 copy handed to
+    XGBoost; 8 bytes per value covers both.
+    """
+    if memory_limit_mb is None:
+        return DEFAULT_BATCH_ROWS
+    bytes_per_row = 8 * (n_columns + 2)
+    return max(MIN_BATCH_ROWS, int(memory_limit_mb * 1024 ** 2 * share // bytes_per_row))
+
+
+def temporal_cutoff(data_path=DATA_PATH, train_fraction=TRAIN_FRACTION, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Timestamp quantile of the train/test cut, from streamed timestamp counts
+
+    Equal to df['timestamp'].quantile(train_fraction) over the whole dataset,
+    with memory proportional to the number of distinct timestamps.
+    """
+    counts = None
+    for chunk in iter_dataset(data_path, columns=[TIME_COLUMN], batch_rows=batch_rows):
+        batch_counts = chunk[TIME_COLUMN].value_counts()
+        counts = batch_counts if counts is None else counts.add(batch_counts, fill_value=0)
+    if counts is None:
+        raise ValueError(f"No rows in {data_path}")
+
+    counts = counts.sort_index()
+    values = counts.index.to_numpy(dtype='datetime64[ns]').astype('int64')
+    rows_upto = counts.to_numpy().cumsum()
+    # Linear interpolation between the rows at the floor and ceiling positions
+    position = train_fraction * (rows_upto[-1] - 1)
+    low, high = (values[np.searchsorted(rows_upto, p, side='right')]
+                 for p in (math.floor(position), math.ceil(position)))
+    return pd.Timestamp(int(low + (high - low) * (position - math.floor(position))))
+
+
+class PartitionIter(xgb.DataIter):
+    """
+    Feeds a time range of the dataset to XGBoost one batch at a time
+
+    XGBoost makes several passes (sketching, then page building); rows and
+    positives are counted on the first.
+    """
+
+    def __init__(self, data_path, feature_cols, target=TARGET, start=None, end=None,
+                 batch_rows=DEFAULT_BATCH_ROWS, cache_prefix=None):
+        super().__init__(cache_prefix=None if cache_prefix is None else str(cache_prefix))
+        self.data_path = data_path
+        self.feature_cols = list(feature_cols)
+        self.target = target
+        self.start, self.end = start, end
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self.positives = 0
+        self.passes = 0
+        self._batches = None
+
+    def reset(self):
+        self._batches = None
+
+    def next(self, input_data):
+        if self._batches is None:
+            self._batches = iter_dataset(self.data_path, columns=self.feature_cols + [self.target],
+                                         start=self.start, end=self.end, batch_rows=self.batch_rows)
+            self.passes += 1
+        chunk = next(self._batches, None)
+        if chunk is None:
+            return False
+
+        label = chunk[self.target].to_numpy(dtype=np.float32)
+        if self.passes == 1:
+            self.rows += len(label)
+            self.positives += int(label.sum())
+        input_data(data=chunk[self.feature_cols].to_numpy(dtype=np.float32), label=label,
+                   feature_names=self.feature_cols)
+        return True
+
+
+class RoundMonitor(xgb.callback.TrainingCallback):
+    """
+    Per-round wall time, throughput and memory, with a hard memory limit
+
+    rss_mb is the resident memory after the round; peak_rss_mb the process
+    high-water mark so far. Exceeding memory_limit_mb stops training and
+    sets exceeded to (round, rss_mb).
+    """
+
+    def __init__(self, n_rows, memory_limit_mb=None, verbose=True, print_every=10):
+        self.n_rows = n_rows
+        self.memory_limit_mb = memory_limit_mb
+        self.verbose = verbose
+        self.print_every = print_every
+        self.rounds = []
+        self.exceeded = None
+        self._last = None
+
+    def before_training(self, model):
+        self._last = time.perf_counter()
+        return model
+
+    def after_iteration(self, model, epoch, evals_log):
+        now = time.perf_counter()
+        seconds, self._last = now - self._last, now
+        rss = current_rss_mb()
+        record = {
+            'round': epoch,
+            'seconds': round(seconds, 4),
+            'rows_per_second': round(self.n_rows / seconds) if seconds > 0 else None,
+            'rss_mb': None if rss is None else round(rss, 1),
+            'peak_rss_mb': round(peak_rss_mb() or 0, 1),
+        }
+        for data, metrics in evals_log.items():
+            for metric, values in metrics.items():
+                record[f'{data}-{metric}'] = float(values[-1])
+        self.rounds.append(record)
+
+        if self.verbose and epoch % self.print_every == 0:
+            print(f"  round {epoch:4d}: {record['seconds']:.3f}s, {record['rows_per_second']:,} rows/s, "
+                  f"RSS {record['rss_mb']} MB (peak {record['peak_rss_mb']} MB)")
+        if self.memory_limit_mb is not None and rss is not None and rss > self.memory_limit_mb:
+            self.exceeded = (epoch, rss)
+            return True
+        return False
+
+
+def as_classifier(booster):
+    """Wrap a trained Booster as an XGBClassifier for the API and save_model"""
+    model = xgb.XGBClassifier()
+    model.load_model(bytearray(booster.save_raw(raw_format='json')))
+    return model
+
+
+def train_external_memory(data_path=DATA_PATH, params=None, num_boost_round=300, train_fraction=TRAIN_FRACTION,
+                          target=TARGET, memory_limit_mb=None, batch_rows=None, cache_dir=EXTMEM_CACHE_DIR,
+                          verbose=True):
+    """
+    Train XGBoost from on-disk partitions through external-memory matrices
+
+    Args:
+        data_path: Modeling-ready dataset (CSV path or Parquet copy)
+        params: Booster parameters (e.g. tuned best_params)
+        num_boost_round: Boosting rounds
+        train_fraction: Timestamp quantile of the train/test cut
+        target: Label column
+        memory_limit_mb: Resident memory cap; sizes batches, and MemoryError is raised
+                         (after cleanup) when a round ends above it
+        batch_rows: Rows per streamed batch (default: derived from the limit)
+        cache_dir: Parent directory of the temporary page cache
+
+    Returns:
+        tuple: (Booster, report dict with per-round statistics and test metrics)
+    """
+    if not HAS_EXTMEM:
+        raise ImportError(f"External-memory training needs xgboost>=3.0, found {xgb.__version__}; "
+                          f"install requirements_extmem.txt in a training environment")
+    first = next(iter_dataset(data_path, batch_rows=1000))
+    feature_cols = feature_columns(first)
+    batch_rows = batch_rows or batch_rows_for(memory_limit_mb, len(feature_cols))
+    cutoff = temporal_cutoff(data_path, train_fraction, batch_rows=batch_rows)
+    train_end = cutoff + pd.Timedelta(1, 'ns')
+    if verbose:
+        print(f"External memory: {len(feature_cols)} features, batches of {batch_rows:,} rows, "
+              f"train up to {cutoff}")
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    page_dir = Path(tempfile.mkdtemp(dir=cache_dir))
+    dtrain = dtest = None
+    try:
+        start = time.perf_counter()
+        train_iter = PartitionIter(data_path, feature_cols, target, end=train_end, batch_rows=batch_rows,
+                                   cache_prefix=page_dir / 'train')
+        max_bin = (params or {}).get('max_bin', 256)
+        dtrain = xgb.ExtMemQuantileDMatrix(train_iter, max_bin=max_bin)
+        test_iter = PartitionIter(data_path, feature_cols, target, start=train_end, batch_rows=batch_rows,
+                                  cache_prefix=page_dir / 'test')
+        dtest = xgb.ExtMemQuantileDMatrix(test_iter, max_bin=max_bin, ref=dtrain)
+        build_seconds = time.perf_counter() - start
+        cache_mb = sum(p.stat().st_size for p in page_dir.rglob('*') if p.is_file()) / 1024 ** 2
+        if verbose:
+            print(f"Quantised {train_iter.rows:,} train / {test_iter.rows:,} test rows in {build_seconds:.1f}s "
+                  f"({cache_mb:.0f} MB page cache, RSS {current_rss_mb():.0f} MB)")
+
+        booster_params = {
+            'objective': 'binary:logistic',
+            'tree_method': 'hist',
+            'eval_metric': 'aucpr',
+            'seed': 42,
+            'scale_pos_weight': (train_iter.rows - train_iter.positives) / max(train_iter.positives, 1),
+            **{k: v for k, v in (params or {}).items() if k != 'n_estimators'},
+        }
+        monitor = RoundMonitor(train_iter.rows, memory_limit_mb=memory_limit_mb, verbose=verbose)
+        start = time.perf_counter()
+        booster = xgb.train(booster_params, dtrain, num_boost_round=num_boost_round,
+                            evals=[(dtest, 'test')], callbacks=[monitor], verbose_eval=False)
+        train_seconds = time.perf_counter() - start
+
+        y_test = dtest.get_label().astype(int)
+        y_pred = (booster.predict(dtest) >= 0.5).astype(int)
+    finally:
+        # Release the matrices before their pages are deleted
+        del dtrain, dtest
+        gc.collect()
+        shutil.rmtree(page_dir, ignore_errors=True)
+
+    if monitor.exceeded:
+        epoch, rss = monitor.exceeded
+        raise MemoryError(f"Resident memory {rss:.0f} MB exceeds the {memory_limit_mb} MB limit "
+                          f"after round {epoch}; lower batch_rows or max_bin")
+    rounds = monitor.rounds
+    report = {
+        'data_path': str(data_path),
+        'train_rows': train_iter.rows,
+        'test_rows': test_iter.rows,
+        'features': len(feature_cols),
+        'train_cutoff': str(cutoff),
+        'batch_rows': batch_rows,
+        'memory_limit_mb': memory_limit_mb,
+        'page_cache_mb': round(cache_mb, 1),
+        'build_seconds': round(build_seconds, 2),
+        'train_seconds': round(train_seconds, 2),
+        'rounds_trained': len(rounds),
+        'mean_rows_per_second': round(train_iter.rows * len(rounds) / train_seconds) if train_seconds else None,
+        'peak_rss_mb': max((r['peak_rss_mb'] for r in rounds), default=None),
+        'params': booster_params,
+        'f1_score': float(f1_score(y_test, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_test, y_pred, zero_division=0)),
+        'rounds': rounds,
+    }
+    return booster, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FactoryGuard AI external-memory XGBoost training')
+    parser.add_argument('--data', default=str(DATA_PATH), help='Modeling-ready dataset')
+    parser.add_argument('--rounds', type=int, default=None,
+                        help='Boosting rounds (default: tuned n_estimators, else 300)')
+    parser.add_argument('--memory-limit-mb', type=float, default=None, help='Resident memory cap')
+    parser.add_argument('--batch-rows', type=int, default=None, help='Rows per streamed batch')
+    parser.add_argument('--params-from', default=str(MODELS_DIR / 'model_metadata.json'),
+                        help='Metadata whose best_params are used')
+    parser.add_argument('--report', default=str(REPORT_PATH), help='Per-round report output')
+    parser.add_argument('--save', action='store_true', help='Save as the production model')
+    args = parser.parse_args()
+
+    params = {}
+    if Path(args.params_from).exists():
+        with open(args.params_from) as f:
+            params = json.load(f).get('best_params') or {}
+    rounds = args.rounds or int(params.get('n_estimators', 300))
+
+    booster, report = train_external_memory(args.data, params=params, num_boost_round=rounds,
+                                            memory_limit_mb=args.memory_limit_mb, batch_rows=args.batch_rows)
+    print(f"\nTrained {report['rounds_trained']} rounds in {report['train_seconds']:.1f}s "
+          f"({report['mean_rows_per_second']:,} rows/s), peak RSS {report['peak_rss_mb']} MB")
+    print(f"F1-Score: {report['f1_score']:.4f}")
+    print(f"Recall: {report['recall']:.4f}")
+
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {args.report}")
+
+    if args.save:
+        model = as_classifier(booster)
+        save_model(model, booster.feature_names, report, metadata={
+            'training_mode': 'external_memory',
+            'best_params': params,
+            'external_memory': {k: v for k, v in report.items() if k not in ('rounds', 'f1_score', 'recall')},
+        })
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,13 @@ lag features, and exponential moving averages.
 import pandas as pd
 import numpy as np
 
+try:
+    from .time_windows import time_rolling_statistics
+    from .schema import optimize_dtypes
+except ImportError:  # run with src/ on sys.path
+    from time_windows import time_rolling_statistics
+    from schema import optimize_dtypes
+
 
 def create_lag_features(df, columns, lags=[1, 2, 3]):
     """
@@ -26,7 +33,7 @@ def create_lag_features(df, columns, lags=[1, 2, 3]):
     
     for col in columns:
         for lag in lags:
-            df[f'{col}_lag_{lag}'] = df.groupby('machine_id')[col].shift(lag)
+            df[f'{col}_lag_{lag}'] = df.groupby('machine_id', observed=True)[col].shift(lag)
     
     print(f"Created {len(columns) * len(lags)} lag features")
     
@@ -35,7 +42,10 @@ def create_lag_features(df, columns, lags=[1, 2, 3]):
 
 def create_rolling_statistics(df, columns, windows=[1, 4, 8]):
     """
-    Create rolling window statistics
+    Create time-based rolling window statistics
+    
+    Windows are time offsets per machine ('4h' covers (t - 4h, t]), so
+    irregular or dropped samples are handled without resampling first.
     
     Args:
         df: Input DataFrame
@@ -47,33 +57,11 @@ def create_rolling_statistics(df, columns, windows=[1, 4, 8]):
     """
     df = df.sort_values(['machine_id', 'timestamp'])
     
-    feature_count = 0
+    # Mean, std (stability indicator), max and min for every window in one sweep
+    features = time_rolling_statistics(df, columns, windows=windows)
+    df = df.assign(**features)
     
-    for col in columns:
-        for window in windows:
-            # Rolling mean
-            df[f'{col}_rolling_mean_{window}h'] = df.groupby('machine_id')[col].transform(
-                lambda x: x.rolling(window=window, min_periods=1).mean()
-            )
-            
-            # Rolling std (stability indicator)
-            df[f'{col}_rolling_std_{window}h'] = df.groupby('machine_id')[col].transform(
-                lambda x: x.rolling(window=window, min_periods=1).std()
-            )
-            
-            # Rolling max
-            df[f'{col}_rolling_max_{window}h'] = df.groupby('machine_id')[col].transform(
-                lambda x: x.rolling(window=window, min_periods=1).max()
-            )
-            
-            # Rolling min
-            df[f'{col}_rolling_min_{window}h'] = df.groupby('machine_id')[col].transform(
-                lambda x: x.rolling(window=window, min_periods=1).min()
-            )
-            
-            feature_count += 4
-    
-    print(f"Created {feature_count} rolling window features")
+    print(f"Created {len(features)} rolling window features")
     
     return df
 
@@ -94,8 +82,8 @@ def create_ema_features(df, columns, spans=[2, 4, 8]):
     
     for col in columns:
         for span in spans:
-            df[f'{col}_ema_{span}h'] = df.groupby('machine_id')[col].transform(
-                lambda x: x.ewm(span=span, adjust=False).mean()
+            df[f'{col}_ema_{span}h'] = df.groupby('machine_id', observed=True)[col].transform(
+                lambda x: x.astype('float64').ewm(span=span, adjust=False).mean()
             )
     
     print(f"Created {len(columns) * len(spans)} EMA features")
@@ -160,6 +148,9 @@ def create_all_features(df):
     df = df.dropna()
     print(f"\nDropped {initial_len - len(df)} rows with NaN from feature creation")
     
+    # Features were accumulated in float64; store them as float32
+    df = optimize_dtypes(df, verbose=True)
+    
     print(f"Final feature count: {len(df.columns)}")
     
     return df
@@ -1,12 +1,246 @@
 """
 Sample Sensor Data Generator for Testing
 This script generates synthetic sensor data for development and testing purposes.
+
+Each machine is generated with array operations from its own random stream,
+seeded from (seed, machine_id), so a machine's readings do not depend on how
+many other machines are generated, in which order, or by which worker. Large
+datasets (100M+ rows) are streamed to disk a batch of machines at a time and
+can be generated by several processes in parallel with identical output.
 """
 
+import io
+from collections import deque
+
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .schema import TIMESTAMP_FORMAT
+except ImportError:  # run with src/ on sys.path
+    from schema import TIMESTAMP_FORMAT
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+COLUMNS = ['timestamp', 'machine_id', 'vibration', 'temperature', 'pressure', 'failure']
+
+START_TIME = '2024-01-01'
+
+# How readings drift before a failure: each sensor moves by up to its shift,
+# ramping up linearly over window_hours before the failure
+FAILURE_PROFILES = {
+    'gradual': {'window_hours': 48, 'vibration': 0.3, 'temperature': 15.0, 'pressure': -5.0},
+    'sudden': {'window_hours': 6, 'vibration': 0.6, 'temperature': 25.0, 'pressure': -8.0},
+    'thermal': {'window_hours': 72, 'vibration': 0.1, 'temperature': 30.0, 'pressure': -2.0},
+}
+
+
+def make_timestamps(n_days, hourly_samples=1, start=START_TIME):
+    """Sampling times shared by every machine"""
+    step = pd.Timedelta(hours=1) / hourly_samples
+    return pd.date_range(start, periods=int(n_days * 24 * hourly_samples), freq=step)
+
+
+def resolve_failure_profile(profile):
+    """Failure profile dict from a name, a dict of overrides, or None (gradual)"""
+    if profile is None:
+        return dict(FAILURE_PROFILES['gradual'])
+    if isinstance(profile, str):
+        if profile not in FAILURE_PROFILES:
+            raise ValueError(f"Unknown failure profile '{profile}', expected one of {list(FAILURE_PROFILES)}")
+        return dict(FAILURE_PROFILES[profile])
+    return {**FAILURE_PROFILES['gradual'], **profile}
+
+
+def machine_rng(seed, machine_id):
+    """Independent, reproducible random stream for one machine"""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(int(machine_id),)))
+
+
+def degradation_ramp(failures, window):
+    """
+    Summed pre-failure degradation for every sample
+
+    Equivalent to adding 1 - k / window at k = 1..window samples before each
+    failure, built from two cumulative sums instead of a loop per failure.
+
+    Args:
+        failures: Boolean array, True at failure samples
+        window: Ramp length in samples
+
+    Returns:
+        np.ndarray of float64, 0 away from failures
+    """
+    n = len(failures)
+    if window < 1:
+        return np.zeros(n)
+    idx = np.flatnonzero(failures) + window  # shifted so ramps never start before 0
+    slope = np.zeros(n + window + 1)
+    # Rising by 1/window from f - window + 1 up to f - 1, then back to 0 at f
+    slope[idx - window + 1] += 1 / window
+    slope[idx] -= 1 / window
+    steps = np.cumsum(slope)
+    steps[idx] -= (window - 1) / window
+    return np.cumsum(steps)[window:window + n]
+
+
+def generate_machine(machine_id, timestamps, seed=None, failure_rate=0.005, hourly_samples=1,
+                     failure_profile=None):
+    """
+    Readings of one machine, built with array operations
+
+    Args:
+        machine_id: Machine identifier
+        timestamps: Sampling times (DatetimeIndex)
+        seed: Base seed; the machine's stream is derived from (seed, machine_id)
+        failure_rate: Probability of a failure at each sample
+        hourly_samples: Samples per hour (sets the ramp length in samples)
+        failure_profile: Profile name, dict of overrides, or None
+
+    Returns:
+        DataFrame with COLUMNS
+    """
+    profile = resolve_failure_profile(failure_profile)
+    rng = machine_rng(seed, machine_id)
+    n = len(timestamps)
+
+    # Each machine has a slightly different baseline
+    base_vibration = rng.uniform(0.3, 0.5)
+    base_temp = rng.uniform(60, 70)
+    base_pressure = rng.uniform(100, 105)
+
+    failures = rng.random(n) < failure_rate
+    degradation = degradation_ramp(failures, int(round(profile['window_hours'] * hourly_samples)))
+
+    vibration = base_vibration + rng.normal(0, 0.05, n) + degradation * profile['vibration']
+    temperature = base_temp + rng.normal(0, 2, n) + degradation * profile['temperature']
+    pressure = base_pressure + rng.normal(0, 1, n) + degradation * profile['pressure']
+
+    # Add some correlations (realistic physics)
+    temperature += vibration * 10  # High vibration causes heat
+
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'machine_id': np.full(n, machine_id, dtype=np.int64),
+        'vibration': vibration.round(3),
+        'temperature': temperature.round(2),
+        'pressure': pressure.round(2),
+        'failure': failures.astype(np.int8),
+    }, columns=COLUMNS)
+
+
+def _batch_to_csv(df, timestamps):
+    """
+    CSV bytes (no header) of a machine-ordered batch
+
+    Formatting dominates generation time, so pyarrow's writer is used when
+    available, with timestamps formatted once and repeated per machine.
+    pyarrow writes whole floats without '.0' (102 rather than 102.0); both
+    parse to the same values.
+    """
+    if not HAS_PYARROW:
+        return df.to_csv(index=False, header=False, date_format=TIMESTAMP_FORMAT).encode()
+
+    formatted = pa.array(timestamps.strftime(TIMESTAMP_FORMAT).to_numpy(dtype=object), type=pa.string())
+    positions = np.tile(np.arange(len(timestamps)), len(df) // len(timestamps))
+    table = pa.Table.from_pandas(df.drop(columns='timestamp'), preserve_index=False)
+    table = table.add_column(0, 'timestamp', formatted.take(pa.array(positions)))
+    buffer = io.BytesIO()
+    pa_csv.write_csv(table, buffer, pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+    return buffer.getvalue()
+
+
+def _machine_batch_csv(machine_ids, n_days, hourly_samples, seed, failure_rate, failure_profile):
+    """CSV bytes (no header) of a batch of machines; runs in worker processes"""
+    timestamps = make_timestamps(n_days, hourly_samples)
+    frames = [
+        generate_machine(machine_id, timestamps, seed, failure_rate, hourly_samples, failure_profile)
+        for machine_id in machine_ids
+    ]
+    df = pd.concat(frames, ignore_index=True)
+    return _batch_to_csv(df, timestamps), len(df), int(df['failure'].sum())
+
+
+def _ordered_results(pool, batches, args, depth):
+    """Batch results in submission order, with at most depth batches in flight"""
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.submit(_machine_batch_csv, batch, *args))
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def write_sensor_data(output_path, n_machines=1000, n_days=365, hourly_samples=1, failure_rate=0.005,
+                      failure_profile=None, seed=42, rows_per_batch=1_000_000, workers=1):
+    """
+    Stream a large synthetic dataset to CSV with bounded memory
+
+    Machines are generated in batches of about rows_per_batch rows and
+    appended in machine order, so the file is sorted by (machine_id,
+    timestamp). With workers > 1 batches are generated and formatted in
+    parallel processes; the output is byte-for-byte the same.
+
+    Args:
+        output_path: CSV path to write
+        n_machines: Number of machines (ids 1..n_machines)
+        n_days: Number of days of data
+        hourly_samples: Samples per hour
+        failure_rate: Probability of a failure at each sample
+        failure_profile: Profile name, dict of overrides, or None
+        seed: Base seed (None draws a fresh one)
+        rows_per_batch: Approximate rows generated per batch
+        workers: Parallel generator processes
+
+    Returns:
+        dict: rows, failures, seconds, rows_per_second
+    """
+    resolve_failure_profile(failure_profile)  # fail fast on a bad profile
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    samples = len(make_timestamps(n_days, hourly_samples))
+    per_batch = max(1, rows_per_batch // max(samples, 1))
+    batches = [
+        list(range(first, min(first + per_batch, n_machines + 1)))
+        for first in range(1, n_machines + 1, per_batch)
+    ]
+    args = (n_days, hourly_samples, seed, failure_rate, failure_profile)
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    stats = {'rows': 0, 'failures': 0}
+    start = time.perf_counter()
+    def write(f, results):
+        for data, rows, failures in results:
+            f.write(data)
+            stats['rows'] += rows
+            stats['failures'] += failures
+
+    with open(output_path, 'wb') as f:
+        f.write((','.join(COLUMNS) + '\n').encode())
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                write(f, _ordered_results(pool, batches, args, depth=2 * workers))
+        else:
+            write(f, (_machine_batch_csv(batch, *args) for batch in batches))
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"✓ Wrote {stats['rows']:,} rows ({stats['failures']:,} failures) to {output_path} "
+          f"in {stats['seconds']:.1f}s ({stats['rows_per_second']:,.0f} rows/s)")
+    return stats
 
 
 def generate_sample_sensor_data(
@@ -14,111 +248,87 @@ def generate_sample_sensor_data(
     n_days=30,
     hourly_samples=1,
     failure_rate=0.005,
-    output_path='data/raw/sensor_logs.csv'
+    output_path='data/raw/sensor_logs.csv',
+    seed=None,
+    failure_profile=None
 
 ):
     """
     Generate synthetic sensor data for testing
-    
+
     Args:
         n_machines: Number of machines to simulate
         n_days: Number of days of data
         hourly_samples: Samples per hour
         failure_rate: Probability of failure (default 0.5%)
         output_path: Path to save the generated data
+        seed: Base seed for reproducible data (None draws a fresh one)
+        failure_profile: Name in FAILURE_PROFILES or dict of overrides
     """
-    
+
     print(f"Generating sensor data for {n_machines} machines over {n_days} days...")
-    
-    # Time range
-    start_time = datetime(2024, 1, 1)
-    timestamps = []
-    current_time = start_time
-    
-    for _ in range(n_days * 24 * hourly_samples):
-        timestamps.append(current_time)
-        current_time += timedelta(hours=1/hourly_samples)
-    
-    data = []
-    
-    for machine_id in range(1, n_machines + 1):
-        # Base parameters for this machine (each machine has slightly different baseline)
-        base_vibration = np.random.uniform(0.3, 0.5)
-        base_temp = np.random.uniform(60, 70)
-        base_pressure = np.random.uniform(100, 105)
-        
-        # Generate failure events for this machine
-        failure_times = []
-        for ts in timestamps:
-            if np.random.random() < failure_rate:
-                failure_times.append(ts)
-        
-        for ts in timestamps:
-            # Normal operation with some noise
-            vibration = base_vibration + np.random.normal(0, 0.05)
-            temperature = base_temp + np.random.normal(0, 2)
-            pressure = base_pressure + np.random.normal(0, 1)
-            
-            # If approaching failure (within 24-48 hours), increase degradation
-            time_to_failure = None
-            is_failure = 0
-            
-            for failure_time in failure_times:
-                hours_to_failure = (failure_time - ts).total_seconds() / 3600
-                
-                if hours_to_failure == 0:
-                    is_failure = 1
-                
-                if 0 < hours_to_failure <= 48:
-                    # Gradual degradation before failure
-                    degradation_factor = 1 - (hours_to_failure / 48)
-                    
-                    vibration += degradation_factor * 0.3  # Increase vibration
-                    temperature += degradation_factor * 15  # Increase temperature
-                    pressure -= degradation_factor * 5  # Decrease pressure
-            
-            # Add some correlations (realistic physics)
-            temperature += vibration * 10  # High vibration causes heat
-            
-            data.append({
-                'timestamp': ts,
-                'machine_id': machine_id,
-                'vibration': round(vibration, 3),
-                'temperature': round(temperature, 2),
-                'pressure': round(pressure, 2),
-                'failure': is_failure
-            })
-    
+
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    timestamps = make_timestamps(n_days, hourly_samples)
+
     # Create DataFrame
-    df = pd.DataFrame(data)
-    
+    df = pd.concat([
+        generate_machine(machine_id, timestamps, seed, failure_rate, hourly_samples, failure_profile)
+        for machine_id in range(1, n_machines + 1)
+    ], ignore_index=True)
+
     # **FIX: Create output directory if it doesn't exist**
     output_dir = os.path.dirname(output_path)
     if output_dir:  # Only create if there's a directory component
         os.makedirs(output_dir, exist_ok=True)
         print(f"\n✓ Created directory: {output_dir}")
-    
+
     # Save to CSV
-    df.to_csv(output_path, index=False)
-    
+    df.to_csv(output_path, index=False, date_format=TIMESTAMP_FORMAT)
+
     print(f"\n✓ Generated {len(df)} sensor records")
     print(f"✓ Machines: {n_machines}")
     print(f"✓ Time range: {df['timestamp'].min()} to {df['timestamp'].max()}")
     print(f"✓ Total failures: {df['failure'].sum()}")
     print(f"✓ Failure rate: {(df['failure'].sum() / len(df)) * 100:.3f}%")
     print(f"✓ Saved to: {output_path}")
-    
+
     return df
 
 
 if __name__ == "__main__":
-    # Generate sample data
-    df = generate_sample_sensor_data(
-        n_machines=10,
-        n_days=30,
-        hourly_samples=1,
-        failure_rate=0.005
-    )
-    
-    print("\n=== Sample Records ===")
-    print(df.head(10))
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate synthetic sensor data')
+    parser.add_argument('--machines', type=int, default=10)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--hourly-samples', type=int, default=1)
+    parser.add_argument('--failure-rate', type=float, default=0.005)
+    parser.add_argument('--profile', default='gradual', choices=list(FAILURE_PROFILES))
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default='data/raw/sensor_logs.csv')
+    parser.add_argument('--workers', type=int, default=1, help='Stream to disk with this many processes')
+    parser.add_argument('--stream', action='store_true', help='Stream to disk instead of building in memory')
+    args = parser.parse_args()
+
+    if args.stream or args.workers > 1:
+        write_sensor_data(
+            args.output, n_machines=args.machines, n_days=args.days, hourly_samples=args.hourly_samples,
+            failure_rate=args.failure_rate, failure_profile=args.profile,
+            seed=42 if args.seed is None else args.seed, workers=args.workers
+        )
+    else:
+        # Generate sample data
+        df = generate_sample_sensor_data(
+            n_machines=args.machines,
+            n_days=args.days,
+            hourly_samples=args.hourly_samples,
+            failure_rate=args.failure_rate,
+            output_path=args.output,
+            seed=args.seed,
+            failure_profile=args.profile
+        )
+
+        print("\n=== Sample Records ===")
+        print(df.head(10))
@@ -0,0 +1,271 @@
+"""
+FactoryGuard AI - Successive Halving Search for XGBoost
+Hyperparameter search that spends boosting rounds on promising candidates only
+
+Random search trains every candidate to its full n_estimators, although most
+candidates are clearly worse after a few dozen rounds. Here the number of
+boosting rounds is the budget: all candidates get a small number of rounds,
+the best 1/eta by validation aucpr keep training (continuing their boosters,
+not starting over) to eta times as many rounds, and so on up to max_rounds.
+Each candidate also stops early once its aucpr has not improved for
+early_stopping_rounds. Hyperband runs several halving brackets that trade
+the number of candidates against their starting budget.
+
+Validation uses a temporal fold: the latest part of the training period.
+A time budget caps the whole search; when it runs out, the best candidate
+seen so far is returned.
+"""
+
+import math
+import time
+
+import numpy as np
+import xgboost as xgb
+from scipy.stats import randint, uniform
+
+
+# Same space as the random search; n_estimators is the halving budget instead
+PARAM_DISTRIBUTIONS = {
+    'max_depth': randint(3, 10),
+    'learning_rate': uniform(0.01, 0.3),
+    'subsample': uniform(0.6, 0.4),
+    'colsample_bytree': uniform(0.6, 0.4),
+    'min_child_weight': randint(1, 10),
+    'gamma': uniform(0, 0.5)
+}
+
+EVAL_METRIC = 'aucpr'
+
+
+def sample_candidates(n_candidates, param_distributions=PARAM_DISTRIBUTIONS, seed=42):
+    """
+    Draw hyperparameter sets as plain Python values
+
+    Returns:
+        list of dict
+    """
+    rng = np.random.default_rng(seed)
+    candidates = [{} for _ in range(n_candidates)]
+    for name, dist in param_distributions.items():
+        values = dist.rvs(size=n_candidates, random_state=rng)
+        for candidate, value in zip(candidates, values):
+            candidate[name] = value.item() if hasattr(value, 'item') else value
+    return candidates
+
+
+def temporal_validation_split(X, y, timestamps, validation_fraction=0.2):
+    """
+    Hold out the latest part of the training period
+
+    Args:
+        X, y: Training features and target
+        timestamps: Row timestamps aligned with X
+        validation_fraction: Share of the time span held out
+
+    Returns:
+        tuple: (X_fit, X_val, y_fit, y_val)
+    """
+    timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    cutoff = np.quantile(timestamps.astype('int64'), 1 - validation_fraction)
+    fit_mask = timestamps.astype('int64') <= cutoff
+    return X[fit_mask], X[~fit_mask], y[fit_mask], y[~fit_mask]
+
+
+class _Candidate:
+    """A hyperparameter set and its partly trained booster"""
+
+    def __init__(self, index, params):
+        self.index = index
+        self.params = params
+        self.booster = None
+        self.history = []  # Validation aucpr per round
+        self.stopped = False
+
+    @property
+    def rounds(self):
+        return len(self.history)
+
+    @property
+    def best_round(self):
+        return int(np.argmax(self.history)) if self.history else None
+
+    @property
+    def best_score(self):
+        return max(self.history) if self.history else -np.inf
+
+
+class _Monitor(xgb.callback.TrainingCallback):
+    """Record validation aucpr and stop on patience or the time budget"""
+
+    def __init__(self, candidate, patience, deadline):
+        super().__init__()
+        self.candidate = candidate
+        self.patience = patience
+        self.deadline = deadline
+
+    def after_iteration(self, model, epoch, evals_log):
+        candidate = self.candidate
+        candidate.history.append(float(evals_log['val'][EVAL_METRIC][-1]))
+        if candidate.rounds - 1 - candidate.best_round >= self.patience:
+            candidate.stopped = True
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+
+class HalvingSearch:
+    """
+    Successive halving / Hyperband over XGBoost boosting rounds
+    """
+
+    def __init__(self, base_params=None, n_candidates=27, min_rounds=20, max_rounds=500, eta=3,
+                 early_stopping_rounds=30, time_budget=None, method='halving',
+                 param_distributions=PARAM_DISTRIBUTIONS, seed=42, verbose=True):
+        """
+        Initialize search
+
+        Args:
+            base_params: Fixed XGBoost parameters (objective, scale_pos_weight, ...)
+            n_candidates: Candidates in the first rung (per bracket for Hyperband)
+            min_rounds: Boosting rounds every candidate gets
+            max_rounds: Rounds the last rung trains to
+            eta: Keep the best 1/eta each rung; rounds grow by eta
+            early_stopping_rounds: Stop a candidate after this many rounds without improvement
+            time_budget: Seconds for the whole search (None = no cap)
+            method: 'halving' or 'hyperband'
+            seed: Seed for sampling candidates
+        """
+        if method not in ('halving', 'hyperband'):
+            raise ValueError(f"method must be 'halving' or 'hyperband', got {method!r}")
+        self.base_params = dict(base_params or {})
+        self.n_candidates = n_candidates
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.eta = eta
+        self.early_stopping_rounds = early_stopping_rounds
+        self.time_budget = time_budget
+        self.method = method
+        self.param_distributions = param_distributions
+        self.seed = seed
+        self.verbose = verbose
+
+        self.candidates_ = []
+        self.best_ = None
+        self.rounds_trained_ = 0
+        self.seconds_ = 0.0
+        self.timed_out_ = False
+
+    def _rung_rounds(self, min_rounds):
+        """Round targets of one halving bracket, ending at max_rounds"""
+        n_rungs = max(1, int(math.floor(math.log(self.max_rounds / min_rounds, self.eta))) + 1)
+        return [int(round(self.max_rounds / self.eta ** (n_rungs - 1 - k))) for k in range(n_rungs)]
+
+    def _brackets(self):
+        """(n_candidates, min_rounds) per bracket"""
+        if self.method == 'halving':
+            return [(self.n_candidates, self.min_rounds)]
+        s_max = max(0, int(math.floor(math.log(self.max_rounds / self.min_rounds, self.eta))))
+        return [
+            (max(1, int(math.ceil(self.n_candidates * (s_max + 1) / (s + 1) / self.eta ** (s_max - s)))),
+             max(self.min_rounds, int(round(self.max_rounds / self.eta ** s))))
+            for s in range(s_max, -1, -1)
+        ]
+
+    def _train(self, candidate, dtrain, dval, target_rounds, deadline):
+        """Continue a candidate's booster up to target_rounds"""
+        extra = target_rounds - candidate.rounds
+        if extra <= 0 or candidate.stopped:
+            return
+        params = {**self.base_params, **candidate.params, 'eval_metric': EVAL_METRIC}
+        candidate.booster = xgb.train(
+            params, dtrain, num_boost_round=extra, evals=[(dval, 'val')],
+            xgb_model=candidate.booster, verbose_eval=False,
+            callbacks=[_Monitor(candidate, self.early_stopping_rounds, deadline)]
+        )
+        self.rounds_trained_ += candidate.rounds - (target_rounds - extra)
+
+    def _run_bracket(self, candidates, rungs, dtrain, dval, deadline):
+        alive = candidates
+        for k, target in enumerate(rungs):
+            for candidate in alive:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    self.timed_out_ = True
+                    return
+                self._train(candidate, dtrain, dval, target, deadline)
+
+            alive.sort(key=lambda c: c.best_score, reverse=True)
+            if self.verbose:
+                print(f"  rung {k}: {len(alive):3d} candidates to {target:4d} rounds, "
+                      f"best aucpr {alive[0].best_score:.4f} "
+                      f"({time.perf_counter() - self._start:.1f}s)")
+            keep = max(1, len(alive) // self.eta)
+            # Early-stopped candidates have finished; the rest compete for the next rung
+            alive = [c for c in alive[:keep] if not c.stopped]
+            if not alive:
+                return
+
+    def fit(self, X_fit, y_fit, X_val, y_val):
+        """
+        Run the search
+
+        Args:
+            X_fit, y_fit: Data the candidates train on
+            X_val, y_val: Temporal validation fold for aucpr
+
+        Returns:
+            self
+        """
+        self._start = time.perf_counter()
+        deadline = None if self.time_budget is None else self._start + self.time_budget
+
+        # Quantised once; every candidate reuses the same histogram bins
+        dtrain = xgb.QuantileDMatrix(X_fit, label=y_fit)
+        dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=dtrain)
+
+        for b, (n, min_rounds) in enumerate(self._brackets()):
+            params = sample_candidates(n, self.param_distributions, seed=self.seed + b)
+            candidates = [_Candidate(len(self.candidates_) + i, p) for i, p in enumerate(params)]
+            self.candidates_.extend(candidates)
+            rungs = self._rung_rounds(min_rounds)
+            if self.verbose:
+                print(f"Bracket {b}: {n} candidates, rounds {rungs}")
+            self._run_bracket(candidates, rungs, dtrain, dval, deadline)
+            if self.timed_out_:
+                print(f"Time budget of {self.time_budget:.0f}s reached; keeping the best candidate so far")
+                break
+
+        trained = [c for c in self.candidates_ if c.history]
+        if not trained:
+            raise RuntimeError("Time budget ran out before any candidate was trained")
+        self.best_ = max(trained, key=lambda c: c.best_score)
+        self.seconds_ = time.perf_counter() - self._start
+
+        # Free the boosters; only the winning configuration is refitted
+        for candidate in self.candidates_:
+            candidate.booster = None
+        return self
+
+    @property
+    def best_params_(self):
+        """Winning hyperparameters, n_estimators set to its best round count"""
+        return {**self.best_.params, 'n_estimators': self.best_.best_round + 1}
+
+    def ranked_candidates(self):
+        """(hyperparameters, validation aucpr) of every trained candidate, best first"""
+        trained = sorted((c for c in self.candidates_ if c.history), key=lambda c: c.best_score, reverse=True)
+        return [({**c.params, 'n_estimators': c.best_round + 1}, c.best_score) for c in trained]
+
+    @property
+    def best_score_(self):
+        return self.best_.best_score
+
+    def summary(self):
+        """Search statistics for reports and metadata"""
+        return {
+            'method': self.method,
+            'candidates': len(self.candidates_),
+            'candidates_trained': sum(1 for c in self.candidates_ if c.history),
+            'rounds_trained': self.rounds_trained_,
+            'best_validation_aucpr': round(self.best_score_, 6),
+            'seconds': round(self.seconds_, 2),
+            'timed_out': self.timed_out_,
+        }
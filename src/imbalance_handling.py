@@ -1,90 +1,117 @@
-
 import pandas as pd
-from imblearn.over_sampling import SMOTE
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, f1_score, recall_score
-from sklearn.model_selection import train_test_split
+import argparse
 import os
 from pathlib import Path
 
-# Get project root directory (parent of src directory)
-PROJECT_ROOT = Path(__file__).parent.parent
-DATA_PATH = PROJECT_ROOT / 'data' / 'processed' / 'model_ready_data.csv'
+try:
+    from .resampling import STRATEGIES, resample
+    from .stage_cache import get_stage_cache
+    from .training import DATA_PATH, MODELS_DIR, PROJECT_ROOT, TrainTestData, evaluate, prepare_data
+    from .training_profiler import TrainingProfiler, profile_phase
+except ImportError:  # run as a script from src/
+    from resampling import STRATEGIES, resample
+    from stage_cache import get_stage_cache
+    from training import DATA_PATH, MODELS_DIR, PROJECT_ROOT, TrainTestData, evaluate, prepare_data
+    from training_profiler import TrainingProfiler, profile_phase
+
 REPORTS_DIR = PROJECT_ROOT / 'reports'
 
-# Load modeling-ready data
-try:
-    df = pd.read_csv(DATA_PATH)
-    print(f"Data loaded successfully from: {DATA_PATH}")
-except FileNotFoundError:
-    print(f"Error: {DATA_PATH} not found.")
-    print(f"Current working directory: {os.getcwd()}")
-    print(f"Project root: {PROJECT_ROOT}")
-    exit(1)
-
-# Prepare features and target
-# Exclude non-numeric columns and target columns
-exclude_cols = ['timestamp', 'machine_id', 'failure', 'failure_within_24h']
-# Select only numeric columns for features, just in case there are other string columns
-feature_cols = [col for col in df.columns if col not in exclude_cols and pd.api.types.is_numeric_dtype(df[col])]
-X = df[feature_cols]
-y = df['failure_within_24h']
-
-# Train-test split (temporal)
-if 'timestamp' in df.columns:
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp')
-    train_cutoff = df['timestamp'].quantile(0.7)
-    train_mask = df['timestamp'] <= train_cutoff
-    X_train, X_test = X[train_mask], X[~train_mask]
-    y_train, y_test = y[train_mask], y[~train_mask]
-else:
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-
-# Apply SMOTE to training data
-print("Applying SMOTE...")
-# Handle potential issue if minority class is too small for 0.3 ratio
-# But assuming robust data for now.
-try:
-    smote = SMOTE(sampling_strategy=0.3, random_state=42) # 30% minority class
-    X_train_balanced, y_train_balanced = smote.fit_resample(X_train, y_train)
-    print(f"Original class distribution:\n{y_train.value_counts()}")
-    print(f"Balanced class distribution:\n{y_train_balanced.value_counts()}")
-except Exception as e:
-    print(f"SMOTE failed: {e}")
-    # Fallback to original if SMOTE fails (e.g., extremely imbalanced or not enough samples)
-    X_train_balanced, y_train_balanced = X_train, y_train
-
-# Train Random Forest
-print("Training Random Forest...")
-rf = RandomForestClassifier(
-    n_estimators=200,
-    max_depth=15,
-    min_samples_split=10,
-    class_weight='balanced',
-    random_state=42,
-    n_jobs=-1
-)
-rf.fit(X_train_balanced, y_train_balanced)
-
-print("Evaluating Random Forest...")
-y_pred_rf = rf.predict(X_test)
-print("\n=== Random Forest Results ===")
-print(classification_report(y_test, y_pred_rf))
-print(f"F1-Score: {f1_score(y_test, y_pred_rf):.4f}")
-print(f"Recall: {recall_score(y_test, y_pred_rf):.4f}")
-
-# Feature Importance
-feature_importance = pd.DataFrame({
-    'feature': feature_cols,
-    'importance': rf.feature_importances_
-}).sort_values('importance', ascending=False)
-
-print("\nTop 10 Features:")
-print(feature_importance.head(10))
-
-# Save feature importance
-os.makedirs(REPORTS_DIR, exist_ok=True)
-output_path = REPORTS_DIR / 'feature_importance_rf.csv'
-feature_importance.to_csv(output_path, index=False)
-print(f"Feature importance saved to {output_path}")
+
+def resample_split(split_dir, strategy='smote'):
+    """
+    Training rows of a prepared split after an imbalance strategy
+
+    Returns:
+        tuple: (X, y, sample_weight or None)
+    """
+    data = TrainTestData(split_dir)
+    X, y, weight = resample(strategy, data.X_train, data.y_train,
+                            groups=data.train.groups, timestamps=data.train.timestamps)
+    print(f"{strategy}: {len(data.y_train):,} -> {len(y):,} training rows "
+          f"({int((pd.Series(y) == 1).sum()):,} positive)")
+    return X, y, weight
+
+
+def train_random_forest(X_train, y_train, sample_weight=None):
+    """
+    Class-weighted Random Forest
+
+    A strategy that returns sample weights (downsample) has already set the
+    class balance it trains under, so class_weight='balanced' is only applied
+    without them; multiplying the two would undo the strategy's weighting.
+    """
+    print("Training Random Forest...")
+    rf = RandomForestClassifier(
+        n_estimators=200,
+        max_depth=15,
+        min_samples_split=10,
+        class_weight='balanced' if sample_weight is None else None,
+        random_state=42,
+        n_jobs=-1
+    )
+    rf.fit(X_train, y_train, sample_weight=sample_weight)
+    return rf
+
+
+def feature_importance_report(model, feature_cols, reports_dir=REPORTS_DIR):
+    """Save the model's feature importances, highest first"""
+    feature_importance = pd.DataFrame({
+        'feature': feature_cols,
+        'importance': model.feature_importances_
+    }).sort_values('importance', ascending=False)
+
+    print("\nTop 10 Features:")
+    print(feature_importance.head(10))
+
+    os.makedirs(reports_dir, exist_ok=True)
+    output_path = Path(reports_dir) / 'feature_importance_rf.csv'
+    feature_importance.to_csv(output_path, index=False)
+    print(f"Feature importance saved to {output_path}")
+    return feature_importance
+
+
+def main(data_path=DATA_PATH, strategy='smote', models_dir=MODELS_DIR):
+    with TrainingProfiler('imbalance_handling', models_dir=models_dir) as profiler:
+        # Prepared once per dataset and shared with the other training scripts
+        try:
+            with profile_phase('prepare_data'):
+                data = prepare_data(data_path)
+        except FileNotFoundError:
+            print(f"Error: {data_path} not found.")
+            print(f"Current working directory: {os.getcwd()}")
+            print(f"Project root: {PROJECT_ROOT}")
+            raise SystemExit(1)
+
+        # Rebalance the training data (cached on the prepared split and strategy)
+        with profile_phase(f'resample_{strategy}'):
+            X_train_balanced, y_train_balanced, sample_weight = get_stage_cache().cached(
+                'imbalance_resample',
+                resample_split,
+                params={'split_dir': str(data.directory), 'strategy': strategy}
+            )
+
+        with profile_phase('fit_random_forest'):
+            rf = train_random_forest(X_train_balanced, y_train_balanced, sample_weight=sample_weight)
+
+        print("Evaluating Random Forest...")
+        with profile_phase('evaluate'):
+            metrics = evaluate(rf, data.X_test, data.y_test)
+        print("\n=== Random Forest Results ===")
+        print(metrics['report'])
+        print(f"F1-Score: {metrics['f1_score']:.4f}")
+        print(f"Recall: {metrics['recall']:.4f}")
+
+        with profile_phase('feature_importance'):
+            feature_importance_report(rf, data.feature_cols)
+        profiler.print_summary()
+    return rf, metrics
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='FactoryGuard AI imbalance handling')
+    parser.add_argument('--data', default=str(DATA_PATH), help='Modeling-ready dataset')
+    parser.add_argument('--strategy', default='smote', choices=sorted(STRATEGIES),
+                        help='Imbalance strategy (see src/resampling.py)')
+    args = parser.parse_args()
+    main(args.data, strategy=args.strategy)
@@ -0,0 +1,255 @@
+"""
+FactoryGuard AI - Incremental Retraining
+Continue boosting the production XGBoost model on the newest data
+
+A full retrain re-fits every tree over the whole history, though a week
+only adds a thin slice of rows. Here the current production booster
+(models/xgboost_best.pkl) is loaded and a configurable number of trees is
+added, trained on the latest time window plus a uniform replay sample of
+older rows so the new trees do not only fit the recent period.
+
+The latest part of the window is held out (with a 24 hour purge, as in
+temporal_cv) and both the parent and the updated model are scored on it.
+The update is promoted through training.save_model, which versions it in
+model_metadata.json with a pointer to its parent, only if it passes the
+validation gates: no gated metric may drop more than `tolerance` below the
+parent's.
+
+Usage:
+    python src/incremental_training.py --window 7D --new-trees 50
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import average_precision_score, f1_score, precision_score, recall_score
+
+try:
+    from .training import DATA_PATH, MODELS_DIR, prepare_data, save_model
+except ImportError:  # run as a script from src/
+    from training import DATA_PATH, MODELS_DIR, prepare_data, save_model
+
+
+GATE_METRICS = ('aucpr', 'recall', 'f1_score')
+
+
+def load_production_model(models_dir=MODELS_DIR, name='xgboost_best'):
+    """
+    Load the current model, its feature names and metadata
+
+    Returns:
+        tuple: (model, feature names, metadata dict)
+    """
+    models_dir = Path(models_dir)
+    model = joblib.load(models_dir / f'{name}.pkl')
+    feature_names = list(joblib.load(models_dir / 'feature_names.pkl'))
+    metadata_path = models_dir / 'model_metadata.json'
+    metadata = {}
+    if metadata_path.exists():
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    return model, feature_names, metadata
+
+
+def incremental_split(timestamps, window='7D', holdout_fraction=0.2, replay_fraction=2.0, gap='24h', seed=42):
+    """
+    Row indices of the new window, the replay sample and the holdout
+
+    Args:
+        timestamps: Sorted datetime64 timestamps of all rows
+        window: Length of the new-data window ending at the latest timestamp
+        holdout_fraction: Share of window rows held out for the gates
+        replay_fraction: Replay rows per new training row, drawn from before the window
+        gap: Time purged between the training rows and the holdout
+        seed: Replay sampling seed
+
+    Returns:
+        dict: 'new', 'replay' and 'holdout' index arrays, all sorted
+    """
+    timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    n = len(timestamps)
+    window = np.timedelta64(pd.Timedelta(window).value, 'ns')
+    gap = np.timedelta64(pd.Timedelta(gap or 0).value, 'ns')
+
+    window_start = int(np.searchsorted(timestamps, timestamps[-1] - window, side='right'))
+    # Snap the holdout start to the first row of a timestamp
+    cut = window_start + int((n - window_start) * (1 - holdout_fraction))
+    holdout_start = int(np.searchsorted(timestamps, timestamps[min(cut, n - 1)], side='left'))
+    new_end = int(np.searchsorted(timestamps, timestamps[holdout_start] - gap, side='left'))
+    if new_end <= window_start or holdout_start >= n:
+        raise ValueError(f"Window {window} is too short for a training part and a holdout")
+
+    new = np.arange(window_start, new_end)
+    n_replay = min(window_start, int(round(replay_fraction * len(new))))
+    rng = np.random.default_rng(seed)
+    replay = np.sort(rng.choice(window_start, size=n_replay, replace=False))
+    return {'new': new, 'replay': replay, 'holdout': np.arange(holdout_start, n)}
+
+
+def _gather(data, rows, feature_names):
+    """Rows of the train+test timeline of a prepared split, as (X, y)"""
+    n_train = len(data.train)
+    left, right = rows[rows < n_train], rows[rows >= n_train] - n_train
+    X = np.concatenate([data.train.X[left], data.test.X[right]])
+    y = np.concatenate([data.train.y[left], data.test.y[right]]).astype(int)
+    X = pd.DataFrame(X, columns=data.feature_cols)
+    return X[feature_names], pd.Series(y)
+
+
+def holdout_metrics(model, X, y, threshold=0.5):
+    """Gate metrics of a fitted classifier on the holdout"""
+    proba = model.predict_proba(X)[:, 1]
+    y_pred = (proba >= threshold).astype(int)
+    return {
+        'aucpr': float(average_precision_score(y, proba)),
+        'f1_score': float(f1_score(y, y_pred, zero_division=0)),
+        'recall': float(recall_score(y, y_pred, zero_division=0)),
+        'precision': float(precision_score(y, y_pred, zero_division=0)),
+    }
+
+
+def validation_gates(child_metrics, parent_metrics, tolerance=0.01, metrics=GATE_METRICS):
+    """
+    Compare the update with its parent metric by metric
+
+    Returns:
+        tuple: (all passed, list of per-metric gate dicts)
+    """
+    gates = [{
+        'metric': name,
+        'parent': parent_metrics[name],
+        'child': child_metrics[name],
+        'passed': child_metrics[name] >= parent_metrics[name] - tolerance,
+    } for name in metrics]
+    return all(gate['passed'] for gate in gates), gates
+
+
+def incremental_update(data, models_dir=MODELS_DIR, window='7D', n_new_trees=50, replay_fraction=2.0,
+                       holdout_fraction=0.2, learning_rate=None, tolerance=0.01, force=False, seed=42):
+    """
+    Add trees to the production model and promote the result if it passes the gates
+
+    Args:
+        data: TrainTestData of the current dataset (train and test form one timeline)
+        models_dir: Directory of the production model and model_metadata.json
+        window: New-data window, e.g. '7D'
+        n_new_trees: Boosting rounds added to the parent booster
+        replay_fraction: Replay rows per new-window training row
+        holdout_fraction: Share of the window held out for the gates
+        learning_rate: Learning rate of the new trees (default: the parent's)
+        tolerance: Largest allowed drop of a gated metric
+        force: Promote even when a gate fails
+
+    Returns:
+        dict: 'promoted', 'gates', holdout metrics and, when promoted, the saved metadata
+    """
+    parent, feature_names, parent_metadata = load_production_model(models_dir)
+    missing = sorted(set(feature_names) - set(data.feature_cols))
+    if missing:
+        raise ValueError(f"Dataset lacks features of the production model: {missing}")
+
+    timestamps = np.concatenate([data.train.timestamps, data.test.timestamps])
+    rows = incremental_split(timestamps, window=window, holdout_fraction=holdout_fraction,
+                             replay_fraction=replay_fraction, seed=seed)
+    X_fit, y_fit = _gather(data, np.concatenate([rows['replay'], rows['new']]), feature_names)
+    X_holdout, y_holdout = _gather(data, rows['holdout'], feature_names)
+    print(f"Incremental update: {len(rows['new']):,} new + {len(rows['replay']):,} replay rows, "
+          f"holdout {len(rows['holdout']):,} rows")
+
+    params = parent.get_params()
+    params['n_estimators'] = n_new_trees
+    if learning_rate is not None:
+        params['learning_rate'] = learning_rate
+    child = xgb.XGBClassifier(**params)
+    child.fit(X_fit, y_fit, xgb_model=parent.get_booster())
+
+    parent_rounds = parent.get_booster().num_boosted_rounds()
+    total_rounds = child.get_booster().num_boosted_rounds()
+    print(f"Boosting rounds: {parent_rounds} -> {total_rounds}")
+
+    parent_scores = holdout_metrics(parent, X_holdout, y_holdout)
+    child_scores = holdout_metrics(child, X_holdout, y_holdout)
+    passed, gates = validation_gates(child_scores, parent_scores, tolerance=tolerance)
+
+    print(f"\n{'metric':10s} {'parent':>8s} {'update':>8s}  gate")
+    for gate in gates:
+        print(f"{gate['metric']:10s} {gate['parent']:>8.4f} {gate['child']:>8.4f}  "
+              f"{'pass' if gate['passed'] else 'FAIL'}")
+
+    result = {'promoted': passed or force, 'gates': gates,
+              'parent_metrics': parent_scores, 'child_metrics': child_scores}
+    if not result['promoted']:
+        print("Update rejected: production model unchanged")
+        return result
+
+    parent_version = parent_metadata.get('version')
+    window_times = timestamps[rows['new']]
+    # The window overlaps the prepared test split, so the update has no test-set
+    # score comparable to the parent's; its holdout scores get their own keys
+    result['metadata'] = save_model(child, feature_names, None, models_dir=models_dir, metadata={
+        'training_mode': 'incremental',
+        'parent_version': parent_version,
+        'parent_model_path': parent_metadata.get('model_path'),
+        'lineage': parent_metadata.get('lineage', []) + [parent_version],
+        'best_params': parent_metadata.get('best_params'),
+        'scale_pos_weight': parent_metadata.get('scale_pos_weight'),
+        'incremental': {
+            'window': str(window),
+            'window_start': str(window_times[0]),
+            'window_end': str(window_times[-1]),
+            'new_rows': len(rows['new']),
+            'replay_rows': len(rows['replay']),
+            'holdout_rows': len(rows['holdout']),
+            'new_trees': total_rounds - parent_rounds,
+            'total_trees': total_rounds,
+            'learning_rate': params.get('learning_rate'),
+            'tolerance': tolerance,
+            'forced': force and not passed,
+            'gates': gates,
+            'holdout_metrics': child_scores,
+            'parent_holdout_metrics': parent_scores,
+        },
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FactoryGuard AI incremental retraining')
+    parser.add_argument('--data', default=str(DATA_PATH), help='Modeling-ready dataset')
+    parser.add_argument('--models-dir', default=str(MODELS_DIR), help='Production model directory')
+    parser.add_argument('--window', default='7D', help='New-data window ending at the latest timestamp')
+    parser.add_argument('--new-trees', type=int, default=50, help='Trees added to the production booster')
+    parser.add_argument('--replay-fraction', type=float, default=2.0,
+                        help='Older rows replayed per new training row')
+    parser.add_argument('--holdout-fraction', type=float, default=0.2,
+                        help='Share of the window held out for the validation gates')
+    parser.add_argument('--learning-rate', type=float, default=None, help="Default: the parent's")
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help='Largest allowed drop of aucpr, recall or F1 against the parent')
+    parser.add_argument('--force', action='store_true', help='Promote even if a gate fails')
+    args = parser.parse_args()
+
+    try:
+        data = prepare_data(args.data)
+    except FileNotFoundError:
+        print(f"Error: {args.data} not found.")
+        print(f"Current working directory: {os.getcwd()}")
+        raise SystemExit(1)
+
+    result = incremental_update(
+        data, models_dir=args.models_dir, window=args.window, n_new_trees=args.new_trees,
+        replay_fraction=args.replay_fraction, holdout_fraction=args.holdout_fraction,
+        learning_rate=args.learning_rate, tolerance=args.tolerance, force=args.force
+    )
+    if not result['promoted']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+"""
+FactoryGuard AI - Inference Cost
+Serving cost of candidate models, measured on the machine that selects them
+
+F1 and recall alone would let a deeper model win by 0.01 F1 while tripling
+serving latency. For each candidate this measures, in-process:
+
+    predict_row      predict_proba on one row (a 1-row DataFrame, as /predict)
+    predict_batch    predict_proba on a batch, with the cost per row
+    explain_row      the explanation of one row (SHAP, as app.py computes it)
+    explain_batch    explanations of a batch
+    request          predict_proba then the explanation of one row: one
+                     /predict call, the latency a budget applies to
+    model_size_mb    size of the pickled model
+    load_seconds     joblib.load of the pickled model (fastest of a few loads)
+
+Latencies are p50/p99 of repeated calls. Explanations use shap when it is
+installed, as app.py does; otherwise XGBoost's native TreeSHAP
+(pred_contribs) and the exact linear SHAP values of a linear model. Other
+models have no explanation without shap and are reported as such.
+
+Running the module compares the candidates of model selection (the Logistic
+Regression baseline, the Random Forest of imbalance_handling.py and the tuned
+XGBoost model in models/) on the same split and hardware, and writes the
+results into model_metadata.json under 'model_selection'.
+
+Usage:
+    python src/inference_cost.py
+    python src/inference_cost.py --candidates lr xgboost --batch-size 500
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    import shap
+    HAS_SHAP = True
+except ImportError:
+    HAS_SHAP = False
+
+try:
+    from .training import DATA_PATH, MODELS_DIR, PROJECT_ROOT, evaluate, json_safe, prepare_data, update_metadata
+except ImportError:  # run as a script from src/
+    from training import DATA_PATH, MODELS_DIR, PROJECT_ROOT, evaluate, json_safe, prepare_data, update_metadata
+
+
+REPORT_PATH = PROJECT_ROOT / 'reports' / 'inference_cost.json'
+CANDIDATES = ['lr', 'rf', 'xgboost']
+BATCH_SIZE = 1000
+MIN_TIME = 0.5
+N_ROWS = 64  # Distinct rows cycled through by the single-row timings
+
+
+def time_calls(func, args_list, min_time=MIN_TIME, min_repeats=5, max_repeats=2000):
+    """
+    Time repeated calls, cycling through args_list
+
+    Returns:
+        dict: p50_ms, p99_ms and the number of calls timed
+    """
+    func(args_list[0])  # Warm-up (lazy initialisation, caches)
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_repeats and (len(timings) < min_repeats or time.perf_counter() - start < min_time):
+        args = args_list[len(timings) % len(args_list)]
+        t0 = time.perf_counter()
+        func(args)
+        timings.append(time.perf_counter() - t0)
+    timings = np.array(timings) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(timings, 50)), 4),
+        'p99_ms': round(float(np.percentile(timings, 99)), 4),
+        'calls': len(timings),
+    }
+
+
+def make_explainer(model, background=None):
+    """
+    Explanation function of a model, as served
+
+    Args:
+        model: Fitted classifier
+        background: Reference rows (linear models without shap)
+
+    Returns:
+        tuple: (function X -> contributions, or None; backend description)
+    """
+    if HAS_SHAP:
+        if hasattr(model, 'coef_'):
+            explainer = shap.LinearExplainer(model, background)
+        else:
+            # The explainer app.py serves
+            explainer = shap.TreeExplainer(model, feature_perturbation='interventional')
+        return explainer.shap_values, f'shap {shap.__version__}'
+
+    if hasattr(model, 'get_booster'):
+        import xgboost as xgb
+        booster = model.get_booster()
+        # The last column is the bias term
+        return (lambda X: booster.predict(xgb.DMatrix(X), pred_contribs=True)[:, :-1],
+                'xgboost pred_contribs')
+    if hasattr(model, 'coef_') and background is not None:
+        # SHAP values of a linear model with independent features
+        coef = np.asarray(model.coef_, dtype=np.float64)[0]
+        mean = np.asarray(background, dtype=np.float64).mean(axis=0)
+        return lambda X: (np.asarray(X, dtype=np.float64) - mean) * coef, 'linear coef * (x - mean)'
+    return None, 'unavailable without shap'
+
+
+def model_file_cost(model, repeats=3):
+    """Pickled size (MB) and fastest joblib.load time (seconds) of a model"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'model.pkl'
+        joblib.dump(model, path)
+        size = path.stat().st_size
+        loads = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            joblib.load(path)
+            loads.append(time.perf_counter() - start)
+    return {'model_size_mb': round(size / 1024 ** 2, 3), 'load_seconds': round(min(loads), 4)}
+
+
+def _sample_rows(X, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return X.iloc[np.sort(rng.choice(len(X), size=min(n, len(X)), replace=False))]
+
+
+def _single_rows(X, seed=0):
+    """Distinct 1-row DataFrames, as the API builds them per request"""
+    sample = _sample_rows(X, N_ROWS, seed)
+    return [sample.iloc[[i]] for i in range(len(sample))]
+
+
+def _request(model, explainer):
+    def call(row):
+        model.predict_proba(row)
+        if explainer is not None:
+            explainer(row)
+    return call
+
+
+def request_latency(model, X, explain=True, min_time=MIN_TIME, seed=0):
+    """
+    p50/p99 of one /predict call: predict_proba on one row, then its explanation
+
+    Args:
+        model: Fitted classifier
+        X: Feature rows to draw requests from
+        explain: Include the explanation (when the model has one)
+
+    Returns:
+        dict: p50_ms, p99_ms, calls
+    """
+    explainer = make_explainer(model, _sample_rows(X, 100, seed))[0] if explain else None
+    return time_calls(_request(model, explainer), _single_rows(X, seed), min_time=min_time)
+
+
+def measure_inference_cost(model, X, batch_size=BATCH_SIZE, explain=True, min_time=MIN_TIME, seed=0):
+    """
+    Latency, explanation latency, size and load time of one model
+
+    Args:
+        model: Fitted classifier
+        X: Feature rows (e.g. the test set) to time predictions on
+        batch_size: Rows per batch call
+        explain: Time explanations too
+        min_time: Seconds of timed calls per measurement
+
+    Returns:
+        dict: JSON-serialisable cost report
+    """
+    rows = _single_rows(X, seed)
+    batch = [_sample_rows(X, batch_size, seed)]
+
+    cost = {'n_features': int(X.shape[1]), 'batch_size': len(batch[0])}
+    cost['predict_row'] = time_calls(model.predict_proba, rows, min_time=min_time)
+    cost['predict_batch'] = time_calls(model.predict_proba, batch, min_time=min_time)
+    cost['predict_batch']['per_row_us'] = round(cost['predict_batch']['p50_ms'] * 1000 / len(batch[0]), 3)
+
+    explainer, backend = make_explainer(model, _sample_rows(X, 100, seed)) if explain else (None, None)
+    cost['explainer'] = backend
+    if explainer is not None:
+        cost['explain_row'] = time_calls(explainer, rows, min_time=min_time)
+        cost['explain_batch'] = time_calls(explainer, batch, min_time=min_time)
+        cost['explain_batch']['per_row_us'] = round(cost['explain_batch']['p50_ms'] * 1000 / len(batch[0]), 3)
+    cost['request'] = time_calls(_request(model, explainer), rows, min_time=min_time)
+
+    cost.update(model_file_cost(model))
+    return cost
+
+
+def host_info():
+    """The hardware and library versions latencies were measured with"""
+    import sklearn
+    import xgboost
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__,
+                     'xgboost': xgboost.__version__, 'shap': shap.__version__ if HAS_SHAP else None},
+    }
+
+
+def compare_candidates(candidates, X_test, y_test, **kwargs):
+    """
+    Test metrics and inference cost of each candidate on the same rows
+
+    Args:
+        candidates: dict of name -> fitted classifier
+        X_test, y_test: Held-out rows
+        **kwargs: measure_inference_cost options
+
+    Returns:
+        dict: name -> {f1_score, recall, precision, **cost}
+    """
+    results = {}
+    for name, model in candidates.items():
+        print(f"Measuring {name}...")
+        metrics = evaluate(model, X_test, y_test)
+        results[name] = {
+            'model': type(model).__name__,
+            **{k: v for k, v in metrics.items() if k != 'report'},
+            **measure_inference_cost(model, X_test, **kwargs),
+        }
+    return results
+
+
+def print_comparison(results):
+    print(f"\n{'candidate':10s} {'F1':>7s} {'recall':>7s} {'row ms':>8s} {'batch us/row':>13s} "
+          f"{'explain ms':>11s} {'request ms':>11s} {'size MB':>8s} {'load s':>7s}")
+    for name, r in results.items():
+        explain = f"{r['explain_row']['p50_ms']:>11.3f}" if 'explain_row' in r else f"{'-':>11s}"
+        print(f"{name:10s} {r['f1_score']:>7.4f} {r['recall']:>7.4f} {r['predict_row']['p50_ms']:>8.3f} "
+              f"{r['predict_batch']['per_row_us']:>13.2f} {explain} {r['request']['p50_ms']:>11.3f} "
+              f"{r['model_size_mb']:>8.2f} {r['load_seconds']:>7.3f}")
+
+
+def build_candidates(data, names, rf_strategy='smote', models_dir=MODELS_DIR):
+    """Fit (or load) the model-selection candidates on a prepared split"""
+    candidates = {}
+    if 'lr' in names:
+        try:
+            from .baseline_model import train_baseline
+        except ImportError:
+            from baseline_model import train_baseline
+        candidates['lr'] = train_baseline(data.X_train, data.y_train)
+    if 'rf' in names:
+        try:
+            from .imbalance_handling import resample_split, train_random_forest
+            from .stage_cache import get_stage_cache
+        except ImportError:
+            from imbalance_handling import resample_split, train_random_forest
+            from stage_cache import get_stage_cache
+        X, y, weight = get_stage_cache().cached(
+            'imbalance_resample', resample_split,
+            params={'split_dir': str(data.directory), 'strategy': rf_strategy}
+        )
+        candidates['rf'] = train_random_forest(X, y, sample_weight=weight)
+    if 'xgboost' in names:
+        model_path = Path(models_dir) / 'xgboost_best.pkl'
+        if model_path.exists():
+            candidates['xgboost'] = joblib.load(model_path)
+        else:
+            print(f"No tuned XGBoost model at {model_path}; run xgboost_tuning.py first")
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FactoryGuard AI inference cost of candidate models')
+    parser.add_argument('--data', default=str(DATA_PATH), help='Modeling-ready dataset')
+    parser.add_argument('--candidates', nargs='+', choices=CANDIDATES, default=CANDIDATES)
+    parser.add_argument('--rf-strategy', default='smote', help='Imbalance strategy of the Random Forest')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help='Seconds of timed calls per measurement')
+    parser.add_argument('--output', default=str(REPORT_PATH))
+    parser.add_argument('--no-metadata', action='store_true', help='Do not update model_metadata.json')
+    args = parser.parse_args()
+
+    data = prepare_data(args.data)
+    candidates = build_candidates(data, args.candidates, rf_strategy=args.rf_strategy)
+    results = compare_candidates(candidates, data.X_test, data.y_test,
+                                 batch_size=args.batch_size, min_time=args.min_time)
+    print_comparison(results)
+
+    report = json_safe({
+        'measured_at': datetime.now().isoformat(),
+        'test_rows': len(data.test),
+        'host': host_info(),
+        'candidates': results,
+    })
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nInference cost report saved to {output}")
+
+    if not args.no_metadata and (MODELS_DIR / 'model_metadata.json').exists():
+        update_metadata(MODELS_DIR, model_selection=report)
+
+
+if __name__ == '__main__':
+    main()
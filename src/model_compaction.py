@@ -0,0 +1,526 @@
+"""
+FactoryGuard AI - Model Compaction
+Shrink a trained XGBoost ensemble within an aucpr tolerance
+
+The tuned model can hold hundreds of deep trees, many of which barely change
+a prediction. Compaction rewrites the booster's JSON model in three steps:
+
+    snap_thresholds  move split thresholds to midpoints of the feature's
+                     resolution grid (sensor precision; rolling means have a
+                     finer one), so thresholds separating the same readings
+                     become one, then drop branches made unreachable by an
+                     ancestor deciding the same comparison; coarser grids
+                     (multiples of the resolution) merge further
+    prune_splits     collapse splits whose children are leaves and whose
+                     gain (loss_chg) is below gamma, bottom-up
+    drop_trees       remove the trees with the least total split gain
+
+Each step tries increasingly aggressive settings (grid scales, gain
+quantiles, shares of the total gain) and keeps the last one whose validation aucpr is within
+`tolerance` of the original model's. Leaf values can optionally be refitted
+on training rows (XGBoost's refresh updater) after every change.
+
+The report gives tree, node and threshold counts, aucpr and per-row
+prediction latency before and after.
+
+Usage:
+    python src/model_compaction.py --tolerance 0.005
+    python src/model_compaction.py --refit-leaves --save
+"""
+
+import argparse
+import copy
+import json
+import os
+import warnings
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import average_precision_score
+
+try:
+    from .external_memory import as_classifier
+    from .incremental_training import holdout_metrics, load_production_model
+    from .inference_cost import measure_inference_cost
+    from .training import DATA_PATH, MODELS_DIR, PROJECT_ROOT, evaluate, json_safe, prepare_data, save_model
+except ImportError:  # run as a script from src/
+    from external_memory import as_classifier
+    from incremental_training import holdout_metrics, load_production_model
+    from inference_cost import measure_inference_cost
+    from training import DATA_PATH, MODELS_DIR, PROJECT_ROOT, evaluate, json_safe, prepare_data, save_model
+
+
+REPORT_PATH = PROJECT_ROOT / 'reports' / 'model_compaction.json'
+DEFAULT_TOLERANCE = 0.005
+# Ladder of snap_thresholds: grid steps as multiples of the feature resolution
+SNAP_SCALES = (1, 2, 5, 10)
+# Gamma ladder of prune_splits: quantiles of the gain of all splits
+SPLIT_GAIN_QUANTILES = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6)
+# Ladder of drop_trees: share of the ensemble's total gain removed with the weakest trees
+TREE_GAIN_FRACTIONS = (0.005, 0.01, 0.02, 0.05, 0.1, 0.15, 0.2)
+
+NODE_FIELDS = ('base_weights', 'default_left', 'left_children', 'right_children', 'parents',
+               'loss_changes', 'split_conditions', 'split_indices', 'split_type', 'sum_hessian')
+ROOT_PARENT = 2147483647  # XGBoost's parent id of a root node
+GRID_TOLERANCE = 0.02  # Float error allowed around a grid value, in grid steps
+
+
+def booster_json(booster):
+    """The booster's model as a JSON dict"""
+    return json.loads(booster.save_raw(raw_format='json'))
+
+
+def load_booster(model_json):
+    """Booster from a JSON model dict"""
+    booster = xgb.Booster()
+    booster.load_model(bytearray(json.dumps(model_json).encode('utf-8')))
+    return booster
+
+
+def _trees(model_json):
+    return model_json['learner']['gradient_booster']['model']['trees']
+
+
+def _split_nodes(tree):
+    """Split nodes reachable from the root"""
+    stack, splits = [0], []
+    while stack:
+        node = stack.pop()
+        if tree['left_children'][node] != -1:
+            splits.append(node)
+            stack += [tree['left_children'][node], tree['right_children'][node]]
+    return splits
+
+
+def ensemble_stats(model_json):
+    """Tree, node, leaf and distinct-threshold counts of a JSON model"""
+    trees = _trees(model_json)
+    splits = [(tree, _split_nodes(tree)) for tree in trees]
+    n_splits = sum(len(nodes) for _, nodes in splits)
+    thresholds = {(tree['split_indices'][n], tree['split_conditions'][n]) for tree, nodes in splits for n in nodes}
+    return {
+        'trees': len(trees),
+        'nodes': 2 * n_splits + len(trees),
+        'leaves': n_splits + len(trees),
+        'distinct_thresholds': len(thresholds),
+    }
+
+
+def _rebuild(tree, expand, state=None):
+    """
+    Copy a JSON tree through expand(node, state), renumbering nodes breadth-first
+
+    expand returns ('leaf', node, value or None) or
+    ('split', node, threshold, (left, left state), (right, right state)); the
+    node it returns may be a descendant of the one it was given. Nodes are
+    numbered in XGBoost's order (children in consecutive pairs), which its
+    refresh updater relies on.
+    """
+    nodes = {name: [] for name in NODE_FIELDS}
+
+    def add(expansion, parent):
+        node = expansion[1]
+        new = len(nodes['parents'])
+        for name in NODE_FIELDS:
+            nodes[name].append(tree[name][node])
+        nodes['parents'][new] = parent
+        nodes['left_children'][new] = nodes['right_children'][new] = -1
+        if expansion[0] == 'split':
+            nodes['split_conditions'][new] = expansion[2]
+            queue.append((new, expansion[3], expansion[4]))
+        elif expansion[2] is not None:
+            nodes['split_conditions'][new] = nodes['base_weights'][new] = expansion[2]
+            nodes['split_indices'][new] = 0
+            nodes['loss_changes'][new] = 0.0
+            nodes['default_left'][new] = 0
+        return new
+
+    queue = deque()
+    add(expand(0, state), ROOT_PARENT)
+    while queue:
+        new, (left, left_state), (right, right_state) = queue.popleft()
+        nodes['left_children'][new] = add(expand(left, left_state), new)
+        nodes['right_children'][new] = add(expand(right, right_state), new)
+
+    tree = dict(tree, **nodes)
+    tree['tree_param'] = dict(tree['tree_param'], num_nodes=str(len(nodes['parents'])), num_deleted='0')
+    return tree
+
+
+def _with_trees(model_json, func):
+    """Copy of a JSON model with func applied to every tree"""
+    model_json = copy.deepcopy(model_json)
+    trees = _trees(model_json)
+    for i, tree in enumerate(trees):
+        if any(tree['split_type']):
+            raise ValueError("Compaction supports numerical splits only")
+        trees[i] = func(tree)
+    return model_json
+
+
+def _snap(threshold, resolution):
+    """
+    Move a threshold to the midpoint of the grid interval it separates
+
+    x < t sends grid values below t left; a threshold on a grid value (up to
+    float error, as histogram cuts are) sends that value right. Both keep
+    every grid value on the same side when moved to the midpoint below the
+    first grid value going right.
+    """
+    first_right = np.ceil(threshold / resolution - GRID_TOLERANCE)
+    return float(np.float32((first_right - 0.5) * resolution))
+
+
+def snap_thresholds(model_json, resolutions):
+    """
+    Snap thresholds to feature resolutions and remove decided splits
+
+    Args:
+        model_json: JSON model dict
+        resolutions: dict of feature index -> resolution (missing: not snapped)
+
+    Returns:
+        dict: compacted JSON model
+    """
+    def rebuild(tree):
+        def expand(node, state):
+            lower, upper, no_missing = state
+            left, right = tree['left_children'][node], tree['right_children'][node]
+            if left == -1:
+                return 'leaf', node, None
+            feature = tree['split_indices'][node]
+            threshold = tree['split_conditions'][node]
+            if resolutions.get(feature):
+                threshold = _snap(threshold, resolutions[feature])
+            default_left = bool(tree['default_left'][node])
+            low, high = lower.get(feature, -np.inf), upper.get(feature, np.inf)
+
+            # Every non-missing value reaching this node goes the same way
+            decided = 'right' if threshold <= low else 'left' if threshold >= high else None
+            if decided and (feature in no_missing or default_left == (decided == 'left')):
+                return expand(left if decided == 'left' else right, state)
+
+            # Missing values only follow the default branch
+            return ('split', node, threshold,
+                    (left, (lower, {**upper, feature: min(high, threshold)},
+                            no_missing if default_left else no_missing | {feature})),
+                    (right, ({**lower, feature: max(low, threshold)}, upper,
+                             no_missing | {feature} if default_left else no_missing)))
+
+        return _rebuild(tree, expand, ({}, {}, frozenset()))
+
+    return _with_trees(model_json, rebuild)
+
+
+def prune_splits(model_json, gamma):
+    """
+    Collapse low-gain splits bottom-up
+
+    A split whose children are both leaves and whose gain is below gamma
+    becomes a leaf holding the hessian-weighted mean of its children, which
+    keeps the node's mean output on the training rows.
+
+    Args:
+        model_json: JSON model dict
+        gamma: Gain threshold
+
+    Returns:
+        dict: compacted JSON model
+    """
+    def rebuild(tree):
+        collapsed = {}
+
+        def leaf_value(node):
+            """Value of a node once pruned, or None if it stays a split"""
+            left, right = tree['left_children'][node], tree['right_children'][node]
+            if left == -1:
+                return tree['split_conditions'][node]
+            values = [leaf_value(left), leaf_value(right)]
+            if None in values or tree['loss_changes'][node] >= gamma:
+                return None
+            weights = [tree['sum_hessian'][left], tree['sum_hessian'][right]]
+            collapsed[node] = float(np.average(values, weights=weights) if sum(weights) > 0 else np.mean(values))
+            return collapsed[node]
+
+        leaf_value(0)
+
+        def expand(node, state):
+            if node in collapsed:
+                return 'leaf', node, collapsed[node]
+            if tree['left_children'][node] == -1:
+                return 'leaf', node, None
+            return ('split', node, tree['split_conditions'][node],
+                    (tree['left_children'][node], None), (tree['right_children'][node], None))
+
+        return _rebuild(tree, expand)
+
+    return _with_trees(model_json, rebuild)
+
+
+def tree_gains(model_json):
+    """Total split gain of each tree"""
+    return np.array([sum(tree['loss_changes'][n] for n in _split_nodes(tree)) for tree in _trees(model_json)])
+
+
+def drop_trees(model_json, gain_fraction):
+    """
+    Remove the weakest trees, together holding at most gain_fraction of the total gain
+
+    Returns:
+        dict: compacted JSON model (at least one tree is kept)
+    """
+    model_json = copy.deepcopy(model_json)
+    model = model_json['learner']['gradient_booster']['model']
+    if model['gbtree_model_param']['num_parallel_tree'] != '1' or len(set(model['tree_info'])) > 1:
+        raise ValueError("Tree dropping supports single-output boosters without parallel trees")
+
+    gains = tree_gains(model_json)
+    budget = gain_fraction * gains.sum()
+    dropped = set()
+    removed = 0.0
+    for index in np.argsort(gains, kind='stable'):
+        if removed + gains[index] > budget or len(dropped) == len(gains) - 1:
+            break
+        dropped.add(int(index))
+        removed += gains[index]
+
+    keep = [i for i in range(len(gains)) if i not in dropped]
+    model['trees'] = [dict(model['trees'][i], id=k) for k, i in enumerate(keep)]
+    model['tree_info'] = [model['tree_info'][i] for i in keep]
+    model['iteration_indptr'] = list(range(len(keep) + 1))
+    model['gbtree_model_param']['num_trees'] = str(len(keep))
+    # Early-stopping attributes would point past the remaining trees
+    attributes = model_json['learner'].get('attributes', {})
+    for name in ('best_iteration', 'best_score', 'best_ntree_limit'):
+        attributes.pop(name, None)
+    return model_json
+
+
+def _on_grid(values, resolution):
+    steps = values / resolution
+    return np.abs(steps - np.round(steps)) <= GRID_TOLERANCE
+
+
+def estimate_resolutions(X, sample_rows=10_000, max_decimals=6, max_divisor=24, seed=0):
+    """
+    Resolution grid of each quantised feature
+
+    Sensors report on a decimal grid (0.001 for vibration, 0.01 for
+    temperature and pressure) and lags share it, while a rolling mean of k
+    readings lies on a grid k times finer. A feature's resolution is the
+    coarsest 10**-d / k (k up to max_divisor) that nearly all of its values are
+    multiples of; continuous features have none and are left out.
+
+    Returns:
+        dict: feature name -> resolution
+    """
+    if len(X) > sample_rows:
+        X = X.iloc[np.random.default_rng(seed).choice(len(X), size=sample_rows, replace=False)]
+    grids = sorted({10.0 ** -d / k for d in range(max_decimals + 1) for k in range(1, max_divisor + 1)},
+                   reverse=True)
+    resolutions = {}
+    for name in X.columns:
+        values = np.asarray(X[name], dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(np.unique(values)) < 2:
+            continue
+        for resolution in grids:
+            if _on_grid(values, resolution).mean() >= 0.999:
+                resolutions[name] = resolution
+                break
+    return resolutions
+
+
+def refit_leaves(booster, X, y, params):
+    """Recompute leaf values on (X, y) with XGBoost's refresh updater"""
+    params = {**params, 'process_type': 'update', 'updater': 'refresh', 'refresh_leaf': True}
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='.*updater.*')
+        return xgb.train(params, xgb.DMatrix(X, label=y), num_boost_round=booster.num_boosted_rounds(),
+                         xgb_model=booster, verbose_eval=False)
+
+
+def _aucpr(booster, X, y):
+    return float(average_precision_score(y, booster.inplace_predict(X)))
+
+
+def _latency(model, X, min_time):
+    cost = measure_inference_cost(model, X, explain=False, min_time=min_time)
+    return {'predict_row_p50_ms': cost['predict_row']['p50_ms'],
+            'predict_batch_per_row_us': cost['predict_batch']['per_row_us'],
+            'model_size_mb': cost['model_size_mb']}
+
+
+def _reduction(before, after):
+    return round(1 - after / before, 4) if before else None
+
+
+def compact(model, X_val, y_val, tolerance=DEFAULT_TOLERANCE, resolutions=None, X_refit=None, y_refit=None,
+            snap_scales=SNAP_SCALES, split_quantiles=SPLIT_GAIN_QUANTILES, tree_fractions=TREE_GAIN_FRACTIONS,
+            measure_latency=True, min_time=0.5):
+    """
+    Compact a fitted XGBClassifier within an aucpr tolerance
+
+    Args:
+        model: Fitted XGBClassifier
+        X_val, y_val: Rows the aucpr tolerance is checked on
+        tolerance: Largest allowed aucpr drop against the original model
+        resolutions: dict of feature name -> resolution for snap_thresholds (None: skip)
+        X_refit, y_refit: Rows to refit leaf values on after each change (None: no refit)
+        snap_scales: Ladder of snap_thresholds, as multiples of the resolutions
+        split_quantiles: Gamma ladder of prune_splits, as quantiles of split gains
+        tree_fractions: Ladder of drop_trees, as shares of the total gain
+        measure_latency: Time predictions of both models
+
+    Returns:
+        tuple: (compacted XGBClassifier, report dict)
+    """
+    booster = model.get_booster()
+    params = model.get_xgb_params()
+    feature_index = {name: i for i, name in enumerate(booster.feature_names or [])}
+    original = booster_json(booster)
+    baseline = _aucpr(booster, X_val, y_val)
+    print(f"Original: {ensemble_stats(original)}, validation aucpr {baseline:.4f}")
+
+    current, current_score = original, baseline
+    steps = []
+
+    def attempt(step, candidate, **settings):
+        nonlocal current, current_score
+        candidate_booster = load_booster(candidate)
+        if X_refit is not None:
+            candidate_booster = refit_leaves(candidate_booster, X_refit, y_refit, params)
+            candidate = booster_json(candidate_booster)
+        score = _aucpr(candidate_booster, X_val, y_val)
+        accepted = baseline - score <= tolerance
+        steps.append({'step': step, **settings, 'aucpr': round(score, 6), **ensemble_stats(candidate),
+                      'accepted': accepted})
+        print(f"  {step} {settings}: nodes {steps[-1]['nodes']:,}, trees {steps[-1]['trees']}, "
+              f"aucpr {score:.4f} {'kept' if accepted else 'rejected'}")
+        if accepted:
+            current, current_score = candidate, score
+        return accepted
+
+    if resolutions:
+        by_index = {feature_index[name]: r for name, r in resolutions.items() if name in feature_index}
+        for scale in snap_scales:
+            candidate = snap_thresholds(current, {i: scale * r for i, r in by_index.items()})
+            if not attempt('snap_thresholds', candidate, scale=scale, features=len(by_index)):
+                break
+
+    gains = np.concatenate([[t['loss_changes'][n] for n in _split_nodes(t)] for t in _trees(current)] or [[]])
+    if len(gains):
+        for q in split_quantiles:
+            gamma = float(np.quantile(gains, q))
+            if not attempt('prune_splits', prune_splits(current, gamma),
+                           quantile=q, gamma=round(gamma, 6)):
+                break
+
+    for fraction in tree_fractions:
+        if not attempt('drop_trees', drop_trees(current, fraction), gain_fraction=fraction):
+            break
+
+    compacted = as_classifier(load_booster(current))
+    before, after = ensemble_stats(original), ensemble_stats(current)
+    report = {
+        'tolerance': tolerance,
+        'refit_leaves': X_refit is not None,
+        'validation_rows': len(y_val),
+        'aucpr': {'before': round(baseline, 6), 'after': round(current_score, 6)},
+        'before': before,
+        'after': after,
+        'reduction': {name: _reduction(before[name], after[name]) for name in before},
+        'steps': steps,
+    }
+    if measure_latency:
+        report['latency'] = {'before': _latency(model, X_val, min_time), 'after': _latency(compacted, X_val, min_time)}
+        report['reduction'].update({
+            name: _reduction(report['latency']['before'][name], report['latency']['after'][name])
+            for name in report['latency']['before']
+        })
+    return compacted, report
+
+
+def print_report(report):
+    print(f"\n=== Model Compaction (aucpr tolerance {report['tolerance']}) ===")
+    print(f"{'':22s} {'before':>10s} {'after':>10s} {'reduction':>10s}")
+    rows = [(name, report['before'][name], report['after'][name]) for name in report['before']]
+    rows += [(name, report['latency']['before'][name], report['latency']['after'][name])
+             for name in report.get('latency', {}).get('before', {})]
+    for name, before, after in rows:
+        reduction = report['reduction'].get(name)
+        before, after = (f"{v:,}" if isinstance(v, int) else f"{v:,.3f}" for v in (before, after))
+        print(f"{name:22s} {before:>10s} {after:>10s} {'' if reduction is None else f'{reduction:.1%}':>10s}")
+    print(f"{'validation aucpr':22s} {report['aucpr']['before']:>10.4f} {report['aucpr']['after']:>10.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FactoryGuard AI XGBoost model compaction')
+    parser.add_argument('--data', default=str(DATA_PATH), help='Modeling-ready dataset')
+    parser.add_argument('--models-dir', default=str(MODELS_DIR), help='Production model directory')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Largest allowed drop of validation aucpr')
+    parser.add_argument('--refit-leaves', action='store_true', help='Refit leaf values on the training rows')
+    parser.add_argument('--no-snap', action='store_true', help='Keep split thresholds as trained')
+    parser.add_argument('--resolution', action='append', default=[], metavar='FEATURE=STEP',
+                        help='Feature resolution overriding the estimate (repeatable)')
+    parser.add_argument('--save', action='store_true', help='Save the compacted model as the current model')
+    parser.add_argument('--output', default=str(REPORT_PATH))
+    args = parser.parse_args()
+
+    try:
+        data = prepare_data(args.data)
+    except FileNotFoundError:
+        print(f"Error: {args.data} not found.")
+        print(f"Current working directory: {os.getcwd()}")
+        raise SystemExit(1)
+    model, feature_names, metadata = load_production_model(args.models_dir)
+
+    # The earlier half of the test period checks the tolerance, the later half is reported
+    X_test, y_test = data.X_test[feature_names], data.y_test
+    half = len(X_test) // 2
+    X_val, y_val, X_holdout, y_holdout = X_test.iloc[:half], y_test.iloc[:half], X_test.iloc[half:], y_test.iloc[half:]
+
+    resolutions = None
+    if not args.no_snap:
+        resolutions = estimate_resolutions(data.X_train[feature_names])
+        for item in args.resolution:
+            name, step = item.split('=')
+            resolutions[name] = float(step)
+
+    compacted, report = compact(
+        model, X_val, y_val, tolerance=args.tolerance, resolutions=resolutions,
+        X_refit=data.X_train[feature_names] if args.refit_leaves else None,
+        y_refit=data.y_train if args.refit_leaves else None,
+    )
+    report['parent_version'] = metadata.get('version')
+    report['holdout'] = {'rows': len(y_holdout), 'before': holdout_metrics(model, X_holdout, y_holdout),
+                         'after': holdout_metrics(compacted, X_holdout, y_holdout)}
+    print_report(report)
+    print(f"{'holdout aucpr':22s} {report['holdout']['before']['aucpr']:>10.4f} "
+          f"{report['holdout']['after']['aucpr']:>10.4f}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(json_safe(report), f, indent=2)
+    print(f"\nCompaction report saved to {output}")
+
+    if args.save:
+        parent_version = metadata.get('version')
+        save_model(compacted, feature_names, evaluate(compacted, data.X_test[feature_names], data.y_test),
+                   models_dir=args.models_dir, metadata={
+                       'training_mode': 'compacted',
+                       'parent_version': parent_version,
+                       'parent_model_path': metadata.get('model_path'),
+                       'lineage': metadata.get('lineage', []) + [parent_version],
+                       'best_params': metadata.get('best_params'),
+                       'scale_pos_weight': metadata.get('scale_pos_weight'),
+                       'compaction': report,
+                   })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+FactoryGuard AI - Streaming Outlier Detection
+Per-machine robust outlier filter shared by data cleaning and the prediction API
+
+Each machine keeps a running median and MAD (median absolute deviation) per
+sensor in constant memory. Readings are scored with a robust z-score,
+0.6745 * (x - median) / MAD, so machines with different baselines no longer
+share one global mean and std. State is updated from per-machine chunk
+medians, both when filtering data offline in chunks and online, where
+readings are buffered in small fixed-size batches.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+MAD_TO_STD = 0.6745  # MAD of a normal distribution is 0.6745 sigma
+
+
+class StreamingOutlierDetector:
+    """
+    Constant-memory per-machine median/MAD outlier detector
+
+    State lives in numpy arrays with one row per machine (machine_id -> row in
+    a dict), so the online path touches one row and a new machine costs
+    amortised O(1). The median/mad/count frames are built on demand for
+    inspection. One detector may be shared by the serving threads: state
+    changes and online scoring run under a lock.
+    """
+
+    def __init__(self, columns=['vibration', 'temperature', 'pressure'], threshold=4.0,
+                 min_weight=0.05, online_batch_size=16):
+        """
+        Initialize detector
+
+        Args:
+            columns: Sensor columns to score
+            threshold: Robust z-score above which a reading is an outlier
+            min_weight: Floor on the weight of each new chunk, so the
+                        baseline keeps following slow drift
+            online_batch_size: Readings buffered per machine before an
+                               online state update
+        """
+        self.columns = list(columns)
+        self.threshold = threshold
+        self.min_weight = min_weight
+        self.online_batch_size = online_batch_size
+
+        # Per-machine state: row of each machine_id in the arrays below
+        self._rows = {}
+        self._median = np.empty((0, len(self.columns)))
+        self._mad = np.empty((0, len(self.columns)))
+        self._count = np.empty(0, dtype=np.int64)
+
+        # Online readings waiting for the next batch update (bounded per machine)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _frame(self, values):
+        return pd.DataFrame(values[:len(self._rows)], index=list(self._rows), columns=self.columns)
+
+    @property
+    def median(self):
+        return self._frame(self._median)
+
+    @property
+    def mad(self):
+        return self._frame(self._mad)
+
+    @property
+    def count(self):
+        return pd.Series(self._count[:len(self._rows)], index=list(self._rows), dtype=np.int64)
+
+    # ------------------------------------------------------------------ #
+    # State updates
+    # ------------------------------------------------------------------ #
+
+    def _add_machines(self, machine_ids):
+        """Rows for new machines, growing the arrays geometrically"""
+        n = len(self._rows)
+        needed = n + len(machine_ids)
+        if needed > len(self._count):
+            capacity = max(needed, 2 * len(self._count), 16)
+            grow = capacity - len(self._count)
+            self._median = np.vstack([self._median, np.full((grow, len(self.columns)), np.nan)])
+            self._mad = np.vstack([self._mad, np.full((grow, len(self.columns)), np.nan)])
+            self._count = np.concatenate([self._count, np.zeros(grow, dtype=np.int64)])
+        for offset, machine_id in enumerate(machine_ids):
+            self._rows[machine_id] = n + offset
+        return np.arange(n, needed)
+
+    def _blend(self, machine_ids, chunk_median, chunk_mad, chunk_count):
+        """Merge chunk statistics (arrays aligned with machine_ids) into the state"""
+        rows = np.array([self._rows.get(machine_id, -1) for machine_id in machine_ids], dtype=np.int64)
+        known = rows >= 0
+
+        # New machines start from their chunk statistics
+        if not known.all():
+            new_rows = self._add_machines([m for m, k in zip(machine_ids, known) if not k])
+            self._median[new_rows] = chunk_median[~known]
+            self._mad[new_rows] = chunk_mad[~known]
+            self._count[new_rows] = chunk_count[~known]
+
+        # Known machines blend in the chunk, weighted by its share of readings
+        if known.any():
+            seen = rows[known]
+            n_old = self._count[seen].astype(np.float64)
+            n_new = chunk_count[known].astype(np.float64)
+            weight = np.maximum(n_new / (n_old + n_new), self.min_weight)[:, None]
+            self._median[seen] += weight * (chunk_median[known] - self._median[seen])
+            self._mad[seen] += weight * (chunk_mad[known] - self._mad[seen])
+            self._count[seen] = (n_old + n_new).astype(np.int64)
+
+    def partial_fit(self, df):
+        """
+        Update per-machine medians and MADs from one chunk of readings
+
+        Args:
+            df: DataFrame with machine_id and sensor columns
+
+        Returns:
+            self
+        """
+        if df.empty:
+            return self
+
+        # Plain (non-categorical) ids keep the state index simple
+        machine_ids = np.asarray(df['machine_id'])
+        values = df[self.columns].astype(np.float64)
+
+        groups = values.groupby(machine_ids, sort=False)
+        chunk_median = groups.median()
+        deviations = (values - chunk_median.reindex(machine_ids).to_numpy()).abs()
+        chunk_mad = deviations.groupby(machine_ids, sort=False).median().loc[chunk_median.index]
+        chunk_count = groups.size().loc[chunk_median.index]
+
+        with self._lock:
+            self._blend(list(chunk_median.index), chunk_median.to_numpy(), chunk_mad.to_numpy(),
+                        chunk_count.to_numpy(dtype=np.int64))
+        return self
+
+    # ------------------------------------------------------------------ #
+    # Scoring
+    # ------------------------------------------------------------------ #
+
+    def score(self, df):
+        """
+        Robust z-scores for every sensor column
+
+        Args:
+            df: DataFrame with machine_id and sensor columns
+
+        Returns:
+            np.ndarray: shape (len(df), len(columns)); NaN for unseen machines
+        """
+        machine_ids = np.asarray(df['machine_id'])
+        with self._lock:
+            rows = pd.Index(list(self._rows)).get_indexer(machine_ids)
+            known = rows >= 0
+            median = np.full((len(rows), len(self.columns)), np.nan)
+            mad = np.full((len(rows), len(self.columns)), np.nan)
+            median[known] = self._median[rows[known]]
+            mad[known] = self._mad[rows[known]]
+        # Constant sensors have MAD 0; fall back to a tiny relative scale
+        mad = np.maximum(mad, 1e-6 * np.abs(median) + 1e-12)
+
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        return MAD_TO_STD * (values - median) / mad
+
+    def outlier_mask(self, df):
+        """
+        Rows where any sensor exceeds the threshold, in a single pass
+
+        Returns:
+            tuple: (row mask, per-column outlier counts)
+        """
+        z = np.abs(self.score(df))
+        flags = z > self.threshold  # NaN compares False
+        return flags.any(axis=1), dict(zip(self.columns, flags.sum(axis=0)))
+
+    # ------------------------------------------------------------------ #
+    # Batch mode
+    # ------------------------------------------------------------------ #
+
+    def filter(self, df, chunk_size=None):
+        """
+        Fit on and remove outliers from a DataFrame, chunk by chunk
+
+        Each chunk first updates the machine baselines (median and MAD are
+        robust to the outliers they contain) and is then filtered against them.
+
+        Args:
+            df: Input DataFrame
+            chunk_size: Rows per chunk; None processes the frame at once
+
+        Returns:
+            tuple: (filtered DataFrame, per-column outlier counts)
+        """
+        chunk_size = chunk_size or max(len(df), 1)
+        keep = np.ones(len(df), dtype=bool)
+        counts = dict.fromkeys(self.columns, 0)
+
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size]
+            self.partial_fit(chunk)
+            mask, chunk_counts = self.outlier_mask(chunk)
+            keep[start:start + chunk_size] = ~mask
+            for col, n in chunk_counts.items():
+                counts[col] += int(n)
+
+        return df[keep], counts
+
+    # ------------------------------------------------------------------ #
+    # Online mode
+    # ------------------------------------------------------------------ #
+
+    def update(self, machine_id, readings):
+        """
+        Score one reading against its machine's baseline, then record it
+
+        Flagged readings are not recorded, so a degrading machine does not
+        absorb its own failure signature into the baseline. The trade-off: a
+        lasting step change (a recalibrated sensor) stays flagged until the
+        baseline is refitted offline.
+
+        Args:
+            machine_id: Machine identifier
+            readings: dict of column -> value
+
+        Returns:
+            dict: column -> robust z-score for columns beyond the threshold
+                  (empty while the machine has no baseline yet)
+        """
+        values = np.array([float(readings[c]) for c in self.columns])
+
+        with self._lock:
+            outliers = {}
+            row = self._rows.get(machine_id)
+            if row is not None:
+                median = self._median[row]
+                mad = np.maximum(self._mad[row], 1e-6 * np.abs(median) + 1e-12)
+                z = MAD_TO_STD * (values - median) / mad
+                outliers = {
+                    col: float(value) for col, value in zip(self.columns, z)
+                    if abs(value) > self.threshold
+                }
+            if outliers:
+                return outliers
+
+            pending = self._pending.setdefault(machine_id, [])
+            pending.append(values)
+            if len(pending) >= self.online_batch_size:
+                batch = np.array(pending)
+                chunk_median = np.median(batch, axis=0)
+                chunk_mad = np.median(np.abs(batch - chunk_median), axis=0)
+                self._blend([machine_id], chunk_median[None], chunk_mad[None], np.array([len(batch)]))
+                pending.clear()
+
+        return outliers
+
+    @property
+    def n_machines(self):
+        return len(self._rows)
@@ -0,0 +1,218 @@
+"""
+FactoryGuard AI - Class-Imbalance Strategies
+Resampling strategies that scale to the full training history
+
+SMOTE over the whole training set runs an exact k-NN search for every
+minority row and materialises a much larger dataset before the model is
+fitted. The strategies here are selected by name (STRATEGIES) and all
+return (X, y, sample_weight):
+
+    none               train on the data as is
+    smote              imblearn SMOTE, the original behaviour
+    downsample         keep every positive and a random share of negatives,
+                       weighting kept negatives by 1/share so the model still
+                       sees the original class prior
+    window_oversample  synthesise positives by interpolating between rows of
+                       the same failure window (same machine, consecutive
+                       positive readings), so no neighbour search is needed
+    approx_smote       SMOTE whose neighbours come from a KD-tree over a low-
+                       dimensional random projection of the minority rows,
+                       queried and generated in chunks into one preallocated
+                       array
+
+The oversampling strategies take the same sampling_strategy as SMOTE:
+the minority/majority ratio after resampling.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+
+DEFAULT_SAMPLING_STRATEGY = 0.3
+DEFAULT_CHUNK_ROWS = 16384
+
+
+def _as_arrays(X, y):
+    columns = X.columns if isinstance(X, pd.DataFrame) else None
+    return np.asarray(X, dtype=np.float32), np.asarray(y).astype(np.int8), columns
+
+
+def _frame(values, columns):
+    return pd.DataFrame(values, columns=columns, copy=False)
+
+
+def _n_synthetic(y, sampling_strategy):
+    """Synthetic positives needed to reach sampling_strategy positives per negative"""
+    n_pos = int((y == 1).sum())
+    return max(0, int(sampling_strategy * (len(y) - n_pos)) - n_pos)
+
+
+def _append_synthetic(X, y, columns, n_new, fill):
+    """Preallocate X plus n_new rows and let fill(out) write the synthetic part"""
+    out = np.empty((len(X) + n_new, X.shape[1]), dtype=np.float32)
+    out[:len(X)] = X
+    fill(out[len(X):])
+    y_out = np.concatenate([y, np.ones(n_new, dtype=np.int8)])
+    return _frame(out, columns), pd.Series(y_out), None
+
+
+def no_resampling(X, y, **kwargs):
+    """Train on the data as is"""
+    return X, y, None
+
+
+def smote(X, y, sampling_strategy=DEFAULT_SAMPLING_STRATEGY, seed=42, **kwargs):
+    """imblearn SMOTE with exact neighbours over all minority rows"""
+    from imblearn.over_sampling import SMOTE
+
+    X_res, y_res = SMOTE(sampling_strategy=sampling_strategy, random_state=seed).fit_resample(X, y)
+    return X_res, y_res, None
+
+
+def downsample_negatives(X, y, negative_ratio=3, seed=42, **kwargs):
+    """
+    Keep all positives and about negative_ratio negatives per positive
+
+    Kept negatives are weighted by 1/keep_rate, so weighted class totals
+    match the full training set.
+    """
+    y_values = np.asarray(y)
+    negatives = np.flatnonzero(y_values == 0)
+    n_pos = len(y_values) - len(negatives)
+    if n_pos == 0:
+        return X, y, None
+    keep_rate = min(1.0, negative_ratio * n_pos / max(len(negatives), 1))
+
+    rng = np.random.default_rng(seed)
+    kept = negatives[rng.random(len(negatives)) < keep_rate]
+    rows = np.sort(np.concatenate([np.flatnonzero(y_values == 1), kept]))
+    weight = np.where(y_values[rows] == 0, 1 / keep_rate, 1.0)
+
+    X_res = X.iloc[rows].reset_index(drop=True) if isinstance(X, pd.DataFrame) else np.asarray(X)[rows]
+    return X_res, pd.Series(y_values[rows]), weight
+
+
+def failure_windows(y, groups=None, timestamps=None, max_gap='1h'):
+    """
+    Group positive rows into failure windows
+
+    A window is a run of positive rows of one group (machine) whose
+    consecutive timestamps are at most max_gap apart.
+
+    Returns:
+        tuple: (positive row indices ordered by window, window id of each)
+    """
+    positives = np.flatnonzero(np.asarray(y) == 1)
+    group = np.zeros(len(positives), dtype=np.int64) if groups is None else np.asarray(groups)[positives]
+    if timestamps is None:
+        time = positives.astype(np.int64)
+        gap = 1
+    else:
+        time = np.asarray(timestamps, dtype='datetime64[ns]')[positives].astype(np.int64)
+        gap = pd.Timedelta(max_gap).value
+
+    order = np.lexsort((time, group))
+    positives, group, time = positives[order], group[order], time[order]
+    starts = np.ones(len(positives), dtype=bool)
+    starts[1:] = (group[1:] != group[:-1]) | (np.diff(time) > gap)
+    return positives, np.cumsum(starts) - 1
+
+
+def window_oversample(X, y, groups=None, timestamps=None, sampling_strategy=DEFAULT_SAMPLING_STRATEGY,
+                      max_gap='1h', seed=42, **kwargs):
+    """
+    Interpolate new positives between two rows of the same failure window
+
+    Rows of one window are readings of one machine in the hours before a
+    failure, so they are natural neighbours without a k-NN search.
+    """
+    X, y, columns = _as_arrays(X, y)
+    n_new = _n_synthetic(y, sampling_strategy)
+    positives, window = failure_windows(y, groups, timestamps, max_gap=max_gap)
+    if n_new == 0 or len(positives) == 0:
+        return _frame(X, columns), pd.Series(y), None
+
+    starts = np.flatnonzero(np.r_[True, window[1:] != window[:-1]])
+    lengths = np.diff(np.r_[starts, len(positives)])
+    rng = np.random.default_rng(seed)
+
+    def fill(out):
+        for begin in range(0, n_new, DEFAULT_CHUNK_ROWS):
+            size = min(DEFAULT_CHUNK_ROWS, n_new - begin)
+            first = rng.integers(len(positives), size=size)
+            w = window[first]
+            second = starts[w] + (rng.random(size) * lengths[w]).astype(np.int64)
+            a, b = X[positives[first]], X[positives[second]]
+            out[begin:begin + size] = a + rng.random((size, 1), dtype=np.float32) * (b - a)
+
+    return _append_synthetic(X, y, columns, n_new, fill)
+
+
+def approx_smote(X, y, sampling_strategy=DEFAULT_SAMPLING_STRATEGY, k_neighbors=5, n_components=8,
+                 chunk_rows=DEFAULT_CHUNK_ROWS, seed=42, **kwargs):
+    """
+    SMOTE with approximate neighbours from a KD-tree on a random projection
+
+    Minority rows are standardised and projected to n_components
+    dimensions, where a KD-tree is effective (in the full feature space it
+    degrades to brute force). Neighbours are queried and synthetic rows
+    written chunk by chunk, interpolating in the original feature space.
+    """
+    X, y, columns = _as_arrays(X, y)
+    n_new = _n_synthetic(y, sampling_strategy)
+    minority = X[y == 1]
+    if n_new == 0 or len(minority) < 2:
+        return _frame(X, columns), pd.Series(y), None
+
+    rng = np.random.default_rng(seed)
+    scaled = (minority - minority.mean(axis=0)) / (minority.std(axis=0) + 1e-6)
+    n_components = min(n_components, X.shape[1])
+    projection = rng.normal(size=(X.shape[1], n_components)).astype(np.float32) / np.sqrt(n_components)
+    projected = scaled @ projection
+    tree = KDTree(projected)
+
+    k = min(k_neighbors, len(minority) - 1)
+    neighbours = np.empty((len(minority), k), dtype=np.int32)
+    for begin in range(0, len(minority), chunk_rows):
+        # The first neighbour of a row is the row itself
+        _, index = tree.query(projected[begin:begin + chunk_rows], k=k + 1)
+        neighbours[begin:begin + len(index)] = index[:, 1:]
+
+    def fill(out):
+        for begin in range(0, n_new, chunk_rows):
+            size = min(chunk_rows, n_new - begin)
+            base = rng.integers(len(minority), size=size)
+            pick = neighbours[base, rng.integers(k, size=size)]
+            a, b = minority[base], minority[pick]
+            out[begin:begin + size] = a + rng.random((size, 1), dtype=np.float32) * (b - a)
+
+    return _append_synthetic(X, y, columns, n_new, fill)
+
+
+STRATEGIES = {
+    'none': no_resampling,
+    'smote': smote,
+    'downsample': downsample_negatives,
+    'window_oversample': window_oversample,
+    'approx_smote': approx_smote,
+}
+
+
+def resample(strategy, X, y, groups=None, timestamps=None, **kwargs):
+    """
+    Apply an imbalance strategy by name
+
+    Args:
+        strategy: Key of STRATEGIES
+        X, y: Training features and target
+        groups: Machine code of each row (window_oversample)
+        timestamps: Timestamp of each row (window_oversample)
+        **kwargs: Strategy options (sampling_strategy, negative_ratio, seed, ...)
+
+    Returns:
+        tuple: (X, y, sample_weight or None)
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown imbalance strategy '{strategy}'; choose from {sorted(STRATEGIES)}")
+    return STRATEGIES[strategy](X, y, groups=groups, timestamps=timestamps, **kwargs)
@@ -0,0 +1,229 @@
+"""
+FactoryGuard AI - Data Schema
+Memory-compact column types shared by ingestion, cleaning and feature engineering
+
+Sensor and feature columns are stored as float32, calendar parts as small
+integers, targets as int8 and machine_id as a categorical. Computations that
+accumulate error (rolling std, EMA, outlier statistics) upcast to float64
+internally and store the result back as float32.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+SENSOR_COLUMNS = ['vibration', 'temperature', 'pressure']
+TIME_COLUMN = 'timestamp'
+MACHINE_COLUMN = 'machine_id'
+
+# Raw sensor logs are written as '2024-01-01 00:00:00'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+TIME_PART_DTYPES = {
+    'hour': 'int8',
+    'day': 'int8',
+    'month': 'int8',
+    'day_of_week': 'int8',
+    'week': 'int8',
+    'day_of_year': 'int16',
+    'year': 'int16',
+}
+
+TARGET_PREFIXES = ('failure',)
+
+FEATURE_DTYPE = 'float32'
+
+
+def is_target_column(col):
+    """True for 'failure' and 'failure_within_<h>h' label columns"""
+    return col.startswith(TARGET_PREFIXES)
+
+
+def column_dtype(col):
+    """
+    Storage dtype for a known column, or None if it should be inferred
+
+    Args:
+        col: Column name
+
+    Returns:
+        str or None
+    """
+    if col == MACHINE_COLUMN:
+        return 'category'
+    if col in TIME_PART_DTYPES:
+        return TIME_PART_DTYPES[col]
+    if is_target_column(col):
+        return 'int8'
+    if col == TIME_COLUMN:
+        return None
+    if col in SENSOR_COLUMNS or col.startswith(tuple(f'{s}_' for s in SENSOR_COLUMNS)):
+        return FEATURE_DTYPE
+    if any(tag in col for tag in ('_lag_', '_roll', '_ema_', 'interaction', 'instability', 'change_rate')):
+        return FEATURE_DTYPE
+    return None
+
+
+def read_dtypes(columns):
+    """
+    dtype mapping for pd.read_csv so columns never materialise as float64
+
+    Integer columns are read as float32 (they may hold NaN before cleaning)
+    and narrowed afterwards by optimize_dtypes.
+
+    Args:
+        columns: Column names from the CSV header
+
+    Returns:
+        dict: column -> dtype
+    """
+    dtypes = {}
+    for col in columns:
+        dtype = column_dtype(col)
+        # read_csv parses categories as strings, so machine_id is converted
+        # after reading to keep numeric ids numeric
+        if dtype is None or dtype == 'category':
+            continue
+        dtypes[col] = FEATURE_DTYPE
+    return dtypes
+
+
+def optimize_dtypes(df, verbose=False):
+    """
+    Downcast a DataFrame to the compact schema
+
+    Args:
+        df: Input DataFrame
+        verbose: Print memory before and after
+
+    Returns:
+        DataFrame with compact dtypes
+    """
+    before = memory_mb(df) if verbose else None
+    converted = {}
+
+    for col in df.columns:
+        dtype = column_dtype(col)
+        series = df[col]
+
+        if dtype == 'category':
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                converted[col] = series.astype('category')
+        # Text columns that share a target prefix (e.g. failure_type) are left alone
+        elif dtype is not None and dtype.startswith('int') and pd.api.types.is_numeric_dtype(series.dtype):
+            # Keep float storage if the column still has gaps
+            if series.isna().any():
+                if series.dtype != FEATURE_DTYPE:
+                    converted[col] = series.astype(FEATURE_DTYPE)
+            elif series.dtype != dtype:
+                converted[col] = series.astype(dtype)
+        elif dtype == FEATURE_DTYPE or (dtype is None and series.dtype == np.float64):
+            if series.dtype != FEATURE_DTYPE:
+                converted[col] = series.astype(FEATURE_DTYPE)
+        elif dtype is None and pd.api.types.is_integer_dtype(series.dtype) \
+                and not isinstance(series.dtype, pd.CategoricalDtype):
+            converted[col] = pd.to_numeric(series, downcast='integer')
+
+    if converted:
+        df = df.assign(**converted)
+
+    if verbose:
+        report_memory(before, memory_mb(df))
+
+    return df
+
+
+def read_csv_compact(filepath, **kwargs):
+    """
+    Read a pipeline CSV straight into the compact schema
+
+    Args:
+        filepath: CSV path
+        **kwargs: Extra arguments for pd.read_csv
+
+    Returns:
+        DataFrame with compact dtypes and parsed timestamps
+    """
+    header = pd.read_csv(filepath, nrows=0).columns
+    dtypes = read_dtypes(header)
+    dtypes.update(kwargs.pop('dtype', {}))
+
+    df = pd.read_csv(filepath, dtype=dtypes, **kwargs)
+    if TIME_COLUMN in df.columns:
+        df[TIME_COLUMN] = pd.to_datetime(df[TIME_COLUMN])
+
+    return optimize_dtypes(df)
+
+
+def memory_mb(df):
+    """Deep memory usage of a DataFrame in MB"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def _default_dtype_column(series):
+    """A column as read_csv gives it without the dtype map: 64-bit numbers, text as strings"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(series.cat.categories.dtype)
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return series.astype(np.float64 if series.isna().any() else np.int64)
+    if pd.api.types.is_float_dtype(series):
+        return series.astype(np.float64)
+    return series.astype(str).where(series.notna())
+
+
+def default_memory_mb(df):
+    """
+    Deep memory the frame would take with pandas' default dtypes
+
+    Measured on the frame as read without the dtype map (64-bit numbers,
+    ids and text as strings), one column at a time so only a single
+    converted column is held.
+    """
+    total = df.index.memory_usage()
+    for col in df.columns:
+        total += _default_dtype_column(df[col]).memory_usage(index=False, deep=True)
+    return total / 1024 ** 2
+
+
+def report_memory(before_mb, after_mb, label='Memory'):
+    """Print a before/after memory comparison"""
+    saved = (1 - after_mb / before_mb) * 100 if before_mb else 0.0
+    print(f"{label}: {before_mb:.2f} MB -> {after_mb:.2f} MB ({saved:.1f}% smaller)")
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb():
+    """Current resident memory of this process in MB (None where unsupported)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except OSError:  # not Linux
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else 'data/processed/model_ready_data.csv'
+    print(f"Memory comparison for: {path}")
+
+    default_df = pd.read_csv(path)
+    compact_df = read_csv_compact(path)
+
+    report_memory(memory_mb(default_df), memory_mb(compact_df))
+    print("\nDtypes:")
+    print(compact_df.dtypes.value_counts().to_string())
@@ -0,0 +1,382 @@
+"""
+FactoryGuard AI - Sensor Log Index
+Sidecar index for machine- and time-filtered reads of raw sensor CSVs
+
+The index lives next to the CSV (sensor_logs.csv -> sensor_logs.csv.idx.npz)
+and lists, for each run of consecutive lines with the same machine and time
+bucket (one day by default), its byte range in the file. A query for a few
+machines and a time range then seeks to those ranges and parses only them,
+instead of loading the whole history. Logs sorted by machine and time
+have one entry per machine-day. Unsorted logs still index correctly, just
+with more, shorter runs.
+
+Machine ids are indexed as text, so alphanumeric ids ('M001') work as
+well as numeric ones; numeric ids are written in integer form ('2.0' and
+'2' are the same machine). Runs store a code into the index's id table.
+
+The index records the CSV's size and modification time and is ignored
+once the file changes (or was written in an older index format).
+"""
+
+import io
+import json
+import os
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .schema import TIME_COLUMN, MACHINE_COLUMN, TIMESTAMP_FORMAT
+except ImportError:  # run with src/ on sys.path
+    from schema import TIME_COLUMN, MACHINE_COLUMN, TIMESTAMP_FORMAT
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+INDEX_SUFFIX = '.idx.npz'
+INDEX_VERSION = 2
+DEFAULT_BUCKET = '1D'
+BLOCK_SIZE = 64 * 1024 * 1024
+
+NEWLINE = ord('\n')
+
+
+def index_path(csv_path):
+    """Sidecar index file belonging to a CSV"""
+    return Path(str(csv_path) + INDEX_SUFFIX)
+
+
+def _source_signature(csv_path):
+    stat = Path(csv_path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _normalized_ids(values):
+    """Machine ids as text, numeric ids in integer form ('2.0' -> '2'); NaN where missing"""
+    text = pd.Series(values, dtype=object)
+    missing = text.isna()
+    text = text.astype(str).str.strip().astype(object)
+    missing |= text.eq('')
+    number = pd.to_numeric(text.where(~missing), errors='coerce').to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        integral = np.isfinite(number) & (number % 1 == 0)
+    text[integral] = number[integral].astype(np.int64).astype(str)
+    text[missing.to_numpy()] = np.nan
+    return text.to_numpy(dtype=object)
+
+
+def _machine_codes(ids, table):
+    """Codes of normalized ids in table (extended with new ids); -1 where missing"""
+    codes, uniques = pd.factorize(ids)
+    lookup = np.array([table.setdefault(machine_id, len(table)) for machine_id in uniques] + [-1],
+                      dtype=np.int64)
+    return lookup[codes]  # code -1 picks the trailing -1
+
+
+class SensorIndex:
+    """
+    Byte ranges of (machine, time bucket) runs in a sensor CSV
+    """
+
+    def __init__(self, machine, bucket, start, end, rows, header, bucket_ns, signature, machine_ids):
+        """
+        Initialize index
+
+        Args:
+            machine: Machine code of each run (-1: lines before any parseable key)
+            bucket: Bucket start of each run (int64 ns since epoch)
+            start: First byte of each run
+            end: One past the last byte of each run
+            rows: Lines in each run
+            header: CSV header line (bytes, newline included)
+            bucket_ns: Bucket width in ns
+            signature: [size, mtime_ns] of the indexed CSV
+            machine_ids: Normalized machine id of each code
+        """
+        self.machine = machine
+        self.bucket = bucket
+        self.start = start
+        self.end = end
+        self.rows = rows
+        self.header = header
+        self.bucket_ns = bucket_ns
+        self.signature = signature
+        self.machine_ids = [str(machine_id) for machine_id in machine_ids]
+
+    @property
+    def n_runs(self):
+        return len(self.start)
+
+    @property
+    def n_rows(self):
+        return int(self.rows.sum())
+
+    def is_current(self, csv_path):
+        """True while the CSV is unchanged since indexing"""
+        return _source_signature(csv_path) == list(self.signature)
+
+    def ranges(self, machines=None, start=None, end=None):
+        """
+        Byte ranges covering every run that may hold matching rows
+
+        Args:
+            machines: Machine ids; None for all
+            start: Inclusive lower time bound; None for unbounded
+            end: Exclusive upper time bound; None for unbounded
+
+        Returns:
+            tuple: (list of (first byte, end byte), rows in those ranges)
+        """
+        mask = np.ones(self.n_runs, dtype=bool)
+        if machines is not None:
+            codes = {machine_id: code for code, machine_id in enumerate(self.machine_ids)}
+            wanted = [codes[machine_id] for machine_id in _normalized_ids(list(machines)) if machine_id in codes]
+            mask &= np.isin(self.machine, np.asarray(wanted, dtype=np.int64))
+        if start is not None:
+            mask &= self.bucket + self.bucket_ns > pd.Timestamp(start).value
+        if end is not None:
+            mask &= self.bucket < pd.Timestamp(end).value
+
+        order = np.argsort(self.start[mask], kind='stable')
+        starts, ends = self.start[mask][order], self.end[mask][order]
+        rows = int(self.rows[mask].sum())
+
+        # Adjacent runs (e.g. consecutive days of one machine) become one read
+        merged = []
+        for first, last in zip(starts.tolist(), ends.tolist()):
+            if merged and first <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+        return [tuple(r) for r in merged], rows
+
+    def save(self, path):
+        """Write the index atomically"""
+        meta = {'version': INDEX_VERSION, 'header': self.header.decode('utf-8'), 'bucket_ns': self.bucket_ns,
+                'signature': list(self.signature), 'machine_ids': self.machine_ids}
+        tmp_path = Path(str(path) + '.tmp.npz')
+        np.savez(tmp_path, machine=self.machine, bucket=self.bucket, start=self.start,
+                 end=self.end, rows=self.rows, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index, or None if it was written in another index format"""
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != INDEX_VERSION:
+                return None
+            return cls(data['machine'], data['bucket'], data['start'], data['end'], data['rows'],
+                       meta['header'].encode('utf-8'), meta['bucket_ns'], meta['signature'],
+                       meta['machine_ids'])
+
+
+def _block_keys_arrow(block, header_line, timestamp_format, n_lines):
+    """
+    Fast path for clean blocks: pyarrow parses only the two key columns.
+    Raises ArrowInvalid on malformed lines or values.
+    """
+    parser = pa_csv.ISO8601 if timestamp_format == TIMESTAMP_FORMAT else timestamp_format
+    table = pa_csv.read_csv(
+        io.BytesIO(header_line + block),
+        parse_options=pa_csv.ParseOptions(ignore_empty_lines=False),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=[MACHINE_COLUMN, TIME_COLUMN],
+            column_types={MACHINE_COLUMN: pa.string(), TIME_COLUMN: pa.timestamp('ns')},
+            timestamp_parsers=[parser],
+        ),
+    )
+    if table.num_rows != n_lines:
+        raise pa.ArrowInvalid('line count mismatch')
+    machine = _normalized_ids(table[MACHINE_COLUMN].to_numpy(zero_copy_only=False))
+    timestamp = table[TIME_COLUMN].fill_null(np.iinfo(np.int64).min).cast(pa.int64()).to_numpy()
+    return machine, timestamp
+
+
+def _block_keys(block, header_line, timestamp_format):
+    """Normalized machine id and timestamp (ns) of every line in a block of whole lines"""
+    n_lines = int(np.count_nonzero(np.frombuffer(block, dtype=np.uint8) == NEWLINE))
+    if HAS_PYARROW:
+        try:
+            return _block_keys_arrow(block, header_line, timestamp_format, n_lines)
+        except pa.ArrowInvalid:
+            pass  # the pandas path below tolerates bad lines and values
+
+    # The header fixes the field count, whatever the block's first line holds
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        keys = pd.read_csv(
+            io.BytesIO(header_line + block), usecols=[MACHINE_COLUMN, TIME_COLUMN],
+            dtype={MACHINE_COLUMN: str, TIME_COLUMN: str},
+            skip_blank_lines=False, on_bad_lines='warn', engine='c',
+        )
+
+    # Lines the parser skipped (wrong field count) get no key; the header is line 1
+    parsed = np.ones(n_lines, dtype=bool)
+    for warning in caught:
+        for line in _skipped_lines(str(warning.message)):
+            parsed[line - 2] = False
+
+    machine = np.full(n_lines, np.nan, dtype=object)
+    timestamp = np.full(n_lines, np.iinfo(np.int64).min, dtype=np.int64)
+    machine[parsed] = _normalized_ids(keys[MACHINE_COLUMN])
+    times = pd.to_datetime(keys[TIME_COLUMN], format=timestamp_format, errors='coerce')
+    timestamp[parsed] = times.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    return machine, timestamp
+
+
+def _skipped_lines(message):
+    return [int(part.split(':')[0]) for part in message.split('Skipping line ')[1:]]
+
+
+def build_index(csv_path, bucket=DEFAULT_BUCKET, block_size=BLOCK_SIZE,
+                timestamp_format=TIMESTAMP_FORMAT):
+    """
+    Scan a sensor CSV once and write its sidecar index
+
+    The file is read in blocks of whole lines; only the machine_id and
+    timestamp fields are parsed. Lines whose keys do not parse are folded
+    into the preceding run, so indexed reads still see (and report) them.
+
+    Args:
+        csv_path: Sensor CSV (one line per reading, no quoted newlines)
+        bucket: Time bucket width (pandas offset string)
+        block_size: Bytes read per block
+        timestamp_format: strptime format of the timestamp column
+
+    Returns:
+        SensorIndex
+    """
+    bucket_ns = pd.Timedelta(bucket).value
+    signature = _source_signature(csv_path)
+    runs = {name: [] for name in ('machine', 'bucket', 'start', 'end', 'rows')}
+    machine_ids = {}  # normalized id -> code
+    last_key = (-1, 0)  # machine -1: lines before any parseable key
+
+    def index_block(block, base):
+        nonlocal last_key
+        ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == NEWLINE) + 1
+        ids, timestamp = _block_keys(block, header_line, timestamp_format)
+        machine = _machine_codes(ids, machine_ids)
+
+        valid = (machine >= 0) & (timestamp != np.iinfo(np.int64).min)
+        key_bucket = np.where(valid, timestamp // bucket_ns * bucket_ns, 0)
+        # Forward-fill keys over unparseable lines from the last valid line
+        fill = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), -1))
+        machine = np.where(fill >= 0, machine[np.maximum(fill, 0)], last_key[0])
+        key_bucket = np.where(fill >= 0, key_bucket[np.maximum(fill, 0)], last_key[1])
+
+        change = np.flatnonzero((machine[1:] != machine[:-1]) | (key_bucket[1:] != key_bucket[:-1])) + 1
+        first = np.concatenate(([0], change))
+        last = np.concatenate((change, [len(machine)])) - 1
+        starts = np.concatenate(([0], ends[:-1]))
+
+        run_machine, run_bucket = machine[first], key_bucket[first]
+        run_start, run_end = base + starts[first], base + ends[last]
+        run_rows = last - first + 1
+
+        # A run continuing from the previous block extends its last entry
+        if runs['end'] and runs['end'][-1][-1] == run_start[0] \
+                and runs['machine'][-1][-1] == run_machine[0] and runs['bucket'][-1][-1] == run_bucket[0]:
+            runs['end'][-1][-1] = run_end[0]
+            runs['rows'][-1][-1] += run_rows[0]
+            run_machine, run_bucket = run_machine[1:], run_bucket[1:]
+            run_start, run_end, run_rows = run_start[1:], run_end[1:], run_rows[1:]
+
+        if len(run_start):
+            for name, values in zip(runs, (run_machine, run_bucket, run_start, run_end, run_rows)):
+                runs[name].append(np.array(values))
+        last_key = (machine[-1], key_bucket[-1])
+
+    with open(csv_path, 'rb') as f:
+        header_line = f.readline()
+        if not header_line.endswith(b'\n'):
+            header_line += b'\n'
+        offset = len(header_line)
+        carry = b''
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            block = carry + data
+            cut = block.rfind(b'\n') + 1
+            carry = block[cut:]
+            if cut:
+                index_block(block[:cut], offset)
+                offset += cut
+        if carry.strip():
+            # Last line without a trailing newline
+            index_block(carry + b'\n', offset)
+            runs['end'][-1][-1] -= 1
+
+    columns = {name: np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+               for name, parts in runs.items()}
+    index = SensorIndex(
+        columns['machine'].astype(np.int64), columns['bucket'].astype(np.int64),
+        columns['start'].astype(np.int64), columns['end'].astype(np.int64),
+        columns['rows'].astype(np.int64), header_line, bucket_ns, signature, list(machine_ids),
+    )
+    index.save(index_path(csv_path))
+    return index
+
+
+def load_index(csv_path):
+    """
+    Sidecar index of a CSV, or None when missing or out of date
+    """
+    path = index_path(csv_path)
+    if not path.exists():
+        return None
+    index = SensorIndex.load(path)
+    return index if index is not None and index.is_current(csv_path) else None
+
+
+def read_ranges(csv_path, index, machines=None, start=None, end=None):
+    """
+    Raw CSV bytes (header first) of the runs that may match a query
+
+    Returns:
+        tuple: (bytes, rows read)
+    """
+    ranges, rows = index.ranges(machines, start, end)
+    parts = [index.header]
+    with open(csv_path, 'rb') as f:
+        for first, last in ranges:
+            f.seek(first)
+            parts.append(f.read(last - first))
+    if not parts[-1].endswith(b'\n'):
+        parts.append(b'\n')
+    return b''.join(parts), rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Build or inspect sensor CSV sidecar indexes')
+    parser.add_argument('command', choices=['build', 'info'])
+    parser.add_argument('paths', nargs='+', help='Sensor CSV files')
+    parser.add_argument('--bucket', default=DEFAULT_BUCKET, help='Time bucket width, e.g. 1D or 6h')
+    args = parser.parse_args()
+
+    for csv_path in args.paths:
+        if args.command == 'build':
+            start_time = time.perf_counter()
+            index = build_index(csv_path, bucket=args.bucket)
+            print(f"{csv_path}: {index.n_rows:,} rows in {index.n_runs:,} runs "
+                  f"({time.perf_counter() - start_time:.2f}s) -> {index_path(csv_path)}")
+        else:
+            index = load_index(csv_path)
+            if index is None:
+                print(f"{csv_path}: no current index (run 'build')")
+            else:
+                print(f"{csv_path}: {index.n_rows:,} rows, {index.n_runs:,} runs, "
+                      f"{len(index.machine_ids):,} machines, "
+                      f"bucket {pd.Timedelta(index.bucket_ns, unit='ns')}")
@@ -0,0 +1,403 @@
+"""
+FactoryGuard AI - Pipeline Stage Cache
+Content-hash cache shared by the cleaning, feature, training and SHAP scripts
+
+Each stage is keyed by a hash of its input files (by content), its parameters
+and the code that computes it: the stage function's module and every project
+module it imports, directly or through other project modules. When the key
+matches, the stage is skipped and its output is loaded from a joblib file
+instead. The cache is bounded in size and evicts the least recently used
+entries.
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CACHE_DIR = PROJECT_ROOT / 'data' / 'cache'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(path):
+    """SHA-256 of a file's content, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_source(func):
+    """Hash a function's source so code edits invalidate its cached output"""
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = getattr(getattr(func, '__code__', None), 'co_code', repr(func))
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    return hashlib.sha256(source).hexdigest()
+
+
+def _module_file(name, roots):
+    """File of a dotted module name under one of the roots, or None"""
+    relative = Path(*name.split('.'))
+    for root in roots:
+        for candidate in (root / relative.with_suffix('.py'), root / relative / '__init__.py'):
+            if candidate.is_file():
+                return candidate.resolve()
+    return None
+
+
+def _project_imports(path, project_root):
+    """Project source files a module imports (absolute, relative and script-style imports)"""
+    path = Path(path)
+    tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+    # Modules are imported as .x inside the package, as x next to the script
+    # (src/ on sys.path) or as src.x from the project root
+    absolute_roots = [path.parent, project_root / 'src', project_root]
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [(alias.name, absolute_roots) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = path.parent
+                for _ in range(node.level - 1):
+                    base = base.parent
+                roots = [base]
+            else:
+                roots = absolute_roots
+            module = node.module or ''
+            # 'from package import module' names submodules too
+            names = [(f'{module}.{alias.name}'.lstrip('.'), roots) for alias in node.names]
+            if module:
+                names.append((module, roots))
+        else:
+            continue
+        for name, roots in names:
+            module_file = _module_file(name, roots)
+            if module_file is not None and module_file.is_relative_to(project_root):
+                found.add(module_file)
+    return found
+
+
+def _hash_code(func, project_root=None):
+    """
+    Hash the module defining func and every project module it imports
+
+    Edits to helpers a stage calls (in any project module on its import
+    graph) invalidate its cached output. Functions defined outside the
+    project fall back to their own source.
+    """
+    project_root = Path(project_root or PROJECT_ROOT).resolve()
+    try:
+        source_file = Path(inspect.getsourcefile(func)).resolve()
+    except TypeError:
+        source_file = None
+    if source_file is None or not source_file.is_file() or not source_file.is_relative_to(project_root):
+        return _hash_source(func)
+
+    seen = set()
+    pending = [source_file]
+    while pending:
+        module_file = pending.pop()
+        if module_file in seen:
+            continue
+        seen.add(module_file)
+        pending.extend(_project_imports(module_file, project_root) - seen)
+
+    digest = hashlib.sha256(getattr(func, '__qualname__', '').encode('utf-8'))
+    for module_file in sorted(seen):
+        digest.update(str(module_file.relative_to(project_root)).encode('utf-8'))
+        digest.update(_hash_file(module_file).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _is_plain(value):
+    """True for values whose JSON form identifies them (numbers, strings, paths, containers of those)"""
+    if value is None or isinstance(value, (str, bool, int, float, Path)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(item) for item in value)
+    if isinstance(value, dict):
+        return all(_is_plain(item) for item in value.values())
+    return False
+
+
+class StageCache:
+    """
+    Size-bounded, content-addressed store for pipeline stage outputs
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=None, enabled=None):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding cached outputs and the index
+            max_bytes: Size limit in bytes (env FACTORYGUARD_CACHE_MAX_MB overrides the default)
+            enabled: Set False to always recompute (env FACTORYGUARD_CACHE=0 does the same)
+        """
+        if max_bytes is None:
+            max_mb = os.environ.get('FACTORYGUARD_CACHE_MAX_MB')
+            max_bytes = int(float(max_mb) * 1024 ** 2) if max_mb else DEFAULT_MAX_BYTES
+        if enabled is None:
+            enabled = os.environ.get('FACTORYGUARD_CACHE', '1') != '0'
+
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.index_path = self.cache_dir / 'index.json'
+        self._index = None
+
+    # ------------------------------------------------------------------ #
+    # Index bookkeeping
+    # ------------------------------------------------------------------ #
+
+    @property
+    def index(self):
+        if self._index is None:
+            if self.index_path.exists():
+                with open(self.index_path, 'r') as f:
+                    self._index = json.load(f)
+            else:
+                self._index = {'entries': {}, 'file_hashes': {}}
+        return self._index
+
+    def _save_index(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def file_hash(self, path):
+        """
+        Content hash of a file, memoised on (size, mtime) so unchanged
+        multi-GB inputs are not re-read on every run
+        """
+        path = Path(path)
+        stat = path.stat()
+        signature = [stat.st_size, stat.st_mtime_ns]
+        memo = self.index['file_hashes'].get(str(path.resolve()))
+        if memo and memo['signature'] == signature:
+            return memo['sha256']
+
+        digest = _hash_file(path)
+        self.index['file_hashes'][str(path.resolve())] = {'signature': signature, 'sha256': digest}
+        return digest
+
+    # ------------------------------------------------------------------ #
+    # Keys
+    # ------------------------------------------------------------------ #
+
+    def _hash_input(self, item):
+        if isinstance(item, (str, Path)) and Path(item).is_file():
+            return 'file:' + self.file_hash(item)
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            hashed = pd.util.hash_pandas_object(item, index=True).to_numpy()
+            columns = ','.join(map(str, item.columns if isinstance(item, pd.DataFrame) else [item.name]))
+            return 'frame:' + hashlib.sha256(hashed.tobytes() + columns.encode('utf-8')).hexdigest()
+        if isinstance(item, np.ndarray):
+            return 'array:' + hashlib.sha256(np.ascontiguousarray(item).tobytes()).hexdigest()
+        if isinstance(item, (str, Path)):
+            raise FileNotFoundError(f"Cache input not found: {item}")
+        if not _is_plain(item):
+            # Fitted estimators and other objects: their pickled state, not their repr
+            return 'object:' + joblib.hash(item)
+        return 'value:' + json.dumps(item, sort_keys=True, default=str)
+
+    def key(self, stage, inputs=(), params=None, func=None, depends=()):
+        """
+        Build the cache key for one stage invocation
+
+        Args:
+            stage: Stage name (e.g. 'clean_pipeline')
+            inputs: Input file paths, DataFrames or arrays
+            params: Parameters; DataFrames and arrays are hashed by content,
+                    other objects (e.g. fitted models) by their pickled state
+            func: Function computing the stage; its module and the project
+                  modules it imports are part of the key
+            depends: Further functions whose source is part of the key (e.g.
+                     helpers the stage reaches without importing their module)
+
+        Returns:
+            str: hex digest
+        """
+        digest = hashlib.sha256()
+        digest.update(stage.encode('utf-8'))
+        for item in inputs:
+            digest.update(self._hash_input(item).encode('utf-8'))
+        params = {
+            name: value if _is_plain(value) else self._hash_input(value)
+            for name, value in (params or {}).items()
+        }
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+        if func is not None:
+            digest.update(_hash_code(func).encode('utf-8'))
+        for helper in depends:
+            digest.update(_hash_source(helper).encode('utf-8'))
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------ #
+    # Load / store
+    # ------------------------------------------------------------------ #
+
+    def load(self, key):
+        """
+        Load a cached output
+
+        Returns:
+            tuple: (hit, value)
+        """
+        entry = self.index['entries'].get(key)
+        if not self.enabled or entry is None:
+            return False, None
+
+        path = self.cache_dir / entry['file']
+        if not path.exists():
+            del self.index['entries'][key]
+            self._save_index()
+            return False, None
+
+        value = joblib.load(path)
+        entry['last_access'] = time.time()
+        entry['hits'] = entry.get('hits', 0) + 1
+        self._save_index()
+        return True, value
+
+    def save(self, key, stage, value, outputs=(), seconds=None):
+        """Store a stage output (and how long it took) and evict old entries beyond the size limit"""
+        if not self.enabled:
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        filename = f'{stage}-{key[:16]}.joblib'
+        path = self.cache_dir / filename
+        joblib.dump(value, path, compress=0)
+
+        now = time.time()
+        self.index['entries'][key] = {
+            'stage': stage,
+            'file': filename,
+            'bytes': path.stat().st_size,
+            'created': now,
+            'last_access': now,
+            'hits': 0,
+            'seconds': seconds,
+            'outputs': {str(p): self.file_hash(p) for p in outputs if Path(p).is_file()},
+        }
+        self.evict(keep=key)
+        self._save_index()
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = self.index['entries']
+        total = sum(entry['bytes'] for entry in entries.values())
+
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            (self.cache_dir / entry['file']).unlink(missing_ok=True)
+            total -= entry['bytes']
+            del entries[key]
+            print(f"Cache: evicted {entry['stage']} ({entry['bytes'] / 1024 ** 2:.1f} MB)")
+
+    def clear(self):
+        """Delete every cached output"""
+        for entry in self.index['entries'].values():
+            (self.cache_dir / entry['file']).unlink(missing_ok=True)
+        self._index = {'entries': {}, 'file_hashes': {}}
+        self._save_index()
+
+    def size_bytes(self):
+        return sum(entry['bytes'] for entry in self.index['entries'].values())
+
+    # ------------------------------------------------------------------ #
+    # Get-or-compute
+    # ------------------------------------------------------------------ #
+
+    def cached(self, stage, func, inputs=(), params=None, outputs=(), depends=(), timed=False):
+        """
+        Return func(**params), computing and storing it only on a miss
+
+        Args:
+            stage: Stage name
+            func: Stage function; called with params as keyword arguments
+            inputs: Input file paths, DataFrames or arrays
+            params: Keyword arguments for func (JSON values, DataFrames or arrays)
+            outputs: Files the stage writes; a hit requires them unchanged
+            depends: Further functions hashed with func's import graph
+            timed: Also return the seconds func took, as measured when the
+                   output was computed (None for entries stored without it)
+
+        Returns:
+            Stage output, or (output, seconds) when timed
+        """
+        params = params or {}
+        if not self.enabled:
+            start = time.perf_counter()
+            value = func(**params)
+            return (value, time.perf_counter() - start) if timed else value
+
+        key = self.key(stage, inputs=inputs, params=params, func=func, depends=depends)
+        start = time.time()
+        if self._outputs_intact(key):
+            hit, value = self.load(key)
+            if hit:
+                print(f"Cache hit: {stage} loaded in {time.time() - start:.2f}s (key {key[:12]})")
+                return (value, self.index['entries'][key].get('seconds')) if timed else value
+
+        print(f"Cache miss: computing {stage}...")
+        start = time.perf_counter()
+        value = func(**params)
+        seconds = time.perf_counter() - start
+        self.save(key, stage, value, outputs=outputs, seconds=seconds)
+        return (value, seconds) if timed else value
+
+    def _outputs_intact(self, key):
+        entry = self.index['entries'].get(key)
+        if entry is None:
+            return False
+        for path, digest in entry.get('outputs', {}).items():
+            if not Path(path).is_file() or self.file_hash(path) != digest:
+                return False
+        return True
+
+
+def get_stage_cache():
+    """Default project cache under data/cache"""
+    return StageCache()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect or clear the pipeline stage cache')
+    parser.add_argument('--clear', action='store_true', help='Delete all cached outputs')
+    args = parser.parse_args()
+
+    cache = get_stage_cache()
+    if args.clear:
+        cache.clear()
+        print(f"Cleared cache at {cache.cache_dir}")
+    else:
+        print(f"Cache directory: {cache.cache_dir}")
+        print(f"Entries: {len(cache.index['entries'])}")
+        print(f"Size: {cache.size_bytes() / 1024 ** 2:.1f} MB / {cache.max_bytes / 1024 ** 2:.0f} MB")
+        for entry in sorted(cache.index['entries'].values(), key=lambda e: -e['last_access']):
+            print(f"  {entry['stage']:30s} {entry['bytes'] / 1024 ** 2:8.1f} MB  hits={entry['hits']}")
@@ -0,0 +1,268 @@
+"""
+FactoryGuard AI - Columnar Storage
+Partitioned Parquet datasets for sensor, clean and model-ready data
+
+Each CSV the pipeline exchanges (e.g. data/processed/clean_data.csv) gets a
+Parquet dataset next to it (data/processed/clean_data.parquet/), partitioned
+Hive-style by calendar month and clustered by machine inside each file:
+
+    clean_data.parquet/month=2024-01/part-0.parquet
+
+Rows are sorted by (machine_id, timestamp) and written in small row groups,
+so the min/max statistics of each row group prune machines and days without
+a directory per machine. With hourly readings a machine/day directory layout
+means thousands of 24-row files, and opening them was slower than parsing
+the whole CSV.
+
+Readers pass the CSV path they always used. The Parquet copy is preferred
+when it is at least as new as the CSV, which lets pyarrow read only the
+requested columns and skip partitions and row groups outside the requested
+machines and time range. Without pyarrow, or without a Parquet copy, the CSV
+is read instead and filtered in pandas, so existing files stay usable.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from .schema import read_csv_compact, read_dtypes, optimize_dtypes, TIME_COLUMN, MACHINE_COLUMN
+except ImportError:  # run with src/ on sys.path
+    from schema import read_csv_compact, read_dtypes, optimize_dtypes, TIME_COLUMN, MACHINE_COLUMN
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+PARTITION_COLUMN = 'month'
+PARTITION_FORMAT = '%Y-%m'
+ROW_GROUP_SIZE = 16 * 1024
+
+
+def parquet_path(path):
+    """Parquet dataset directory belonging to a CSV path"""
+    path = Path(path)
+    return path if path.suffix == '.parquet' else path.with_suffix('.parquet')
+
+
+def _dataset_mtime(directory):
+    """Newest modification time of any file in a dataset directory"""
+    mtimes = [p.stat().st_mtime for p in directory.rglob('*.parquet')]
+    return max(mtimes) if mtimes else None
+
+
+def resolve_source(path):
+    """
+    Decide which file backs a dataset path
+
+    Args:
+        path: CSV path or Parquet dataset directory
+
+    Returns:
+        tuple: ('parquet' or 'csv', Path)
+    """
+    path = Path(path)
+    pq_dir = parquet_path(path)
+    csv_path = path.with_suffix('.csv')
+
+    if HAS_PYARROW and pq_dir.is_dir():
+        pq_mtime = _dataset_mtime(pq_dir)
+        # A CSV rewritten after the Parquet copy wins, so stale copies are never read
+        if pq_mtime is not None and (not csv_path.exists() or pq_mtime >= csv_path.stat().st_mtime):
+            return 'parquet', pq_dir
+    if csv_path.exists():
+        return 'csv', csv_path
+    raise FileNotFoundError(f"No CSV or Parquet data found for: {path}")
+
+
+def write_dataset(df, path, write_csv=True, row_group_size=ROW_GROUP_SIZE):
+    """
+    Write a DataFrame as a partitioned Parquet dataset (and optionally CSV)
+
+    Args:
+        df: DataFrame with machine_id and timestamp columns
+        path: CSV path; the dataset goes to the matching .parquet directory
+        write_csv: Also write the CSV for tools that still expect it
+        row_group_size: Rows per row group (the unit of predicate pruning)
+
+    Returns:
+        Path: Dataset directory (the CSV path when pyarrow is unavailable)
+    """
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+
+    if write_csv or not HAS_PYARROW:
+        df.to_csv(path.with_suffix('.csv'), index=False)
+    if not HAS_PYARROW:
+        return path.with_suffix('.csv')
+
+    table_df = df.assign(**{PARTITION_COLUMN: df[TIME_COLUMN].dt.strftime(PARTITION_FORMAT)})
+    if isinstance(df[MACHINE_COLUMN].dtype, pd.CategoricalDtype):
+        # Plain ids carry row-group min/max statistics; dictionary codes do not
+        table_df[MACHINE_COLUMN] = table_df[MACHINE_COLUMN].astype(df[MACHINE_COLUMN].cat.categories.dtype)
+    table_df = table_df.sort_values([MACHINE_COLUMN, TIME_COLUMN], kind='stable')
+    table = pa.Table.from_pandas(table_df, preserve_index=False)
+
+    # Write next to the target and swap in, so readers never see half a dataset
+    target = parquet_path(path)
+    staging = target.with_name(target.name + '.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    ds.write_dataset(
+        table, staging, format='parquet',
+        partitioning=[PARTITION_COLUMN], partitioning_flavor='hive',
+        existing_data_behavior='overwrite_or_ignore',
+        min_rows_per_group=row_group_size, max_rows_per_group=row_group_size,
+    )
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+    return target
+
+
+def _time_bound(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+def _parquet_filter(dataset, machines, start, end):
+    """pyarrow expression for the machine and [start, end) predicates"""
+    expr = None
+
+    def add(term):
+        return term if expr is None else expr & term
+
+    if machines is not None:
+        machine_type = dataset.schema.field(MACHINE_COLUMN).type
+        expr = add(ds.field(MACHINE_COLUMN).isin(pa.array(list(machines), type=machine_type)))
+
+    time_type = dataset.schema.field(TIME_COLUMN).type
+    for bound, op in ((start, '__ge__'), (end, '__lt__')):
+        if bound is None:
+            continue
+        # Prune whole month partitions first, then filter rows inside them
+        month = bound.strftime(PARTITION_FORMAT)
+        if PARTITION_COLUMN in dataset.schema.names:
+            field = ds.field(PARTITION_COLUMN)
+            expr = add(field >= month if op == '__ge__' else field <= month)
+        # Round up to the stored unit (e.g. us): for integer timestamps ts,
+        # ts >= x and ts < x are unchanged by ceiling x
+        unit = getattr(time_type, 'unit', 'ns')
+        scalar = pa.scalar(bound.ceil(unit).to_datetime64().astype(f'datetime64[{unit}]'), type=time_type)
+        expr = add(getattr(ds.field(TIME_COLUMN), op)(scalar))
+
+    return expr
+
+
+def filter_rows(df, machines=None, start=None, end=None):
+    """Keep rows of the given machines with start <= timestamp < end"""
+    mask = pd.Series(True, index=df.index)
+    if machines is not None:
+        mask &= df[MACHINE_COLUMN].isin(list(machines))
+    if start is not None:
+        mask &= df[TIME_COLUMN] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df[TIME_COLUMN] < pd.Timestamp(end)
+    return df if mask.all() else df[mask]
+
+
+def read_dataset(path, columns=None, machines=None, start=None, end=None):
+    """
+    Read pipeline data with column projection and predicate pushdown
+
+    Args:
+        path: CSV path (its Parquet copy is used when current) or dataset directory
+        columns: Columns to load; None loads all
+        machines: Machine ids to keep; None keeps all
+        start: Keep readings at or after this timestamp
+        end: Keep readings before this timestamp
+
+    Returns:
+        DataFrame in the compact schema, ordered by (machine_id, timestamp)
+    """
+    start, end = _time_bound(start), _time_bound(end)
+    source, location = resolve_source(path)
+
+    # Keys are always read: they order the result and back the filters
+    needed = None
+    if columns is not None:
+        needed = set(columns) | {MACHINE_COLUMN, TIME_COLUMN}
+
+    if source == 'parquet':
+        dataset = ds.dataset(location, format='parquet', partitioning='hive')
+        wanted = [c for c in dataset.schema.names if c != PARTITION_COLUMN]
+        if needed is not None:
+            wanted = [c for c in wanted if c in needed]
+        table = dataset.to_table(columns=wanted, filter=_parquet_filter(dataset, machines, start, end))
+        df = table.to_pandas()
+    else:
+        usecols = None if needed is None else (lambda col: col in needed)
+        df = filter_rows(read_csv_compact(location, usecols=usecols), machines, start, end)
+
+    sort_cols = [c for c in (MACHINE_COLUMN, TIME_COLUMN) if c in df.columns]
+    if sort_cols:
+        df = df.sort_values(sort_cols, kind='stable')
+    if columns is not None:
+        df = df[[c for c in df.columns if c in set(columns)]]
+
+    return optimize_dtypes(df.reset_index(drop=True))
+
+
+def iter_dataset(path, columns=None, machines=None, start=None, end=None, batch_rows=4 * ROW_GROUP_SIZE):
+    """
+    Stream pipeline data in batches instead of loading it whole
+
+    Same projection and filters as read_dataset, but at most batch_rows rows
+    are in memory at a time. Batches follow file order (month partitions,
+    clustered by machine), not a global sort.
+
+    Yields:
+        DataFrame in the compact schema
+    """
+    start, end = _time_bound(start), _time_bound(end)
+    source, location = resolve_source(path)
+    needed = None
+    if columns is not None:
+        needed = set(columns) | {TIME_COLUMN} | ({MACHINE_COLUMN} if machines is not None else set())
+
+    if source == 'parquet':
+        dataset = ds.dataset(location, format='parquet', partitioning='hive')
+        wanted = [c for c in dataset.schema.names if c != PARTITION_COLUMN and (needed is None or c in needed)]
+        batches = dataset.to_batches(columns=wanted, filter=_parquet_filter(dataset, machines, start, end),
+                                     batch_size=batch_rows)
+        chunks = (batch.to_pandas() for batch in batches if batch.num_rows)
+    else:
+        usecols = None if needed is None else (lambda col: col in needed)
+        header = pd.read_csv(location, nrows=0).columns
+        reader = pd.read_csv(location, dtype=read_dtypes(header), usecols=usecols, chunksize=batch_rows)
+        chunks = (filter_rows(chunk.assign(**{TIME_COLUMN: pd.to_datetime(chunk[TIME_COLUMN])}),
+                              machines, start, end) for chunk in reader)
+
+    for chunk in chunks:
+        if len(chunk):
+            if columns is not None:
+                chunk = chunk[[c for c in chunk.columns if c in set(columns)]]
+            yield optimize_dtypes(chunk.reset_index(drop=True))
+
+
+def convert_csv(path):
+    """Write the Parquet copy of an existing CSV"""
+    df = read_csv_compact(path)
+    return write_dataset(df, path, write_csv=False)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert pipeline CSVs to partitioned Parquet')
+    parser.add_argument('paths', nargs='+', help='CSV files to convert')
+    args = parser.parse_args()
+
+    if not HAS_PYARROW:
+        raise SystemExit("pyarrow is required for Parquet storage (pip install pyarrow)")
+    for csv_path in args.paths:
+        print(f"{csv_path} -> {convert_csv(csv_path)}")
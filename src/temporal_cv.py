@@ -0,0 +1,429 @@
+"""
+FactoryGuard AI - Temporal Cross-Validation on a Shared Feature Matrix
+Rolling-origin CV whose folds are row ranges into one memory-mapped matrix
+
+The training rows are sorted by time once and written as a float32 .npy
+matrix (plus target and timestamps) that every worker process opens with
+np.load(mmap_mode='r'). A fold is then just four row indices: training on
+[train_start, train_end) and testing on the next block [test_start,
+test_end), with the origin rolling forward fold by fold. Workers slice the
+shared pages instead of each receiving a pickled copy of X_train.
+
+Training rows whose timestamps fall within `gap` before the test block are
+dropped from that fold, because failure_within_24h labels look 24 hours ahead
+into the test period.
+
+Every (candidate, fold) score is appended to a JSONL log as soon as it is
+computed, keyed by the matrix fingerprint, parameters and fold; a search that
+is interrupted and run again skips the folds already in the log. Thread
+settings are left out of the key, so a search can resume on a machine with
+a different core count. Folds may also be index arrays (stratified_kfolds),
+for the unshuffled k-fold CV of RandomizedSearchCV.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score, f1_score, recall_score
+from sklearn.model_selection import StratifiedKFold
+
+
+WRITE_CHUNK_ROWS = 500_000
+SCORERS = {
+    'f1': lambda y, proba: f1_score(y, proba >= 0.5),
+    'recall': lambda y, proba: recall_score(y, proba >= 0.5),
+    'aucpr': average_precision_score,
+}
+# Change how fast a fold is fitted, not its scores
+THREAD_PARAMS = ('n_jobs', 'nthread')
+
+
+class FeatureMatrix:
+    """
+    Time-sorted float32 feature matrix on disk, opened memory-mapped
+
+    Instances only hold the directory, so they pickle cheaply into worker
+    processes; the arrays are mapped lazily on first access.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / 'meta.json') as f:
+            self.meta = json.load(f)
+        self._arrays = {}
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'meta': self.meta, '_arrays': {}}
+
+    def _array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self.directory / f'{name}.npy', mmap_mode='r')
+        return self._arrays[name]
+
+    @property
+    def X(self):
+        return self._array('X')
+
+    @property
+    def y(self):
+        return self._array('y')
+
+    @property
+    def timestamps(self):
+        """Row timestamps as datetime64[ns], non-decreasing"""
+        return self._array('timestamps').view('datetime64[ns]')
+
+    @property
+    def groups(self):
+        """Integer group (machine) code of each row, or None if not stored"""
+        return self._array('groups') if 'group_names' in self.meta else None
+
+    @property
+    def feature_names(self):
+        return self.meta['feature_names']
+
+    @property
+    def fingerprint(self):
+        return self.meta['fingerprint']
+
+    def __len__(self):
+        return self.meta['n_rows']
+
+    @classmethod
+    def create(cls, directory, X, y, timestamps, chunk_rows=WRITE_CHUNK_ROWS, groups=None):
+        """
+        Sort rows by time and write the matrix, target and timestamps
+
+        The matrix is written chunk by chunk, so only one float32 chunk is
+        materialised besides the source frame.
+
+        Args:
+            directory: Output directory
+            X: Feature DataFrame
+            y: Binary target aligned with X
+            timestamps: Row timestamps aligned with X
+            groups: Optional group labels (e.g. machine_id) aligned with X,
+                    stored as integer codes
+
+        Returns:
+            FeatureMatrix
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        frame, ts, order = _time_sorted(X, timestamps)
+
+        digest = hashlib.sha256()
+        matrix = np.lib.format.open_memmap(directory / 'X.npy', mode='w+', dtype=np.float32,
+                                           shape=(len(X), X.shape[1]))
+        for start, block in _sorted_blocks(frame, order, chunk_rows):
+            matrix[start:start + len(block)] = block
+            digest.update(block.tobytes())
+        matrix.flush()
+        del matrix
+
+        target = np.asarray(y)[order].astype(np.int8)
+        np.save(directory / 'y.npy', target)
+        np.save(directory / 'timestamps.npy', ts[order].view('int64'))
+        digest.update(target.tobytes())
+        digest.update(ts[order].tobytes())
+        if groups is not None:
+            codes, group_names = pd.factorize(np.asarray(groups)[order])
+            np.save(directory / 'groups.npy', codes.astype(np.int32))
+            digest.update(codes.astype(np.int32).tobytes())
+
+        meta = {
+            'n_rows': int(len(order)),
+            'n_features': int(X.shape[1]),
+            'feature_names': _feature_names(X),
+            'fingerprint': digest.hexdigest(),
+        }
+        if groups is not None:
+            meta['group_names'] = [str(name) for name in group_names]
+        tmp_path = directory / 'meta.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, directory / 'meta.json')
+        return cls(directory)
+
+    @staticmethod
+    def compute_fingerprint(X, y, timestamps, groups=None, chunk_rows=WRITE_CHUNK_ROWS):
+        """Fingerprint create() would store for these inputs, without writing anything"""
+        frame, ts, order = _time_sorted(X, timestamps)
+        digest = hashlib.sha256()
+        for _, block in _sorted_blocks(frame, order, chunk_rows):
+            digest.update(block.tobytes())
+        digest.update(np.asarray(y)[order].astype(np.int8).tobytes())
+        digest.update(ts[order].tobytes())
+        if groups is not None:
+            digest.update(pd.factorize(np.asarray(groups)[order])[0].astype(np.int32).tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def open_or_create(cls, directory, X, y, timestamps, groups=None):
+        """
+        Reuse the matrix in directory if it was written from these inputs, else (re)write it
+
+        Shape and feature names are compared first; only when they match is
+        the content fingerprint recomputed, so a stale matrix left by older
+        feature-selection or split code is never scored against.
+
+        Args:
+            directory: Matrix directory
+            X, y, timestamps, groups: Inputs as passed to create()
+
+        Returns:
+            FeatureMatrix
+        """
+        if (Path(directory) / 'meta.json').exists():
+            existing = cls(directory)
+            meta = existing.meta
+            if (meta['n_rows'] == len(X) and meta['n_features'] == X.shape[1]
+                    and meta['feature_names'] == _feature_names(X)
+                    and ('group_names' in meta) == (groups is not None)
+                    and meta['fingerprint'] == cls.compute_fingerprint(X, y, timestamps, groups)):
+                return existing
+            print(f"Feature matrix in {directory} does not match its inputs; rebuilding")
+        return cls.create(directory, X, y, timestamps, groups=groups)
+
+
+def _time_sorted(X, timestamps):
+    """Source frame, timestamps as datetime64[ns] and the stable time order of the rows"""
+    ts = pd.to_datetime(pd.Series(np.asarray(timestamps))).to_numpy(dtype='datetime64[ns]')
+    frame = X if isinstance(X, pd.DataFrame) else pd.DataFrame(np.asarray(X))
+    return frame, ts, np.argsort(ts, kind='stable')
+
+
+def _sorted_blocks(frame, order, chunk_rows):
+    """Yield (start, float32 block) of frame's rows in the given order"""
+    for start in range(0, len(order), chunk_rows):
+        yield start, frame.iloc[order[start:start + chunk_rows]].to_numpy(dtype=np.float32)
+
+
+def _feature_names(X):
+    names = list(X.columns) if isinstance(X, pd.DataFrame) else [f'f{i}' for i in range(X.shape[1])]
+    return [str(name) for name in names]
+
+
+def rolling_origin_folds(timestamps, n_folds=3, initial_fraction=0.5, gap='24h', max_train_rows=None):
+    """
+    Expanding-window folds over time-sorted rows
+
+    The period after the first initial_fraction of rows is cut into n_folds
+    equal test blocks at timestamp boundaries. Fold k trains on everything
+    before block k, minus the rows within gap of its start.
+
+    Args:
+        timestamps: Sorted datetime64 timestamps
+        n_folds: Number of folds
+        initial_fraction: Share of rows before the first test block
+        gap: Time purged between training and test rows
+        max_train_rows: Keep only this many latest training rows (sliding window)
+
+    Returns:
+        list of tuple: (train_start, train_end, test_start, test_end)
+    """
+    timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    n = len(timestamps)
+    gap = np.timedelta64(pd.Timedelta(gap or 0).value, 'ns')
+
+    boundaries = np.linspace(initial_fraction * n, n, n_folds + 1).astype(np.int64)
+    # Snap to the first row of each timestamp so one time step is never split
+    boundaries = np.searchsorted(timestamps, timestamps[np.minimum(boundaries, n - 1)], side='left')
+    boundaries[-1] = n
+
+    folds = []
+    for test_start, test_end in zip(boundaries[:-1], boundaries[1:]):
+        if test_end <= test_start:
+            continue
+        train_end = int(np.searchsorted(timestamps, timestamps[test_start] - gap, side='left'))
+        train_start = 0 if max_train_rows is None else max(0, train_end - max_train_rows)
+        if train_end > train_start:
+            folds.append((train_start, train_end, int(test_start), int(test_end)))
+    if not folds:
+        raise ValueError("Not enough distinct timestamps for rolling-origin folds")
+    return folds
+
+
+def stratified_kfolds(y, n_splits=3):
+    """
+    Stratified k-fold folds as row index arrays
+
+    The folds RandomizedSearchCV(cv=n_splits) uses for a classifier.
+
+    Returns:
+        list of tuple: (train rows, test rows)
+    """
+    y = np.asarray(y)
+    return [(train.astype(np.int64), test.astype(np.int64))
+            for train, test in StratifiedKFold(n_splits=n_splits).split(np.zeros(len(y)), y)]
+
+
+def fold_id(fold):
+    """JSON identity of a fold: its row range, or digests of its index arrays"""
+    if all(np.isscalar(bound) for bound in fold):
+        return [int(bound) for bound in fold]
+    return [hashlib.sha256(np.ascontiguousarray(rows, dtype=np.int64).tobytes()).hexdigest()[:16]
+            for rows in fold]
+
+
+def _fold_rows(fold):
+    """(train rows, test rows) as slices for row ranges, index arrays otherwise"""
+    if len(fold) == 4:
+        train_start, train_end, test_start, test_end = fold
+        return slice(train_start, train_end), slice(test_start, test_end)
+    return fold
+
+
+class FoldResultLog:
+    """
+    Append-only JSONL log of fold scores, loaded on start for resuming
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.results = {}
+        if self.path.exists():
+            self._drop_torn_tail()
+            with open(self.path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    self.results[record['key']] = record
+
+    def _drop_torn_tail(self):
+        """Cut a partial last line left by an interrupted write"""
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    @staticmethod
+    def key(fingerprint, params, fold):
+        params = {name: value for name, value in params.items() if name not in THREAD_PARAMS}
+        payload = json.dumps({'matrix': fingerprint, 'params': params, 'fold': fold_id(fold)},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def __contains__(self, key):
+        return key in self.results
+
+    def append(self, record):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.results[record['key']] = record
+
+
+def fit_and_score_fold(matrix, params, fold, scoring=('f1', 'recall', 'aucpr')):
+    """
+    Train an XGBClassifier on one fold's rows and score its test block
+
+    Returns:
+        dict: scores, row counts, fit and scoring seconds
+    """
+    from xgboost import XGBClassifier
+
+    train_rows, test_rows = _fold_rows(fold)
+    X, y = matrix.X, matrix.y
+    start = time.perf_counter()
+    model = XGBClassifier(**params)
+    model.fit(X[train_rows], y[train_rows])
+    fitted = time.perf_counter()
+    proba = model.predict_proba(X[test_rows])[:, 1]
+
+    y_test = np.asarray(y[test_rows])
+    scores = {name: float(SCORERS[name](y_test, proba)) for name in scoring}
+    end = time.perf_counter()
+    return {
+        'scores': scores,
+        'train_rows': len(y[train_rows]),
+        'test_rows': len(y_test),
+        'fit_seconds': round(fitted - start, 3),
+        'score_seconds': round(end - fitted, 3),
+        'seconds': round(end - start, 3),
+    }
+
+
+def _fold_task(matrix, index, params, fold, key):
+    result = fit_and_score_fold(matrix, params, fold)
+    return {'key': key, 'candidate': index, 'params': params, 'fold': fold_id(fold), 'pid': os.getpid(),
+            'finished': time.time(), **result}
+
+
+def cross_validate(matrix, candidates, folds, log_path, base_params=None, n_jobs=1, rank_by='f1',
+                   threads_per_trial=None, verbose=True):
+    """
+    Score every candidate on every fold, in parallel, resuming from the log
+
+    Args:
+        matrix: FeatureMatrix shared by the workers
+        candidates: list of hyperparameter dicts
+        folds: Fold ranges from rolling_origin_folds, or index arrays from stratified_kfolds
+        log_path: JSONL fold-result log (resumed if present)
+        base_params: Parameters common to all candidates
+        n_jobs: Worker processes (-1 = all cores)
+        rank_by: Score whose fold mean orders the result
+        threads_per_trial: XGBoost threads of each fold fit (None: keep base_params' n_jobs)
+
+    Returns:
+        pd.DataFrame: one row per candidate with mean/std of each score, best first
+    """
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+    log = FoldResultLog(log_path)
+
+    tasks = []
+    for index, candidate in enumerate(candidates):
+        params = {**(base_params or {}), **candidate}
+        if threads_per_trial is not None:
+            params['n_jobs'] = threads_per_trial
+        for fold in folds:
+            key = FoldResultLog.key(matrix.fingerprint, params, fold)
+            if key not in log:
+                tasks.append((index, params, fold, key))
+
+    total = len(candidates) * len(folds)
+    if verbose:
+        print(f"CV: {len(candidates)} candidates x {len(folds)} folds, "
+              f"{total - len(tasks)} already in {log_path}, {len(tasks)} to fit ({n_jobs} workers)")
+
+    done = total - len(tasks)
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(_fold_task, matrix, *task) for task in tasks]
+            try:
+                for future in as_completed(futures):
+                    log.append(future.result())
+                    done += 1
+                    if verbose:
+                        print(f"  [{done}/{total}] folds scored")
+            except BaseException:
+                # Interrupted: don't start queued folds; a rerun resumes from the log
+                for future in futures:
+                    future.cancel()
+                raise
+    else:
+        for task in tasks:
+            log.append(_fold_task(matrix, *task))
+            done += 1
+            if verbose:
+                print(f"  [{done}/{total}] folds scored")
+
+    rows = []
+    for index, candidate in enumerate(candidates):
+        params = {**(base_params or {}), **candidate}
+        records = [log.results[FoldResultLog.key(matrix.fingerprint, params, fold)] for fold in folds]
+        row = {'candidate': index, 'params': candidate}
+        for name in records[0]['scores']:
+            values = [r['scores'][name] for r in records]
+            row[f'mean_{name}'] = float(np.mean(values))
+            row[f'std_{name}'] = float(np.std(values))
+        row['fit_seconds'] = float(sum(r['seconds'] for r in records))
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values(f'mean_{rank_by}', ascending=False, kind='stable')
@@ -0,0 +1,321 @@
+"""
+FactoryGuard AI - Time-Based Rolling Windows
+Shared by batch feature engineering and the real-time feature processor
+
+Windows are true time offsets ('4h') per machine rather than row counts, so
+dropped samples and mixed reporting rates no longer distort the statistics.
+Each row enters and leaves every window exactly once, which keeps the total
+work O(n) per window instead of O(n * w).
+"""
+
+from collections import deque
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+
+ROLLING_STATS = ['mean', 'std', 'max', 'min']
+
+
+class TimeWindowIndexer(BaseIndexer):
+    """
+    Rolling indexer backed by precomputed per-row window bounds
+
+    Lets pandas' variable-window kernels (which add and remove each row once)
+    run over the whole frame in one call instead of one call per machine.
+    """
+
+    def __init__(self, start, end):
+        super().__init__()
+        self.start = start
+        self.end = end
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None,
+                          closed=None, step=None):
+        return self.start, self.end
+
+
+def compute_window_bounds(timestamps, machine_ids, windows_hours):
+    """
+    Sweep sorted timestamps once per machine to find every window's start row
+
+    Rows must already be sorted by (machine_id, timestamp). A window of w hours
+    ending at row i covers the half-open interval (t_i - w, t_i], matching
+    pandas' offset windows.
+
+    Args:
+        timestamps: Sorted datetime-like array
+        machine_ids: Machine identifier per row (contiguous blocks)
+        windows_hours: List of window lengths in hours
+
+    Returns:
+        dict: window -> (start, end) int64 arrays of row bounds
+    """
+    ts = pd.to_datetime(pd.Series(timestamps)).to_numpy(dtype='datetime64[ns]').view('int64')
+    machines = np.asarray(machine_ids)
+    n = len(ts)
+
+    # Block boundaries of each machine in the sorted frame
+    if n:
+        change = np.flatnonzero(machines[1:] != machines[:-1]) + 1
+        block_starts = np.concatenate(([0], change))
+        block_ends = np.concatenate((change, [n]))
+    else:
+        block_starts = block_ends = np.array([], dtype=np.int64)
+
+    end = np.arange(1, n + 1, dtype=np.int64)
+    bounds = {}
+
+    for window in windows_hours:
+        window_ns = int(pd.Timedelta(hours=window).value)
+        start = np.empty(n, dtype=np.int64)
+
+        # Left pointer per machine block; searchsorted is the vectorised
+        # equivalent of advancing the pointer while it lags the window edge
+        for lo, hi in zip(block_starts, block_ends):
+            block = ts[lo:hi]
+            start[lo:hi] = np.searchsorted(block, block - window_ns, side='right') + lo
+
+        bounds[window] = (start, end)
+
+    return bounds
+
+
+def time_rolling_statistics(df, columns, windows=[1, 4, 8], stats=ROLLING_STATS,
+                            time_col='timestamp', group_col='machine_id'):
+    """
+    Compute time-based rolling statistics for all columns and windows
+
+    Args:
+        df: DataFrame sorted by (machine_id, timestamp)
+        columns: Sensor columns to aggregate
+        windows: Window lengths in hours
+        stats: Subset of 'mean', 'std', 'max', 'min'
+        time_col: Timestamp column name
+        group_col: Machine column name
+
+    Returns:
+        dict: feature name -> numpy array aligned with df rows
+    """
+    bounds = compute_window_bounds(df[time_col].values, df[group_col].values, windows)
+
+    features = {}
+    for col in columns:
+        # Accumulate in float64 regardless of storage dtype
+        values = pd.Series(df[col].to_numpy(dtype=np.float64))
+
+        for window in windows:
+            start, end = bounds[window]
+            roller = values.rolling(TimeWindowIndexer(start, end), min_periods=1)
+
+            for stat in stats:
+                features[f'{col}_rolling_{stat}_{window}h'] = getattr(roller, stat)().to_numpy()
+
+    return features
+
+
+class _WindowState:
+    """Running aggregates for one (column, window) pair"""
+
+    __slots__ = ('left', 'count', 'mean', 'm2', 'max_q', 'min_q')
+
+    def __init__(self, left):
+        self.left = left
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max_q = deque()
+        self.min_q = deque()
+
+    def add(self, pos, value):
+        # Welford update
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        # Monotonic deques keep the window max/min at the front
+        while self.max_q and self.max_q[-1][1] <= value:
+            self.max_q.pop()
+        self.max_q.append((pos, value))
+        while self.min_q and self.min_q[-1][1] >= value:
+            self.min_q.pop()
+        self.min_q.append((pos, value))
+
+    def remove(self, pos, value):
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self.m2 -= delta * (value - self.mean)
+
+        if self.max_q and self.max_q[0][0] == pos:
+            self.max_q.popleft()
+        if self.min_q and self.min_q[0][0] == pos:
+            self.min_q.popleft()
+
+    def values(self):
+        if self.count == 0:
+            return {'mean': math.nan, 'std': math.nan, 'max': math.nan, 'min': math.nan}
+        std = math.sqrt(max(self.m2, 0.0) / (self.count - 1)) if self.count > 1 else math.nan
+        return {
+            'mean': self.mean,
+            'std': std,
+            'max': self.max_q[0][1],
+            'min': self.min_q[0][1],
+        }
+
+
+class _MachineBuffer:
+    """Shared reading buffer for one machine, sized by the largest window"""
+
+    def __init__(self, columns, windows):
+        self.readings = deque()   # (timestamp_ns, {col: value})
+        self.base = 0             # absolute position of readings[0]
+        self.last_ts = None
+        self.states = {
+            (col, window): _WindowState(left=0)
+            for col in columns for window in windows
+        }
+
+
+class OnlineTimeWindows:
+    """
+    Incremental time-based rolling statistics for the serving path
+
+    Keeps one buffer per machine spanning the largest window and a left
+    pointer per window, so each reading is added and evicted exactly once.
+    Produces the same feature names and values as time_rolling_statistics.
+
+    Safe to share between the threads of the serving app. A reading older
+    than the machine's last one (a replay, clock skew) is scored against the
+    current windows without entering them, and a retry of the last reading
+    (same machine and timestamp) is not counted twice. Machines silent for
+    longer than the largest window are dropped: none of their readings could
+    reach a window again.
+    """
+
+    def __init__(self, columns=['vibration', 'temperature', 'pressure'],
+                 windows=[1, 4, 8], stats=ROLLING_STATS):
+        """
+        Args:
+            columns: Sensor columns to track
+            windows: Window lengths in hours
+            stats: Statistics to report
+        """
+        self.columns = list(columns)
+        self.windows = sorted(windows)
+        self.stats = list(stats)
+        self.window_ns = {w: int(pd.Timedelta(hours=w).value) for w in self.windows}
+        self.machines = {}
+        self.late_readings = 0
+        self.duplicate_readings = 0
+        self._lock = threading.Lock()
+        self._newest_ts = None
+        self._last_sweep_ts = None
+
+    def update(self, machine_id, timestamp, readings):
+        """
+        Add one reading and return the current rolling features
+
+        Args:
+            machine_id: Machine identifier
+            timestamp: datetime or string timestamp
+            readings: dict of column -> value
+
+        Returns:
+            dict: feature name -> value
+        """
+        ts = pd.Timestamp(timestamp).value
+        with self._lock:
+            buffer = self.machines.get(machine_id)
+            if buffer is None:
+                buffer = _MachineBuffer(self.columns, self.windows)
+                self.machines[machine_id] = buffer
+
+            if buffer.last_ts is not None and ts <= buffer.last_ts:
+                # A retry of the last reading would skew the statistics; a late
+                # one would break the sorted buffer (and may be a retry as well)
+                if ts == buffer.last_ts:
+                    self.duplicate_readings += 1
+                else:
+                    self.late_readings += 1
+                return self._features(buffer)
+
+            features = self._add(buffer, ts, readings)
+            self._evict_idle(ts, keep=machine_id)
+            return features
+
+    def _features(self, buffer):
+        """Current statistics of a machine's windows"""
+        features = {}
+        for window in self.windows:
+            for col in self.columns:
+                current = buffer.states[(col, window)].values()
+                for stat in self.stats:
+                    features[f'{col}_rolling_{stat}_{window}h'] = current[stat]
+        return features
+
+    def _add(self, buffer, ts, readings):
+        """Append an in-order reading and slide every window up to it"""
+        buffer.last_ts = ts
+
+        pos = buffer.base + len(buffer.readings)
+        values = {col: float(readings[col]) for col in self.columns}
+        buffer.readings.append((ts, values))
+
+        features = {}
+        for window in self.windows:
+            edge = ts - self.window_ns[window]
+            for col in self.columns:
+                state = buffer.states[(col, window)]
+                state.add(pos, values[col])
+
+                # Advance the left pointer past readings outside (ts - w, ts]
+                while True:
+                    old_ts, old_values = buffer.readings[state.left - buffer.base]
+                    if old_ts > edge:
+                        break
+                    state.remove(state.left, old_values[col])
+                    state.left += 1
+
+                current = state.values()
+                for stat in self.stats:
+                    features[f'{col}_rolling_{stat}_{window}h'] = current[stat]
+
+        # Drop readings no window can reach any more
+        oldest_needed = min(state.left for state in buffer.states.values())
+        while buffer.base < oldest_needed:
+            buffer.readings.popleft()
+            buffer.base += 1
+
+        return features
+
+    def _evict_idle(self, ts, keep):
+        """Drop machines idle for longer than the largest window"""
+        if self._newest_ts is None or ts > self._newest_ts:
+            self._newest_ts = ts
+        horizon = self.window_ns[self.windows[-1]]
+        # Sweep at most once per largest window of reading time
+        if self._last_sweep_ts is None:
+            self._last_sweep_ts = self._newest_ts
+        if self._newest_ts - self._last_sweep_ts < horizon:
+            return
+        self._last_sweep_ts = self._newest_ts
+        edge = self._newest_ts - horizon
+        for machine_id in [m for m, b in self.machines.items() if b.last_ts <= edge and m != keep]:
+            del self.machines[machine_id]
+
+    def reset(self, machine_id=None):
+        """Forget buffered history for one machine, or all machines"""
+        with self._lock:
+            if machine_id is None:
+                self.machines.clear()
+            else:
+                self.machines.pop(machine_id, None)
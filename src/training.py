@@ -0,0 +1,310 @@
+"""
+FactoryGuard AI - Training Library
+Data loading, temporal split, fitting, evaluation and model saving shared by
+the baseline, imbalance and XGBoost tuning scripts
+
+The train/test split of a dataset is prepared once: feature columns are
+selected, rows are sorted by time and cut 70/30, and both parts are written as
+float32 memory-mappable matrices (temporal_cv.FeatureMatrix) under
+data/cache/matrices/, keyed by a hash of the dataset and the split settings.
+Later runs (another script, a notebook, a scheduled retrain) map the same
+files instead of re-reading and re-splitting model_ready_data.csv.
+
+Usage:
+    from training import prepare_data, evaluate, save_model
+
+    data = prepare_data()
+    model.fit(data.X_train, data.y_train)
+    metrics = evaluate(model, data.X_test, data.y_test)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import classification_report, f1_score, precision_score, recall_score
+
+try:
+    from .schema import MACHINE_COLUMN, TIME_COLUMN, is_target_column
+    from .stage_cache import get_stage_cache
+    from .storage import read_dataset, resolve_source
+    from .temporal_cv import FeatureMatrix
+    from .training_profiler import profile_phase
+except ImportError:  # run with src/ on sys.path
+    from schema import MACHINE_COLUMN, TIME_COLUMN, is_target_column
+    from stage_cache import get_stage_cache
+    from storage import read_dataset, resolve_source
+    from temporal_cv import FeatureMatrix
+    from training_profiler import profile_phase
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_PATH = PROJECT_ROOT / 'data' / 'processed' / 'model_ready_data.csv'
+MODELS_DIR = PROJECT_ROOT / 'models'
+MATRIX_CACHE_DIR = PROJECT_ROOT / 'data' / 'cache' / 'matrices'
+
+TARGET = 'failure_within_24h'
+TRAIN_FRACTION = 0.7
+
+# Part of the split cache key: bump when feature selection or splitting changes
+SPLIT_VERSION = 2
+
+
+def feature_columns(df):
+    """
+    Numeric model inputs: everything except keys and label columns
+
+    Every 'failure*' column is a label ('failure', 'failure_within_<h>h' for
+    each labelled horizon), so extra horizons never leak in as features.
+    """
+    return [
+        col for col in df.columns
+        if col not in (TIME_COLUMN, MACHINE_COLUMN) and not is_target_column(col)
+        and pd.api.types.is_numeric_dtype(df[col])
+    ]
+
+
+def load_model_data(data_path=DATA_PATH):
+    """Load modeling-ready data (Parquet copy when current)"""
+    df = read_dataset(data_path)
+    print(f"Data loaded successfully from: {data_path}")
+    return df
+
+
+def temporal_split(df, train_fraction=TRAIN_FRACTION):
+    """
+    Sort by time and split at the train_fraction timestamp quantile
+
+    Returns:
+        tuple: (train DataFrame, test DataFrame), both time-ordered
+    """
+    df = df.assign(**{TIME_COLUMN: pd.to_datetime(df[TIME_COLUMN])})
+    df = df.sort_values(TIME_COLUMN, kind='stable').reset_index(drop=True)
+    train_cutoff = df[TIME_COLUMN].quantile(train_fraction)
+    train_mask = df[TIME_COLUMN] <= train_cutoff
+    return df[train_mask], df[~train_mask]
+
+
+def dataset_hash(data_path=DATA_PATH):
+    """Content hash of the file(s) read_dataset would load"""
+    cache = get_stage_cache()
+    source, location = resolve_source(data_path)
+    if source == 'csv':
+        return cache.file_hash(location)
+    digest = hashlib.sha256()
+    for part in sorted(Path(location).rglob('*.parquet')):
+        digest.update(str(part.relative_to(location)).encode('utf-8'))
+        digest.update(cache.file_hash(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TrainTestData:
+    """
+    Prepared temporal split, backed by memory-mapped float32 matrices
+
+    X_train/X_test are DataFrames over the mapped arrays (no copy); train and
+    test expose the FeatureMatrix itself for code that slices rows directly.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.train = FeatureMatrix(self.directory / 'train')
+        self.test = FeatureMatrix(self.directory / 'test')
+
+    @property
+    def feature_cols(self):
+        return self.train.feature_names
+
+    @staticmethod
+    def _frame(matrix):
+        return pd.DataFrame(matrix.X, columns=matrix.feature_names, copy=False)
+
+    @property
+    def X_train(self):
+        return self._frame(self.train)
+
+    @property
+    def X_test(self):
+        return self._frame(self.test)
+
+    @property
+    def y_train(self):
+        return pd.Series(np.asarray(self.train.y), name=TARGET)
+
+    @property
+    def y_test(self):
+        return pd.Series(np.asarray(self.test.y), name=TARGET)
+
+    @property
+    def t_train(self):
+        return pd.Series(self.train.timestamps, name=TIME_COLUMN)
+
+    @property
+    def t_test(self):
+        return pd.Series(self.test.timestamps, name=TIME_COLUMN)
+
+    @property
+    def scale_pos_weight(self):
+        """Negatives per positive in the training split"""
+        y = self.train.y
+        return float((y == 0).sum() / max(int((y == 1).sum()), 1))
+
+
+def prepare_data(data_path=DATA_PATH, train_fraction=TRAIN_FRACTION, target=TARGET,
+                 cache_dir=MATRIX_CACHE_DIR):
+    """
+    Load, select features, split and cache a dataset as memmapped matrices
+
+    A second call with the same dataset content and settings only maps the
+    cached files.
+
+    Args:
+        data_path: Modeling-ready dataset (CSV path or Parquet directory)
+        train_fraction: Timestamp quantile of the train/test cut
+        target: Label column
+        cache_dir: Parent directory of prepared splits
+
+    Returns:
+        TrainTestData
+    """
+    params = json.dumps({'target': target, 'train_fraction': train_fraction, 'version': SPLIT_VERSION},
+                        sort_keys=True)
+    with profile_phase('hash_dataset'):
+        key = hashlib.sha256((dataset_hash(data_path) + params).encode('utf-8')).hexdigest()[:16]
+    directory = Path(cache_dir) / f'split-{key}'
+    if (directory / 'test' / 'meta.json').exists():
+        print(f"Prepared split loaded from {directory}")
+        return TrainTestData(directory)
+
+    with profile_phase('load_data'):
+        df = load_model_data(data_path)
+    with profile_phase('feature_selection'):
+        feature_cols = feature_columns(df)
+    with profile_phase('temporal_split'):
+        train, test = temporal_split(df, train_fraction=train_fraction)
+    del df
+
+    # Written next to the final directory and renamed, so readers never see a partial split
+    tmp_dir = directory.with_name(f'{directory.name}.tmp-{os.getpid()}')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    with profile_phase('write_matrices'):
+        for name, part in (('train', train), ('test', test)):
+            groups = part[MACHINE_COLUMN] if MACHINE_COLUMN in part.columns else None
+            FeatureMatrix.create(tmp_dir / name, part[feature_cols], part[target], part[TIME_COLUMN],
+                                 groups=groups)
+    try:
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # Another process finished the same split first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"Prepared split: {len(train):,} train / {len(test):,} test rows, "
+          f"{len(feature_cols)} features -> {directory}")
+    return TrainTestData(directory)
+
+
+def evaluate(model, X_test, y_test, threshold=0.5):
+    """
+    Test-set metrics of a fitted classifier
+
+    Returns:
+        dict: f1_score, recall, precision and the classification report text
+    """
+    y_pred = (model.predict_proba(X_test)[:, 1] >= threshold).astype(int)
+    return {
+        'f1_score': float(f1_score(y_test, y_pred)),
+        'recall': float(recall_score(y_test, y_pred)),
+        'precision': float(precision_score(y_test, y_pred, zero_division=0)),
+        'report': classification_report(y_test, y_pred),
+    }
+
+
+def json_safe(value):
+    """Convert numpy scalars and arrays (e.g. sampled best_params) for json.dump"""
+    if isinstance(value, dict):
+        return {str(k): json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def save_model(model, feature_cols, metrics, models_dir=MODELS_DIR, name='xgboost_best', metadata=None):
+    """
+    Save a versioned model, the current copy, feature names and metadata
+
+    Args:
+        model: Fitted model
+        feature_cols: Feature names in model input order
+        metrics: Test-set metrics, a dict with at least f1_score and recall;
+                 None for a model without a test-set evaluation (its keys
+                 are written as null so versions compare like for like)
+        models_dir: Output directory
+        name: Model file stem
+        metadata: Extra metadata fields (best_params, tuning, ...)
+
+    Returns:
+        dict: the metadata written to model_metadata.json
+    """
+    models_dir = Path(models_dir)
+    models_dir.mkdir(parents=True, exist_ok=True)
+
+    model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
+    versioned_model_path = models_dir / f'{name}_v{model_version}.pkl'
+    suffix = 1
+    while versioned_model_path.exists():
+        # Two saves within one second (e.g. a parent and its incremental update)
+        model_version = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        versioned_model_path = models_dir / f'{name}_v{model_version}.pkl'
+        suffix += 1
+    model_path = models_dir / f'{name}.pkl'  # Keep for backward compatibility
+
+    joblib.dump(model, versioned_model_path)
+    print(f"Versioned model saved to {versioned_model_path}")
+    joblib.dump(model, model_path)
+    print(f"Model saved to {model_path}")
+
+    feature_names_path = models_dir / 'feature_names.pkl'
+    joblib.dump(list(feature_cols), feature_names_path)
+    print(f"Feature names saved to {feature_names_path}")
+
+    result = {
+        "version": model_version,
+        "model_path": str(versioned_model_path),
+        "training_date": datetime.now().isoformat(),
+        "f1_score": None if metrics is None else float(metrics['f1_score']),
+        "recall": None if metrics is None else float(metrics['recall']),
+        "feature_count": len(feature_cols),
+        **json_safe(metadata or {}),
+    }
+    metadata_path = models_dir / 'model_metadata.json'
+    with open(metadata_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Model metadata saved to {metadata_path}")
+    return result
+
+
+def update_metadata(models_dir=MODELS_DIR, **fields):
+    """
+    Add fields to the current model_metadata.json
+
+    Returns:
+        dict: the updated metadata
+    """
+    metadata_path = Path(models_dir) / 'model_metadata.json'
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    metadata.update(json_safe(fields))
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    print(f"Model metadata updated in {metadata_path} ({', '.join(fields)})")
+    return metadata
@@ -0,0 +1,218 @@
+"""
+FactoryGuard AI - Training Profiler
+Wall time, CPU time and peak memory of each named phase of a training run
+
+A training script runs inside a TrainingProfiler and marks its phases:
+
+    with TrainingProfiler('xgboost_tuning') as profiler:
+        with profile_phase('prepare_data'):
+            data = prepare_data()
+        ...
+
+Library code (training.prepare_data, the searches) marks its own sub-phases
+with profile_phase, which records into the active profiler and does nothing
+when none is running. Nested phases are reported as 'parent/child'.
+
+For each phase the report gives wall seconds, CPU seconds of this process
+(all threads), CPU seconds of child processes reaped during the phase
+(ProcessPoolExecutor workers), and resident memory at the start, at the end
+and at its peak. The peak comes from a background thread sampling RSS, and
+is exact whenever the phase raised the process high-water mark.
+
+When the run ends, successfully or not, the report is written next to
+model_metadata.json as training_profile_<name>.json (the latest run) and
+appended to training_profiles.jsonl. A run that saved a model also writes
+training_profile_<name>_v<version>.json, which model_metadata.json
+references and later runs never overwrite.
+"""
+
+import json
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from .schema import current_rss_mb, peak_rss_mb
+except ImportError:  # run with src/ on sys.path
+    from schema import current_rss_mb, peak_rss_mb
+
+
+PROFILES_LOG = 'training_profiles.jsonl'
+SAMPLE_INTERVAL = 0.05
+
+_active = None
+
+
+def profile_path(models_dir, name, version=None):
+    """Profile of a model version, or the latest profile of a training script"""
+    suffix = '' if version is None else f'_v{version}'
+    return Path(models_dir) / f'training_profile_{name}{suffix}.json'
+
+
+def _child_cpu_seconds():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@contextmanager
+def profile_phase(name):
+    """Record a phase in the active profiler, if any"""
+    if _active is None:
+        yield
+    else:
+        with _active.phase(name):
+            yield
+
+
+class TrainingProfiler:
+    """
+    Per-phase time and memory of one training run
+
+    Args:
+        name: Run name, e.g. the script ('xgboost_tuning')
+        models_dir: Where the report is written (None: not written)
+        sample_interval: Seconds between RSS samples
+    """
+
+    def __init__(self, name, models_dir=None, sample_interval=SAMPLE_INTERVAL):
+        self.name = name
+        self.models_dir = None if models_dir is None else Path(models_dir)
+        self.sample_interval = sample_interval
+        self.model_version = None
+        self.phases = []
+        self.status = None
+        self._open = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._previous = None
+
+    def __enter__(self):
+        global _active
+        self._previous, _active = _active, self
+        self.started_at = datetime.now()
+        self._start = self._snapshot()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample, name='training-profiler', daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        _active = self._previous
+        self._stop.set()
+        self._sampler.join()
+        self.status = 'ok' if exc_type is None else f'failed: {exc_type.__name__}'
+        self._end = self._snapshot()
+        if self.models_dir is not None:
+            self.save()
+        return False
+
+    @staticmethod
+    def _snapshot():
+        return {
+            'wall': time.perf_counter(),
+            'cpu': time.process_time(),
+            'child_cpu': _child_cpu_seconds(),
+            'rss': current_rss_mb() or 0.0,
+            'max_rss': peak_rss_mb() or 0.0,
+        }
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss_mb()
+            if rss is None:
+                return
+            with self._lock:
+                for record in self._open:
+                    record['peak_rss_mb'] = max(record['peak_rss_mb'], rss)
+
+    @contextmanager
+    def phase(self, name):
+        """Time a named phase; nested phases are named 'outer/inner'"""
+        with self._lock:
+            path = '/'.join([r['phase'] for r in self._open[-1:]] + [name])
+            start = self._snapshot()
+            record = {'phase': path, 'depth': len(self._open), 'peak_rss_mb': start['rss']}
+            self._open.append(record)
+            self.phases.append(record)
+        failed = True
+        try:
+            yield record
+            failed = False
+        finally:
+            end = self._snapshot()
+            with self._lock:
+                self._open.remove(record)
+            # A raised high-water mark was reached inside this phase
+            peak = end['max_rss'] if end['max_rss'] > start['max_rss'] else max(record['peak_rss_mb'], end['rss'])
+            record.update({
+                'start_seconds': round(start['wall'] - self._start['wall'], 3),
+                'wall_seconds': round(end['wall'] - start['wall'], 3),
+                'cpu_seconds': round(end['cpu'] - start['cpu'], 3),
+                'child_cpu_seconds': round(end['child_cpu'] - start['child_cpu'], 3),
+                'rss_start_mb': round(start['rss'], 1),
+                'rss_end_mb': round(end['rss'], 1),
+                'peak_rss_mb': round(peak, 1),
+                'failed': failed,
+            })
+
+    def report(self):
+        """The run report as a JSON-serialisable dict"""
+        end = getattr(self, '_end', None) or self._snapshot()
+        return {
+            'name': self.name,
+            'status': self.status or 'running',
+            'model_version': self.model_version,
+            'started_at': self.started_at.isoformat(),
+            'wall_seconds': round(end['wall'] - self._start['wall'], 3),
+            'cpu_seconds': round(end['cpu'] - self._start['cpu'], 3),
+            'child_cpu_seconds': round(end['child_cpu'] - self._start['child_cpu'], 3),
+            'peak_rss_mb': round(end['max_rss'], 1),
+            'host': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+            },
+            'phases': self.phases,
+        }
+
+    def save(self, models_dir=None):
+        """
+        Write the latest profile (and the model version's) and append it to the profile history
+
+        Returns:
+            Path: the versioned profile if a model version was set, else the latest one
+        """
+        models_dir = Path(models_dir or self.models_dir)
+        models_dir.mkdir(parents=True, exist_ok=True)
+        report = self.report()
+        paths = [profile_path(models_dir, self.name)]
+        if self.model_version is not None:
+            paths.append(profile_path(models_dir, self.name, self.model_version))
+        for path in paths:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+        with open(models_dir / PROFILES_LOG, 'a') as f:
+            f.write(json.dumps(report) + '\n')
+        print(f"Training profile saved to {path}")
+        return path
+
+    def print_summary(self):
+        print(f"\n=== Training Profile ({self.name}) ===")
+        print(f"{'phase':40s} {'wall s':>9s} {'cpu s':>9s} {'peak MB':>9s}")
+        for record in self.phases:
+            if 'wall_seconds' in record:
+                print(f"{record['phase']:40s} {record['wall_seconds']:>9.2f} "
+                      f"{record['cpu_seconds'] + record['child_cpu_seconds']:>9.2f} {record['peak_rss_mb']:>9.1f}")
@@ -1,66 +1,51 @@
+"""
+FactoryGuard AI - XGBoost Tuning
+Hyperparameter search for the production XGBoost model
 
-import pandas as pd
-import xgboost as xgb
-from sklearn.model_selection import RandomizedSearchCV, train_test_split
-from sklearn.metrics import classification_report, f1_score, recall_score
-from scipy.stats import randint, uniform
-import joblib
+Importable: the search functions take a prepared split directory (see
+training.prepare_data), so notebooks and schedulers can call them without
+running the script. Running the module tunes, evaluates and saves the model.
+
+With --latency-budget-ms, the winner is the best candidate whose /predict
+latency (prediction plus explanation of one row, see inference_cost.py)
+fits the budget, rather than the best candidate outright.
+
+Random search trials (one candidate on one fold) are appended to a JSONL
+log next to the prepared split as they finish; rerunning an interrupted
+search fits only the trials that are missing.
+
+Usage:
+    python src/xgboost_tuning.py --n-jobs 8 --threads-per-trial 2
+    python src/xgboost_tuning.py --search halving --time-budget 600
+    python src/xgboost_tuning.py --search halving --latency-budget-ms 5
+"""
+
+import argparse
 import os
 from pathlib import Path
 
-# Get project root directory (parent of src directory)
-PROJECT_ROOT = Path(__file__).parent.parent
-DATA_PATH = PROJECT_ROOT / 'data' / 'processed' / 'model_ready_data.csv'
-MODELS_DIR = PROJECT_ROOT / 'models'
-
-# Ensure models directory exists
-os.makedirs(MODELS_DIR, exist_ok=True)
+import xgboost as xgb
+from sklearn.model_selection import ParameterSampler
+from scipy.stats import randint, uniform
 
-# Load modeling-ready data
 try:
-    df = pd.read_csv(DATA_PATH)
-    print(f"Data loaded successfully from: {DATA_PATH}")
-except FileNotFoundError:
-    print(f"Error: {DATA_PATH} not found.")
-    print(f"Current working directory: {os.getcwd()}")
-    print(f"Project root: {PROJECT_ROOT}")
-    exit(1)
-
-# Prepare features and target
-# Exclude non-numeric columns and target columns
-exclude_cols = ['timestamp', 'machine_id', 'failure', 'failure_within_24h']
-# Select only numeric columns for features, just in case there are other string columns
-feature_cols = [col for col in df.columns if col not in exclude_cols and pd.api.types.is_numeric_dtype(df[col])]
-X = df[feature_cols]
-y = df['failure_within_24h']
-
-# Train-test split (temporal)
-if 'timestamp' in df.columns:
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp')
-    train_cutoff = df['timestamp'].quantile(0.7)
-    train_mask = df['timestamp'] <= train_cutoff
-    X_train, X_test = X[train_mask], X[~train_mask]
-    y_train, y_test = y[train_mask], y[~train_mask]
-else:
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-
-# Calculate scale_pos_weight for imbalance
-scale_pos_weight = (y_train == 0).sum() / (y_train == 1).sum()
-print(f"Calculated scale_pos_weight: {scale_pos_weight:.2f}")
-
-# XGBoost baseline
-print("Setting up XGBoost RandomizedSearchCV...")
-xgb_model = xgb.XGBClassifier(
-    objective='binary:logistic',
-    scale_pos_weight=scale_pos_weight,
-    random_state=42,
-    tree_method='hist',
-    eval_metric='aucpr' # Precision-Recall AUC
-)
+    from .halving_search import HalvingSearch, temporal_validation_split
+    from .inference_cost import measure_inference_cost, request_latency
+    from .stage_cache import get_stage_cache
+    from .temporal_cv import cross_validate, rolling_origin_folds, stratified_kfolds
+    from .training import DATA_PATH, MODELS_DIR, TrainTestData, evaluate, prepare_data, save_model, update_metadata
+    from .training_profiler import TrainingProfiler, profile_path, profile_phase
+except ImportError:  # run as a script from src/
+    from halving_search import HalvingSearch, temporal_validation_split
+    from inference_cost import measure_inference_cost, request_latency
+    from stage_cache import get_stage_cache
+    from temporal_cv import cross_validate, rolling_origin_folds, stratified_kfolds
+    from training import DATA_PATH, MODELS_DIR, TrainTestData, evaluate, prepare_data, save_model, update_metadata
+    from training_profiler import TrainingProfiler, profile_path, profile_phase
+
 
 # Hyperparameter search space
-param_distributions = {
+PARAM_DISTRIBUTIONS = {
     'max_depth': randint(3, 10),
     'learning_rate': uniform(0.01, 0.3),
     'n_estimators': randint(100, 500),
@@ -69,70 +54,321 @@ param_distributions = {
     'min_child_weight': randint(1, 10),
     'gamma': uniform(0, 0.5)
 }
+N_ITER = 50
+MAX_BUDGET_REFITS = 5
+
+
+def make_classifier(scale_pos_weight, **params):
+    """XGBClassifier with the fixed settings every search shares"""
+    return xgb.XGBClassifier(
+        objective='binary:logistic',
+        scale_pos_weight=scale_pos_weight,
+        random_state=42,
+        tree_method='hist',
+        eval_metric='aucpr',  # Precision-Recall AUC
+        **params
+    )
+
+
+def sample_random_candidates(n_iter=N_ITER, seed=42):
+    """The candidates RandomizedSearchCV draws, as plain Python values"""
+    return [
+        {name: value.item() if hasattr(value, 'item') else value for name, value in params.items()}
+        for params in ParameterSampler(PARAM_DISTRIBUTIONS, n_iter=n_iter, random_state=seed)
+    ]
+
+
+def refit_within_budget(data, ranked_params, latency_budget_ms=None, max_refits=MAX_BUDGET_REFITS):
+    """
+    Refit the best candidate whose serving latency fits the budget
+
+    Candidates are refitted on all training data, best first, and each is
+    timed on single /predict calls until one fits the budget. If none of the
+    first max_refits does, the fastest of them is kept.
+
+    Args:
+        data: TrainTestData
+        ranked_params: Candidate hyperparameters, best first
+        latency_budget_ms: p50 /predict latency allowed (None: refit the best)
+
+    Returns:
+        tuple: (model, rank of the chosen candidate, selection report or None)
+    """
+    if latency_budget_ms is None:
+        model = make_classifier(data.scale_pos_weight, **ranked_params[0])
+        with profile_phase('refit_best'):
+            model.fit(data.X_train, data.y_train)
+        return model, 0, None
+
+    checked = []
+    fastest = None
+    for rank, params in enumerate(ranked_params[:max_refits]):
+        model = make_classifier(data.scale_pos_weight, **params)
+        with profile_phase('refit_best'):
+            model.fit(data.X_train, data.y_train)
+        with profile_phase('latency_check'):
+            latency = request_latency(model, data.X_train)['p50_ms']
+        checked.append({'rank': rank, 'request_p50_ms': latency, 'within_budget': latency <= latency_budget_ms})
+        print(f"  candidate {rank}: {latency:.3f} ms per request (budget {latency_budget_ms} ms)")
+        if latency <= latency_budget_ms:
+            chosen = (model, rank)
+            break
+        if fastest is None or latency < fastest[2]:
+            fastest = (model, rank, latency)
+    else:
+        print(f"No candidate of the top {len(checked)} fits the {latency_budget_ms} ms budget; "
+              f"keeping the fastest (rank {fastest[1]}, {fastest[2]:.3f} ms)")
+        chosen = fastest[:2]
+
+    model, rank = chosen
+    return model, rank, {
+        'latency_budget_ms': latency_budget_ms,
+        'selected_rank': rank,
+        'met': checked[rank]['within_budget'],
+        'checked': checked,
+    }
+
+
+def _checkpointed_search(data, folds, log_path, n_jobs=-1, threads_per_trial=1, latency_budget_ms=None):
+    """
+    Score the random-search candidates on folds through a resumable log
+
+    Each (candidate, fold) trial is appended to log_path with its parameters,
+    scores and timings as it finishes, so an interrupted search only fits the
+    trials missing from the log when run again.
+
+    Args:
+        data: TrainTestData
+        folds: Folds over data.train
+        log_path: JSONL trial log
+        n_jobs: Cores to use (-1 = all); trials run in n_jobs // threads_per_trial processes
+        threads_per_trial: XGBoost threads of each trial
+        latency_budget_ms: See refit_within_budget
+
+    Returns:
+        tuple: (refitted model, params, mean F1 over folds, latency selection or None)
+    """
+    cores = os.cpu_count() if n_jobs == -1 else n_jobs
+    n_workers = max(1, cores // threads_per_trial)
+    base_params = {
+        'objective': 'binary:logistic',
+        'scale_pos_weight': data.scale_pos_weight,
+        'random_state': 42,
+        'tree_method': 'hist',
+    }
+    with profile_phase('cv_fit'):
+        results = cross_validate(data.train, sample_random_candidates(), folds, log_path,
+                                 base_params=base_params, n_jobs=n_workers, rank_by='f1',
+                                 threads_per_trial=threads_per_trial)
+    best = results.iloc[0]
+    print(f"Best mean F1 over folds: {best['mean_f1']:.4f} (+/- {best['std_f1']:.4f}), "
+          f"aucpr {best['mean_aucpr']:.4f}")
+
+    ranked = [dict(params) for params in results['params']]
+    best_model, rank, selection = refit_within_budget(data, ranked, latency_budget_ms)
+    return best_model, ranked[rank], float(results.iloc[rank]['mean_f1']), selection
+
+
+def run_random_search(split_dir, n_jobs=-1, latency_budget_ms=None, threads_per_trial=1):
+    """
+    Random search scored by stratified 3-fold CV
+
+    The candidates and folds RandomizedSearchCV(cv=3) would use, scored
+    through the same resumable trial log as the temporal search.
+    """
+    data = TrainTestData(split_dir)
+    print("Random search with stratified 3-fold CV...")
+    folds = stratified_kfolds(data.train.y, n_splits=3)
+    return _checkpointed_search(data, folds, Path(split_dir) / 'kfold_search_folds.jsonl', n_jobs=n_jobs,
+                                threads_per_trial=threads_per_trial, latency_budget_ms=latency_budget_ms)
+
+
+def run_temporal_random_search(split_dir, n_jobs=-1, latency_budget_ms=None, threads_per_trial=1):
+    """
+    Random search scored by rolling-origin temporal CV
+
+    The same candidates RandomizedSearchCV would draw are scored on three
+    expanding-window folds of the memory-mapped training matrix. Fold scores
+    are logged next to the split, so an interrupted search resumes.
+    """
+    data = TrainTestData(split_dir)
+    folds = rolling_origin_folds(data.train.timestamps, n_folds=3)
+    for k, (train_start, train_end, test_start, test_end) in enumerate(folds):
+        print(f"  fold {k}: train rows [{train_start:,}, {train_end:,}), test rows [{test_start:,}, {test_end:,})")
+    return _checkpointed_search(data, folds, Path(split_dir) / 'random_search_folds.jsonl', n_jobs=n_jobs,
+                                threads_per_trial=threads_per_trial, latency_budget_ms=latency_budget_ms)
+
+
+def run_halving_search(split_dir, method='halving', n_candidates=27, time_budget=None, latency_budget_ms=None):
+    """Successive halving (or Hyperband) over boosting rounds, then refit on all training data"""
+    data = TrainTestData(split_dir)
+    X_fit, X_val, y_fit, y_val = temporal_validation_split(data.X_train, data.y_train, data.t_train)
+    print(f"Successive halving ({method}): fit on {len(X_fit):,} rows, "
+          f"validate on the latest {len(X_val):,} rows by aucpr")
+
+    search = HalvingSearch(
+        base_params={
+            'objective': 'binary:logistic',
+            'scale_pos_weight': data.scale_pos_weight,
+            'tree_method': 'hist',
+            'seed': 42,
+        },
+        n_candidates=n_candidates,
+        time_budget=time_budget,
+        method=method
+    )
+    with profile_phase('halving_fit'):
+        search.fit(X_fit, y_fit, X_val, y_val)
+
+    ranked = search.ranked_candidates()
+    best_model, rank, selection = refit_within_budget(data, [params for params, _ in ranked], latency_budget_ms)
+    best_params, best_score = ranked[rank]
+    return best_model, best_params, best_score, {**search.summary(), 'latency_selection': selection}
+
+
+def _rounded(seconds):
+    """Search seconds for the report (None when a cached result predates timing)"""
+    return None if seconds is None else round(seconds, 2)
+
+
+def tune(data, search='random', cv='temporal', n_jobs=-1, n_candidates=27, time_budget=None,
+         latency_budget_ms=None, threads_per_trial=1):
+    """
+    Run the chosen search(es) on a prepared split
+
+    Args:
+        data: TrainTestData
+        search: 'random', 'halving', 'hyperband' or 'compare' (random and halving)
+        cv: Random search folds, 'temporal' or 'kfold'
+        latency_budget_ms: Keep the best candidate within this p50 /predict latency
+        threads_per_trial: XGBoost threads of each random-search trial
+
+    Returns:
+        tuple: (best model, best params, tuning report dict)
+    """
+    cache = get_stage_cache()
+    split_dir = str(data.directory)
+    results = []
+
+    if search in ('random', 'compare'):
+        # Skipped (and loaded from cache) when the prepared split and search code are unchanged;
+        # the wall-clock reported is the search's own, recorded when it ran
+        func = run_temporal_random_search if cv == 'temporal' else run_random_search
+        stage = 'xgboost_temporal_random_search' if cv == 'temporal' else 'xgboost_random_search'
+        with profile_phase('random_search'):
+            (best_xgb, best_params, best_score, selection), seconds = cache.cached(
+                stage, func,
+                params={'split_dir': split_dir, 'n_jobs': n_jobs, 'latency_budget_ms': latency_budget_ms,
+                        'threads_per_trial': threads_per_trial},
+                timed=True
+            )
+        results.append({'search': 'random', 'seconds': _rounded(seconds),
+                        **evaluate(best_xgb, data.X_test, data.y_test), 'latency_selection': selection})
+
+        print("Best Parameters:", best_params)
+        print(f"Best F1-Score ({cv} CV):", best_score)
+
+    halving = None
+    if search != 'random':
+        method = 'halving' if search == 'compare' else search
+        with profile_phase(f'{method}_search'):
+            (best_xgb, best_params, best_score, halving), seconds = cache.cached(
+                f'xgboost_{method}_search',
+                run_halving_search,
+                params={'split_dir': split_dir, 'method': method, 'n_candidates': n_candidates,
+                        'time_budget': time_budget, 'latency_budget_ms': latency_budget_ms},
+                timed=True
+            )
+        results.append({'search': method, 'seconds': _rounded(seconds),
+                        **evaluate(best_xgb, data.X_test, data.y_test)})
+
+        print("Best Parameters:", best_params)
+        print("Best validation aucpr:", best_score)
+
+    if len(results) > 1 or halving is not None:
+        print("\n=== Tuning Comparison ===")
+        print(f"{'search':10s} {'F1':>8s} {'recall':>8s} {'wall-clock':>12s}")
+        for result in results:
+            wall_clock = '-' if result['seconds'] is None else f"{result['seconds']:.1f}s"
+            print(f"{result['search']:10s} {result['f1_score']:>8.4f} {result['recall']:>8.4f} "
+                  f"{wall_clock:>12s}")
+        if halving is not None:
+            print(f"({halving['candidates_trained']} candidates, "
+                  f"{halving['rounds_trained']:,} boosting rounds in total)")
+
+    report = {
+        'search': search,
+        'latency_budget_ms': latency_budget_ms,
+        'results': [{k: v for k, v in r.items() if k != 'report'} for r in results],
+        'halving': halving,
+    }
+    return best_xgb, best_params, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FactoryGuard AI XGBoost tuning')
+    parser.add_argument('--data', default=str(DATA_PATH), help='Modeling-ready dataset')
+    parser.add_argument('--search', default='random', choices=['random', 'halving', 'hyperband', 'compare'],
+                        help="'compare' runs random search and successive halving and reports both")
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Seconds allowed for the halving/Hyperband search')
+    parser.add_argument('--candidates', type=int, default=27, help='Candidates in the first halving rung')
+    parser.add_argument('--cv', default='temporal', choices=['temporal', 'kfold'],
+                        help='Random search folds: rolling-origin over a shared memmap, or sklearn 3-fold')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Cores for the random search (-1 = all)')
+    parser.add_argument('--threads-per-trial', type=int, default=1,
+                        help='XGBoost threads per random-search trial; trials run in n-jobs / threads processes')
+    parser.add_argument('--latency-budget-ms', type=float, default=None,
+                        help='p50 /predict latency (prediction plus explanation) the model must fit')
+    args = parser.parse_args()
+
+    # Per-phase time and memory, written next to model_metadata.json
+    with TrainingProfiler('xgboost_tuning', models_dir=MODELS_DIR) as profiler:
+        try:
+            with profile_phase('prepare_data'):
+                data = prepare_data(args.data)
+        except FileNotFoundError:
+            print(f"Error: {args.data} not found.")
+            print(f"Current working directory: {os.getcwd()}")
+            raise SystemExit(1)
+
+        print(f"Calculated scale_pos_weight: {data.scale_pos_weight:.2f}")
+
+        with profile_phase('tune'):
+            best_xgb, best_params, report = tune(
+                data, search=args.search, cv=args.cv, n_jobs=args.n_jobs,
+                n_candidates=args.candidates, time_budget=args.time_budget,
+                latency_budget_ms=args.latency_budget_ms, threads_per_trial=args.threads_per_trial
+            )
+
+        # Evaluate best model
+        with profile_phase('evaluate'):
+            metrics = evaluate(best_xgb, data.X_test, data.y_test)
+        print("\n=== XGBoost Results ===")
+        print(metrics['report'])
+        print(f"F1-Score: {metrics['f1_score']:.4f}")
+        print(f"Recall: {metrics['recall']:.4f}")
+
+        # Serving cost on this hardware, kept with the model it describes
+        with profile_phase('inference_cost'):
+            cost = measure_inference_cost(best_xgb, data.X_test)
+        print(f"Per request: {cost['request']['p50_ms']:.3f} ms p50 "
+              f"(predict {cost['predict_row']['p50_ms']:.3f} ms), model {cost['model_size_mb']:.2f} MB")
+
+        # Save the best model with versioning
+        with profile_phase('save_model'):
+            saved = save_model(best_xgb, data.feature_cols, metrics, models_dir=MODELS_DIR, metadata={
+                "best_params": best_params,
+                "scale_pos_weight": data.scale_pos_weight,
+                "tuning": report,
+                "inference_cost": cost,
+            })
+        # Written when the run ends, under a name no later run reuses
+        profiler.model_version = saved['version']
+        update_metadata(MODELS_DIR,
+                        training_profile=profile_path(MODELS_DIR, profiler.name, saved['version']).name)
+        profiler.print_summary()
 
-# RandomizedSearchCV with F1 scoring
-# Note: n_iter=50 might take a while. Reduce for testing if needed.
-random_search = RandomizedSearchCV(
-    xgb_model,
-    param_distributions=param_distributions,
-    n_iter=50,
-    scoring='f1',
-    cv=3,
-    verbose=2,
-    random_state=42,
-    n_jobs=-1
-)
-
-print("Starting hyperparameter tuning...")
-random_search.fit(X_train, y_train)
-
-print("Best Parameters:", random_search.best_params_)
-print("Best F1-Score (CV):", random_search.best_score_)
-
-# Evaluate best model
-best_xgb = random_search.best_estimator_
-y_pred_xgb = best_xgb.predict(X_test)
-y_pred_proba = best_xgb.predict_proba(X_test)[:, 1]
-
-print("\n=== XGBoost Results ===")
-print(classification_report(y_test, y_pred_xgb))
-print(f"F1-Score: {f1_score(y_test, y_pred_xgb):.4f}")
-print(f"Recall: {recall_score(y_test, y_pred_xgb):.4f}")
-
-# Save the best model with versioning
-from datetime import datetime
-import json
-
-model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
-versioned_model_path = MODELS_DIR / f'xgboost_best_v{model_version}.pkl'
-model_path = MODELS_DIR / 'xgboost_best.pkl'  # Keep for backward compatibility
-
-# Save versioned model
-joblib.dump(best_xgb, versioned_model_path)
-print(f"Versioned model saved to {versioned_model_path}")
-
-# Save current model (backward compatibility)
-joblib.dump(best_xgb, model_path)
-print(f"Model saved to {model_path}")
-
-# Save feature names
-feature_names_path = MODELS_DIR / 'feature_names.pkl'
-joblib.dump(feature_cols, feature_names_path)
-print(f"Feature names saved to {feature_names_path}")
-
-# Save model metadata
-metadata = {
-    "version": model_version,
-    "model_path": str(versioned_model_path),
-    "training_date": datetime.now().isoformat(),
-    "f1_score": float(f1_score(y_test, y_pred_xgb)),
-    "recall": float(recall_score(y_test, y_pred_xgb)),
-    "feature_count": len(feature_cols),
-    "best_params": random_search.best_params_,
-    "scale_pos_weight": float(scale_pos_weight)
-}
 
-metadata_path = MODELS_DIR / 'model_metadata.json'
-with open(metadata_path, 'w') as f:
-    json.dump(metadata, f, indent=2)
-print(f"Model metadata saved to {metadata_path}")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,509 @@
+"""
+FactoryGuard AI - Open-Loop Load Generator
+Drives the prediction API at a fixed or Poisson arrival rate, or replays
+recorded traffic, and records latency in an HDR histogram
+
+latency_test.py is closed-loop: each worker waits for its response before
+sending again, so when the API stalls the test stops sending and the stall
+never shows up in the numbers (coordinated omission). Here every request has
+an intended send time taken from the arrival schedule alone. Requests go out
+on time whether or not earlier ones have completed, and latency is measured
+from the intended send time, so time spent queueing for a connection or
+behind a slow response counts. Service time (from the actual send) is kept
+in a second histogram for comparison.
+
+Requests are sent from one asyncio event loop over a pool of keep-alive
+HTTP/1.1 connections. The Flask development server answers with HTTP/1.0
+and closes every connection, so 'Connections' in the report equals the
+request count there; a keep-alive server reuses up to --connections.
+
+Recorded traffic is JSONL, one request per line, either a prediction
+payload with its 'timestamp' or {"timestamp", "path", "body"}. Arrival gaps
+are taken from the timestamps and divided by the speed-up. --record writes
+generated traffic in the same format for later replay.
+
+Usage:
+    python tests/load_generator.py --rate 200 --duration 30 --arrival poisson
+    python tests/load_generator.py --replay traffic.jsonl --speedup 20
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import numpy as np
+
+try:
+    from .latency_test import LatencyTester
+except ImportError:  # run as a script from tests/
+    from latency_test import LatencyTester
+
+
+ARRIVALS = ('fixed', 'poisson')
+REPLAY_TIME_FIELDS = ('timestamp', 'sent_at', 'time')
+
+
+class HdrHistogram:
+    """
+    High dynamic range histogram of integer values (here microseconds)
+
+    Values are bucketed log-linearly as in HdrHistogram: each power-of-two
+    range holds the same number of linear sub-buckets, enough to keep
+    significant_figures decimal digits, so any recorded value is reported
+    within a relative error of 10 ** -significant_figures in constant memory.
+    Histograms with the same settings merge by adding counts.
+    """
+
+    def __init__(self, highest_trackable=60_000_000, significant_figures=3):
+        """
+        Initialize histogram
+
+        Args:
+            highest_trackable: Largest value recorded exactly (larger ones
+                               are clamped and counted in clamped)
+            significant_figures: Decimal digits of precision (1-5)
+        """
+        self.highest_trackable = int(highest_trackable)
+        self.significant_figures = significant_figures
+
+        sub_bucket_count = 2 ** math.ceil(math.log2(2 * 10 ** significant_figures))
+        self.sub_bucket_bits = int(math.log2(sub_bucket_count))
+        self.sub_bucket_half_bits = self.sub_bucket_bits - 1
+        self.sub_bucket_half = sub_bucket_count // 2
+
+        bucket_count = max(1, self.highest_trackable.bit_length() - self.sub_bucket_bits + 1)
+        self.counts = np.zeros((bucket_count + 1) << self.sub_bucket_half_bits, dtype=np.int64)
+        self.total = 0
+        self.clamped = 0
+        self.min = None
+        self.max = None
+        self._sum = 0
+
+    def _indices(self, values):
+        values = np.asarray(values, dtype=np.int64)
+        bits = np.zeros(values.shape, dtype=np.int64)
+        positive = values > 0
+        # bit_length of each value, without a Python loop
+        bits[positive] = np.floor(np.log2(values[positive])).astype(np.int64) + 1
+        bucket = np.maximum(bits - self.sub_bucket_bits, 0)
+        sub_bucket = values >> bucket
+        return ((bucket + 1) << self.sub_bucket_half_bits) + sub_bucket - self.sub_bucket_half
+
+    def _lowest_equivalent(self, index):
+        bucket = (index >> self.sub_bucket_half_bits) - 1
+        sub_bucket = (index & (self.sub_bucket_half - 1)) + self.sub_bucket_half
+        if bucket < 0:
+            sub_bucket -= self.sub_bucket_half
+            bucket = 0
+        return sub_bucket << bucket, bucket
+
+    def _highest_equivalent(self, index):
+        value, bucket = self._lowest_equivalent(index)
+        return value + (1 << bucket) - 1
+
+    def record(self, values):
+        """Record one value or an array of values"""
+        values = np.atleast_1d(np.asarray(values, dtype=np.int64))
+        if not len(values):
+            return self
+        values = np.maximum(values, 0)
+        over = values > self.highest_trackable
+        if over.any():
+            self.clamped += int(over.sum())
+            values = np.minimum(values, self.highest_trackable)
+
+        np.add.at(self.counts, self._indices(values), 1)
+        self.total += len(values)
+        self._sum += int(values.sum())
+        low, high = int(values.min()), int(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        return self
+
+    def merge(self, other):
+        """Add another histogram's counts (same settings)"""
+        if len(other.counts) != len(self.counts) or other.significant_figures != self.significant_figures:
+            raise ValueError("Cannot merge histograms with different ranges or precision")
+        self.counts += other.counts
+        self.total += other.total
+        self.clamped += other.clamped
+        self._sum += other._sum
+        for attr, pick in (('min', min), ('max', max)):
+            theirs = getattr(other, attr)
+            if theirs is not None:
+                mine = getattr(self, attr)
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+        return self
+
+    def value_at_percentile(self, percentile):
+        """Smallest value at or above the given percentile of recorded values"""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(percentile / 100 * self.total))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self._highest_equivalent(index), self.max)
+
+    @property
+    def mean(self):
+        return self._sum / self.total if self.total else None
+
+    def summary(self, percentiles=(50, 90, 95, 99, 99.9, 99.99), scale=1000):
+        """
+        Percentile distribution in milliseconds (values recorded in us)
+
+        Returns:
+            dict: count, min, mean, max and p<percentile> entries
+        """
+        if not self.total:
+            return {'count': 0}
+        result = {
+            'count': self.total,
+            'min_ms': self.min / scale,
+            'mean_ms': round(self.mean / scale, 3),
+            'max_ms': self.max / scale,
+        }
+        for p in percentiles:
+            result[f"p{p:g}_ms"] = self.value_at_percentile(p) / scale
+        if self.clamped:
+            result['clamped'] = self.clamped
+        return result
+
+
+# ---------------------------------------------------------------------- #
+# Arrival schedules
+# ---------------------------------------------------------------------- #
+
+def arrival_offsets(rate, duration=None, n_requests=None, arrival='fixed', seed=None):
+    """
+    Intended send times, in seconds from the start
+
+    Args:
+        rate: Mean requests per second
+        duration: Schedule length in seconds (or give n_requests)
+        n_requests: Number of requests
+        arrival: 'fixed' (evenly spaced) or 'poisson' (exponential gaps)
+        seed: Seed for Poisson gaps
+
+    Returns:
+        np.ndarray of offsets
+    """
+    if arrival not in ARRIVALS:
+        raise ValueError(f"arrival must be one of {ARRIVALS}, got {arrival!r}")
+    if n_requests is None:
+        if duration is None:
+            raise ValueError("Give duration or n_requests")
+        n_requests = int(rate * duration)
+
+    if arrival == 'fixed':
+        return np.arange(n_requests) / rate
+    gaps = np.random.default_rng(seed).exponential(1 / rate, n_requests)
+    return np.cumsum(gaps) - gaps[0]
+
+
+def _parse_time(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def load_recorded_traffic(path, speedup=1.0, default_path='/predict'):
+    """
+    Read recorded requests for replay
+
+    Args:
+        path: JSONL file, one request per line
+        speedup: Divide recorded gaps by this factor
+        default_path: Endpoint for bare payloads
+
+    Returns:
+        tuple: (offsets in seconds or None without timestamps, list of (path, body))
+    """
+    times, requests = [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'body' in record:
+                requests.append((record.get('path', default_path), record['body']))
+            else:
+                requests.append((default_path, record))
+            stamp = next((record[k] for k in REPLAY_TIME_FIELDS if k in record), None)
+            times.append(None if stamp is None else _parse_time(stamp))
+
+    if not requests:
+        raise ValueError(f"No requests in {path}")
+    if any(t is None for t in times):
+        return None, requests
+
+    times = np.asarray(times)
+    return (times - times.min()) / speedup, requests
+
+
+def record_traffic(path, offsets, requests, start=None):
+    """Write requests with their send times, in the replay format"""
+    start = time.time() if start is None else start
+    with open(path, 'w') as f:
+        for offset, (endpoint, body) in zip(offsets, requests):
+            f.write(json.dumps({'timestamp': start + float(offset), 'path': endpoint, 'body': body}) + '\n')
+
+
+# ---------------------------------------------------------------------- #
+# Keep-alive HTTP/1.1 client
+# ---------------------------------------------------------------------- #
+
+class ConnectionPool:
+    """
+    Pool of keep-alive HTTP/1.1 connections on asyncio streams
+
+    At most size connections are open; a request waits for a free one,
+    and that wait counts towards its latency.
+    """
+
+    def __init__(self, base_url, size=32, timeout=10.0):
+        parts = urlsplit(base_url)
+        if parts.scheme != 'http':
+            raise ValueError(f"Only http:// URLs are supported, got {base_url}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connection(self):
+        if self._idle:
+            return self._idle.pop()
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, body=b''):
+        """
+        Send one request
+
+        Returns:
+            tuple: (status code, response body bytes, loop time the request was written)
+        """
+        async with self._slots:
+            reader, writer = await self._connection()
+            sent = asyncio.get_running_loop().time()
+            try:
+                head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                        f"Connection: keep-alive\r\n\r\n")
+                writer.write(head.encode() + body)
+                status, payload, keep_alive = await asyncio.wait_for(_read_response(reader), self.timeout)
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, payload, sent
+
+    async def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+async def _read_response(reader):
+    """Status, body and keep-alive flag of one HTTP/1.x response"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before response")
+    version, status = status_line.split(b' ', 2)[:2]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+        headers['connection'] = 'close'
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' and (version == b'HTTP/1.1' or connection == 'keep-alive')
+    return int(status), body, keep_alive
+
+
+# ---------------------------------------------------------------------- #
+# Open-loop runner
+# ---------------------------------------------------------------------- #
+
+async def run_open_loop(base_url, offsets, requests, connections=32, timeout=10.0):
+    """
+    Send requests at their intended times, regardless of responses
+
+    Args:
+        base_url: API base URL (http://host:port)
+        offsets: Intended send time of each request, seconds from start
+        requests: (path, body dict) per request
+        connections: Keep-alive connection pool size
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        dict: histograms ('latency' from intended time, 'service' from the
+              actual send), status counts, errors, timings
+    """
+    pool = ConnectionPool(base_url, size=connections, timeout=timeout)
+    loop = asyncio.get_running_loop()
+    latency = HdrHistogram()
+    service = HdrHistogram()
+    statuses = {}
+    errors = {}
+    # Intended send time to actual write: waiting for a free connection
+    # plus event loop lag
+    send_lag = HdrHistogram()
+
+    # Serialise up front so the send loop only schedules
+    bodies = [(path, json.dumps(body).encode()) for path, body in requests]
+
+    async def send(intended, path, body):
+        try:
+            status, _, sent = await pool.request('POST', path, body)
+            statuses[status] = statuses.get(status, 0) + 1
+        except Exception as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            sent = None
+        done = loop.time()
+        latency.record(int((done - intended) * 1e6))
+        if sent is not None:
+            send_lag.record(int((sent - intended) * 1e6))
+            service.record(int((done - sent) * 1e6))
+
+    tasks = []
+    start = loop.time() + 0.05
+    for offset, (path, body) in zip(offsets, bodies):
+        intended = start + offset
+        delay = intended - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(intended, path, body)))
+    issued = loop.time()
+    await asyncio.gather(*tasks)
+    finished = loop.time()
+    await pool.close()
+
+    return {
+        'latency': latency,
+        'service': service,
+        'send_lag': send_lag,
+        'statuses': statuses,
+        'errors': errors,
+        'connections_opened': pool.opened,
+        'issue_seconds': issued - start,
+        'total_seconds': finished - start,
+    }
+
+
+def summarize(run, offsets, label=''):
+    """JSON-friendly metrics of a run"""
+    n = len(offsets)
+    span = float(offsets[-1] - offsets[0]) if n > 1 else 0.0
+    ok = run['statuses'].get(200, 0)
+    return {
+        'label': label,
+        'requests': n,
+        'intended_rate_per_sec': round((n - 1) / span, 2) if span else None,
+        'achieved_rate_per_sec': round(n / run['issue_seconds'], 2) if run['issue_seconds'] > 0 else None,
+        'success_count': ok,
+        'success_rate': round(100 * ok / n, 2) if n else 0.0,
+        'statuses': {str(k): v for k, v in sorted(run['statuses'].items())},
+        'errors': run['errors'],
+        'connections_opened': run['connections_opened'],
+        'latency_from_intended': run['latency'].summary(),
+        'service_time': run['service'].summary(),
+        'send_lag': run['send_lag'].summary(percentiles=(50, 99)),
+    }
+
+
+def print_summary(metrics):
+    print(f"\n{'='*70}")
+    print(f"OPEN-LOOP LOAD TEST - {metrics['label']}")
+    print(f"{'='*70}")
+    print(f"  Requests:          {metrics['requests']}")
+    print(f"  Intended rate:     {metrics['intended_rate_per_sec']} req/s")
+    print(f"  Achieved rate:     {metrics['achieved_rate_per_sec']} req/s")
+    print(f"  Success rate:      {metrics['success_rate']:.2f}%  statuses={metrics['statuses']} "
+          f"errors={metrics['errors']}")
+    print(f"  Connections:       {metrics['connections_opened']}")
+    print(f"\n  {'':12s} {'from intended':>15s} {'service time':>15s}")
+    corrected, service = metrics['latency_from_intended'], metrics['service_time']
+    for key in ['p50_ms', 'p90_ms', 'p99_ms', 'p99.9_ms', 'max_ms']:
+        if key in corrected:
+            print(f"  {key[:-3]:12s} {corrected[key]:>12.2f} ms {service[key]:>12.2f} ms")
+    print(f"{'='*70}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FactoryGuard AI - Open-loop load generator')
+    parser.add_argument('--url', default='http://localhost:5000', help='API base URL')
+    parser.add_argument('--rate', type=float, default=100, help='Mean arrivals per second')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of traffic')
+    parser.add_argument('--arrival', default='poisson', choices=ARRIVALS)
+    parser.add_argument('--connections', type=int, default=32, help='Keep-alive connections')
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--scenario', default='normal', choices=['normal', 'high_risk', 'low_risk'])
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--replay', help='JSONL of recorded requests to replay')
+    parser.add_argument('--speedup', type=float, default=1.0, help='Replay speed-up factor')
+    parser.add_argument('--record', help='Write the generated traffic as JSONL for replay')
+    parser.add_argument('--output', default='load_test_results.json', help='Output file')
+    args = parser.parse_args()
+
+    tester = LatencyTester(base_url=args.url)
+    if not tester.check_health():
+        print("\n❌ ERROR: API is not healthy or not running")
+        sys.exit(1)
+
+    if args.replay:
+        offsets, requests = load_recorded_traffic(args.replay, speedup=args.speedup)
+        if offsets is None:
+            # No timestamps recorded: keep the order, pace at --rate
+            offsets = arrival_offsets(args.rate, n_requests=len(requests), arrival=args.arrival, seed=args.seed)
+        label = f"replay {args.replay} x{args.speedup:g}"
+    else:
+        offsets = arrival_offsets(args.rate, duration=args.duration, arrival=args.arrival, seed=args.seed)
+        np.random.seed(args.seed)
+        requests = [
+            ('/predict', tester.generate_sample_request(machine_id=f'M{i % 10:03d}', scenario=args.scenario))
+            for i in range(len(offsets))
+        ]
+        label = f"{args.arrival} {args.rate:g} req/s for {args.duration:g}s"
+        if args.record:
+            record_traffic(args.record, offsets, requests)
+            print(f"Recorded traffic saved to: {args.record}")
+
+    run = asyncio.run(run_open_loop(args.url, offsets, requests,
+                                    connections=args.connections, timeout=args.timeout))
+    metrics = summarize(run, offsets, label=label)
+    print_summary(metrics)
+    tester.save_results(metrics, filename=args.output)
+
+
+if __name__ == '__main__':
+    main()
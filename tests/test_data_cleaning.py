@@ -0,0 +1,214 @@
+"""
+Unit tests for data cleaning
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.data_cleaning import (
+    create_target_variable, label_failure_windows, interpolate_by_machine, handle_missing_values,
+    remove_outliers, clean_pipeline_chunked, SENSOR_COLS
+)
+
+
+def reference_labels(df, hours):
+    """Original per-failure mask implementation, kept as the oracle"""
+    df = df.sort_values(['machine_id', 'timestamp'], kind='mergesort').copy()
+    df['label'] = 0
+    for machine_id in df['machine_id'].unique():
+        machine_data = df[df['machine_id'] == machine_id]
+        for failure_time in machine_data.loc[machine_data['failure'] == 1, 'timestamp']:
+            mask = (
+                (df['machine_id'] == machine_id) &
+                (df['timestamp'] < failure_time) &
+                (df['timestamp'] >= failure_time - pd.Timedelta(hours=hours))
+            )
+            df.loc[mask, 'label'] = 1
+    return df['label'].to_numpy()
+
+
+@pytest.fixture
+def sensor_data():
+    """Irregularly sampled readings with several failures per machine"""
+    rng = np.random.default_rng(7)
+    frames = []
+    for machine_id in [3, 1, 2]:
+        offsets = np.cumsum(rng.integers(10, 120, size=400))
+        frames.append(pd.DataFrame({
+            'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(offsets, unit='min'),
+            'machine_id': machine_id,
+            'vibration': rng.normal(0.4, 0.05, size=400),
+            'failure': (rng.random(400) < 0.02).astype(int),
+        }))
+    # Shuffle so the labeler has to sort
+    return pd.concat(frames).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+class TestTargetLabeling:
+    """Test cases for failure-window labeling"""
+
+    @pytest.mark.parametrize('hours', [12, 24, 48])
+    def test_matches_reference(self, sensor_data, hours):
+        """Vectorised labels equal the per-failure loop for each horizon"""
+        result = create_target_variable(sensor_data, failure_window_hours=hours)
+        np.testing.assert_array_equal(
+            result['failure_within_24h'].to_numpy(), reference_labels(sensor_data, hours)
+        )
+
+    def test_multiple_horizons_in_one_pass(self, sensor_data):
+        """Extra horizons are added as their own columns and nest correctly"""
+        result = create_target_variable(sensor_data, extra_horizons=[12, 48])
+
+        assert {'failure_within_24h', 'failure_within_12h', 'failure_within_48h'} <= set(result.columns)
+        assert (result['failure_within_12h'] <= result['failure_within_24h']).all()
+        assert (result['failure_within_24h'] <= result['failure_within_48h']).all()
+
+    def test_external_failure_log(self):
+        """Failures can come from a separate log instead of the 'failure' column"""
+        df = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=6, freq='h'),
+            'machine_id': 1,
+        })
+        log = pd.DataFrame({'machine_id': [1], 'timestamp': [pd.Timestamp('2024-01-01 04:00')]})
+        labels = label_failure_windows(df, horizons=[2], failure_log=log)
+
+        np.testing.assert_array_equal(labels[2], [0, 0, 1, 1, 0, 0])
+
+
+class TestMissingValues:
+    """Test cases for grouped interpolation"""
+
+    @pytest.fixture
+    def gappy_data(self):
+        """Interleaved machines with short, long, leading and trailing gaps"""
+        rng = np.random.default_rng(3)
+        frames = []
+        for machine_id in [2, 1, 3]:
+            values = rng.normal(65, 2, size=80)
+            values[rng.random(80) < 0.2] = np.nan
+            values[:3] = np.nan
+            values[30:60] = np.nan
+            values[-15:] = np.nan
+            offsets = np.cumsum(rng.integers(30, 180, size=80))
+            frames.append(pd.DataFrame({
+                'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(offsets, unit='min'),
+                'machine_id': machine_id,
+                'vibration': values / 100,
+                'temperature': values,
+                'pressure': values + 35,
+            }))
+        return pd.concat(frames).sample(frac=1, random_state=1).reset_index(drop=True)
+
+    @pytest.mark.parametrize('method', ['linear', 'time'])
+    def test_matches_per_machine_interpolate(self, gappy_data, method):
+        """Vectorised fill equals pandas interpolate run machine by machine"""
+        cols = ['vibration', 'temperature', 'pressure']
+        expected = gappy_data.copy()
+        if method == 'time':
+            expected = expected.sort_values(['machine_id', 'timestamp'])
+        for machine_id, group in expected.groupby('machine_id'):
+            if method == 'time':
+                group = group.set_index('timestamp')
+            filled = group[cols].interpolate(method=method, limit=12, limit_direction='both')
+            expected.loc[expected['machine_id'] == machine_id, cols] = filled.to_numpy()
+        expected = expected.sort_index()
+
+        result = interpolate_by_machine(gappy_data, cols, limit=12, time_weighted=(method == 'time'))
+        for col in cols:
+            np.testing.assert_allclose(result[col], expected[col].to_numpy(), equal_nan=True)
+
+    def test_handle_missing_values_drops_long_gaps(self, gappy_data):
+        """Rows left unfilled by the 12-step limit are dropped"""
+        ordered = gappy_data.sort_values(['machine_id', 'timestamp'])
+        result = handle_missing_values(ordered, method='interpolate')
+        assert result[['vibration', 'temperature', 'pressure']].isnull().sum().sum() == 0
+        assert len(result) < len(gappy_data)
+
+
+class TestChunkedPipeline:
+    """Test cases for the streaming clean pipeline"""
+
+    @pytest.fixture
+    def raw_csv(self, tmp_path):
+        """Sorted raw log with gaps, spikes and failures spanning chunk boundaries"""
+        rng = np.random.default_rng(11)
+        frames = []
+        for machine_id in [1, 2, 3]:
+            n = 150
+            values = rng.normal(65, 2, size=(n, 3))
+            values[rng.random((n, 3)) < 0.15] = np.nan
+            values[40:70, 0] = np.nan
+            values[-5:, 2] = np.nan
+            values[:, 1] += np.linspace(0, 20, n)  # drift: early baselines differ from the full history
+            values[rng.random((n, 3)) < 0.02] *= 1.5
+            frames.append(pd.DataFrame({
+                'timestamp': pd.date_range('2024-01-01', periods=n, freq='h'),
+                'machine_id': machine_id,
+                'vibration': values[:, 0] / 100,
+                'temperature': values[:, 1],
+                'pressure': values[:, 2] + 35,
+                'failure': (rng.random(n) < 0.03).astype(int),
+            }))
+        path = tmp_path / 'raw.csv'
+        pd.concat(frames).to_csv(path, index=False)
+        return path
+
+    def test_matches_in_memory_cleaning(self, raw_csv, tmp_path):
+        """Any chunk size gives the same rows and labels as the whole-frame steps, outliers included"""
+        raw = pd.read_csv(raw_csv, parse_dates=['timestamp'])
+        filled = handle_missing_values(raw, method='interpolate')
+        expected = create_target_variable(remove_outliers(filled, columns=SENSOR_COLS, n_std=8))
+        assert len(expected) < len(filled)
+
+        for chunk_size in [17, 50, 200, 1000]:
+            out = tmp_path / f'clean_{chunk_size}.csv'
+            stats = clean_pipeline_chunked(raw_csv, out, chunk_size=chunk_size)
+            result = pd.read_csv(out, parse_dates=['timestamp'])
+
+            assert stats['rows_out'] == len(expected)
+            pd.testing.assert_frame_equal(
+                result.reset_index(drop=True),
+                expected.reset_index(drop=True),
+                check_dtype=False, rtol=1e-5
+            )
+
+    def test_rejects_unsorted_input(self, raw_csv, tmp_path):
+        """Machines split across the file are reported instead of mislabeled"""
+        raw = pd.read_csv(raw_csv)
+        shuffled = tmp_path / 'shuffled.csv'
+        raw.sample(frac=1, random_state=0).to_csv(shuffled, index=False)
+
+        with pytest.raises(ValueError):
+            clean_pipeline_chunked(shuffled, tmp_path / 'out.csv', chunk_size=50)
+
+    def test_dead_sensor_keeps_the_carry_bounded(self):
+        """A sensor that never reports, or stops reporting, does not grow the carry"""
+        from src.data_cleaning import _interpolate_stream
+
+        rng = np.random.default_rng(5)
+        n = 3000
+        values = rng.normal(65, 2, size=(n, 3))
+        values[:, 0] = np.nan          # never reports
+        values[100:2500, 1] = np.nan   # dies, then comes back
+        raw = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=n, freq='h'),
+            'machine_id': 1,
+            'vibration': values[:, 0], 'temperature': values[:, 1], 'pressure': values[:, 2],
+        })
+
+        carry, parts, carried = None, [], []
+        for start in range(0, n, 50):
+            ready, carry = _interpolate_stream(raw.iloc[start:start + 50], carry, final=False, max_gap=200)
+            parts.append(ready)
+            carried.append(len(carry['rows']))
+        parts.append(_interpolate_stream(None, carry, final=True, max_gap=200)[0])
+        result = pd.concat(parts, ignore_index=True)
+
+        assert max(carried) <= 200 + 50 + 12
+        assert len(result) == n and result['vibration'].isna().all()
+        expected = raw['temperature'].interpolate(limit=12, limit_direction='both')
+        # Edges of the long gap are extended flat; everything else matches in-memory filling
+        edges = np.r_[100:112, 2488:2500]
+        np.testing.assert_allclose(result['temperature'].drop(edges), expected.drop(edges), equal_nan=True)
+        np.testing.assert_allclose(result['temperature'][100:112], values[99, 1])
@@ -0,0 +1,179 @@
+"""
+Unit tests for raw sensor ingestion
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_ingestion import (
+    read_sensor_csv, load_sensor_directory, load_sensor_data,
+    stream_merge, merge_datasets, merge_sensor_files
+)
+
+
+RAW_LINES = [
+    'timestamp,machine_id,vibration,temperature,pressure,failure',
+    '2024-01-01 01:00:00,2,0.41,65.2,101.0,0',
+    '2024-01-01 00:00:00,2,0.40,65.0,,0',
+    '2024-01-01 00:00:00,1,0.39,64.1,100.2,0,7',
+    '2024-01-01 01:00:00,1,abc,64.3,100.1,0',
+    '01/01/2024 02:00,1,0.38,64.0,100.0,0',
+    '2024-01-01 03:00:00,,0.38,64.0,100.0,0',
+    '2024-01-01 00:00:00,1,0.37,63.9,100.4,1',
+]
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    path = tmp_path / 'sensor_logs.csv'
+    path.write_text('\n'.join(RAW_LINES) + '\n')
+    return path
+
+
+class TestIngestion:
+    """Test cases for typed CSV ingestion"""
+
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_bad_rows_are_reported_not_fatal(self, raw_csv, engine):
+        """Malformed lines and unparseable values are dropped and listed"""
+        if engine == 'pyarrow':
+            pytest.importorskip('pyarrow')
+        df, bad_rows = read_sensor_csv(raw_csv, engine=engine)
+
+        assert len(df) == 3
+        assert sorted(bad_rows['reason']) == sorted([
+            'expected 6 fields, saw 7', 'invalid vibration',
+            'invalid timestamp', 'missing machine_id',
+        ])
+        if engine == 'c':
+            assert list(bad_rows['line']) == [4, 5, 6, 7]
+
+        # Typed, sorted by (machine_id, timestamp); empty sensor values stay NaN
+        assert df['vibration'].dtype == np.float32
+        assert df['failure'].dtype == np.int8
+        assert list(df['machine_id']) == [1, 2, 2]
+        assert list(df['timestamp'].dt.hour) == [0, 0, 1]
+        assert df['pressure'].isna().sum() == 1
+
+    def test_directory_ingest(self, tmp_path):
+        """Daily files are combined into one machine/time-ordered frame"""
+        rng = np.random.default_rng(2)
+        for day in range(3):
+            timestamps = pd.date_range(f'2024-01-0{day + 1}', periods=24, freq='h')
+            pd.DataFrame({
+                'timestamp': np.tile(timestamps.strftime('%Y-%m-%d %H:%M:%S'), 2),
+                'machine_id': np.repeat([2, 1], 24),
+                'vibration': rng.normal(0.4, 0.05, 48),
+                'temperature': rng.normal(65, 2, 48),
+                'pressure': rng.normal(100, 1, 48),
+                'failure': 0,
+            }).to_csv(tmp_path / f'2024-01-0{day + 1}.csv', index=False)
+
+        df, bad_rows = load_sensor_directory(tmp_path, workers=3)
+
+        assert len(df) == 3 * 48 and bad_rows.empty
+        assert list(df['machine_id'].unique()) == [1, 2]
+        assert df.groupby('machine_id')['timestamp'].apply(lambda t: t.is_monotonic_increasing).all()
+
+    def test_load_sensor_data_writes_report(self, raw_csv, tmp_path):
+        report = tmp_path / 'bad_rows.csv'
+        df = load_sensor_data(raw_csv, bad_rows_path=report)
+
+        assert isinstance(df['machine_id'].dtype, pd.CategoricalDtype)
+        assert len(pd.read_csv(report)) == 4
+
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_alphanumeric_machine_ids(self, raw_csv, tmp_path, engine):
+        """Ids like 'M001' are kept as text; only blank ids are bad rows"""
+        if engine == 'pyarrow':
+            pytest.importorskip('pyarrow')
+        path = tmp_path / 'named.csv'
+        lines = [line.replace(',2,', ',M002,').replace(',1,', ',M001,') for line in RAW_LINES]
+        path.write_text('\n'.join(lines) + '\n')
+        df, bad_rows = read_sensor_csv(path, engine=engine)
+
+        assert list(df['machine_id']) == ['M001', 'M002', 'M002']
+        assert 'missing machine_id' in set(bad_rows['reason'])
+        assert len(bad_rows) == 4
+        assert list(load_sensor_data(path)['machine_id'].cat.categories) == ['M001', 'M002']
+
+    def test_missing_required_column(self, tmp_path):
+        path = tmp_path / 'no_ids.csv'
+        path.write_text('timestamp,vibration\n2024-01-01 00:00:00,0.4\n')
+        with pytest.raises(ValueError):
+            read_sensor_csv(path)
+
+
+@pytest.fixture
+def join_inputs():
+    """Sensor readings and failure events for four machines"""
+    rng = np.random.default_rng(9)
+    timestamps = pd.date_range('2024-01-01', periods=200, freq='h')
+    sensor = pd.DataFrame({
+        'timestamp': np.tile(timestamps, 4),
+        'machine_id': np.repeat([1, 2, 5, 7], len(timestamps)),
+        'vibration': rng.normal(0.4, 0.05, 4 * len(timestamps)),
+    })
+    events = pd.DataFrame({
+        'timestamp': timestamps[rng.integers(0, len(timestamps), 12)] + pd.Timedelta(minutes=30),
+        'machine_id': rng.choice([1, 2, 3, 7], 12),
+        'failure_type': rng.choice(['bearing', 'motor', 'seal'], 12),
+    })
+    events = pd.concat([events, events.iloc[:1]], ignore_index=True)  # duplicate event
+    return sensor, events.sort_values(['machine_id', 'timestamp'], ignore_index=True)
+
+
+def _reference_join(sensor, events, **kwargs):
+    merged = pd.merge_asof(sensor.sort_values('timestamp', kind='stable'),
+                           events.sort_values('timestamp', kind='stable'),
+                           on='timestamp', by='machine_id', **kwargs)
+    return merged.sort_values(['machine_id', 'timestamp'], kind='stable', ignore_index=True)
+
+
+def _chunks(df, size):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+class TestStreamingJoin:
+    """Test cases for the chunked per-machine sorted-merge join"""
+
+    @pytest.mark.parametrize('direction', ['forward', 'backward'])
+    @pytest.mark.parametrize('tolerance', [None, '6h'])
+    @pytest.mark.parametrize('chunk_size', [7, 150, 10_000])
+    def test_matches_global_merge_asof(self, join_inputs, direction, tolerance, chunk_size):
+        sensor, events = join_inputs
+        merged = pd.concat(stream_merge(_chunks(sensor, chunk_size), _chunks(events, 2),
+                                        direction=direction, tolerance=tolerance),
+                           ignore_index=True)
+
+        expected = _reference_join(sensor, events, direction=direction,
+                                   tolerance=None if tolerance is None else pd.Timedelta(tolerance))
+        pd.testing.assert_frame_equal(merged, expected)
+
+    def test_merge_datasets_with_compact_ids(self, join_inputs):
+        """Categorical machine ids survive the join in partition order"""
+        sensor, events = join_inputs
+        merged = merge_datasets(sensor.assign(machine_id=sensor['machine_id'].astype('category')),
+                                events, chunk_size=64)
+
+        assert isinstance(merged['machine_id'].dtype, pd.CategoricalDtype)
+        assert list(merged['machine_id'].unique()) == [1, 2, 5, 7]
+        assert merged.groupby('machine_id', observed=True)['timestamp'].apply(
+            lambda t: t.is_monotonic_increasing).all()
+        assert merged.loc[merged['machine_id'] == 5, 'failure_type'].isna().all()
+
+    def test_file_join_and_sort_check(self, join_inputs, tmp_path):
+        sensor, events = join_inputs
+        sensor_path, events_path = tmp_path / 'sensor.csv', tmp_path / 'events.csv'
+        sensor.to_csv(sensor_path, index=False, date_format='%Y-%m-%d %H:%M:%S')
+        events.to_csv(events_path, index=False, date_format='%Y-%m-%d %H:%M:%S')
+
+        stats = merge_sensor_files(sensor_path, events_path, tmp_path / 'merged.csv', chunk_size=33)
+        merged = pd.read_csv(tmp_path / 'merged.csv')
+        assert stats['rows_out'] == len(merged) == len(sensor)
+        assert stats['matched'] == merged['failure_type'].notna().sum() > 0
+
+        shuffled = sensor.sample(frac=1, random_state=0)
+        with pytest.raises(ValueError, match='sorted'):
+            list(stream_merge(_chunks(shuffled, 100), [events]))
@@ -0,0 +1,75 @@
+"""
+Unit tests for external-memory XGBoost training
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.external_memory import HAS_EXTMEM, as_classifier, batch_rows_for, temporal_cutoff, train_external_memory
+from src.storage import write_dataset
+
+
+pytest.importorskip('pyarrow')
+needs_extmem = pytest.mark.skipif(not HAS_EXTMEM, reason='needs xgboost>=3.0 (requirements_extmem.txt)')
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    """Modeling-ready Parquet dataset spanning two months"""
+    rng = np.random.default_rng(0)
+    timestamps = pd.date_range('2024-01-20', '2024-02-10', freq='h')
+    frames = []
+    for machine_id in range(1, 5):
+        temperature = rng.normal(70, 5, len(timestamps))
+        frames.append(pd.DataFrame({
+            'timestamp': timestamps,
+            'machine_id': machine_id,
+            'temperature': temperature,
+            'vibration': rng.normal(0.5, 0.1, len(timestamps)),
+            'failure_within_24h': (temperature + rng.normal(0, 2, len(timestamps)) > 76).astype(int),
+        }))
+    path = tmp_path / 'model_ready_data.csv'
+    write_dataset(pd.concat(frames, ignore_index=True), path, write_csv=False)
+    return path
+
+
+class TestExternalMemory:
+    """Test cases for the streamed cut, training and memory limit"""
+
+    def test_cutoff_matches_in_memory_quantile(self, data_path):
+        df = pd.read_parquet(data_path.with_suffix('.parquet'))
+        for fraction in (0.3, 0.7):
+            assert temporal_cutoff(data_path, fraction, batch_rows=500) == df['timestamp'].quantile(fraction)
+
+    def test_batches_shrink_with_the_limit(self):
+        assert batch_rows_for(None, 24) > 0
+        assert batch_rows_for(1024, 24) > batch_rows_for(256, 24)
+        assert batch_rows_for(1, 24) == 4096
+
+    @needs_extmem
+    def test_trains_from_streamed_batches(self, data_path, tmp_path):
+        cache_dir = tmp_path / 'pages'
+        booster, report = train_external_memory(data_path, params={'max_depth': 3, 'n_estimators': 999},
+                                                num_boost_round=15, batch_rows=500, cache_dir=cache_dir,
+                                                verbose=False)
+
+        assert report['train_rows'] + report['test_rows'] == 4 * 505
+        assert report['train_rows'] == pytest.approx(0.7 * 4 * 505, abs=8)
+        assert report['rounds_trained'] == len(report['rounds']) == 15
+        assert {'seconds', 'rows_per_second', 'rss_mb', 'peak_rss_mb', 'test-aucpr'} <= set(report['rounds'][0])
+        assert report['recall'] > 0.5
+        # Page cache removed after training
+        assert list(cache_dir.iterdir()) == []
+
+        model = as_classifier(booster)
+        X = pd.DataFrame({'temperature': [60.0, 90.0], 'vibration': [0.5, 0.5]})
+        proba = model.predict_proba(X)[:, 1]
+        assert proba[0] < 0.5 < proba[1]
+
+    @needs_extmem
+    def test_memory_limit_stops_training(self, data_path, tmp_path):
+        with pytest.raises(MemoryError):
+            train_external_memory(data_path, num_boost_round=5, memory_limit_mb=1, batch_rows=500,
+                                  cache_dir=tmp_path / 'pages', verbose=False)
+        assert list((tmp_path / 'pages').iterdir()) == []
@@ -0,0 +1,67 @@
+"""
+Unit tests for the synthetic sensor data generator
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.generate_sample_data import (
+    degradation_ramp, generate_machine, generate_sample_sensor_data, make_timestamps, write_sensor_data
+)
+
+
+def reference_ramp(failures, window):
+    """Original per-failure loop, kept as the oracle"""
+    degradation = np.zeros(len(failures))
+    for failure in np.flatnonzero(failures):
+        for k in range(1, window + 1):
+            if failure - k >= 0:
+                degradation[failure - k] += 1 - k / window
+    return degradation
+
+
+class TestGenerator:
+    """Test cases for vectorised, seeded generation"""
+
+    @pytest.mark.parametrize('window', [1, 6, 48])
+    def test_ramp_matches_loop(self, window):
+        failures = np.random.default_rng(3).random(2000) < 0.03
+        failures[[0, 1, -1]] = True
+        np.testing.assert_allclose(degradation_ramp(failures, window), reference_ramp(failures, window),
+                                   atol=1e-9)
+
+    def test_machines_are_independent_of_run_layout(self, tmp_path):
+        """A machine's readings depend only on the seed and its id"""
+        small = generate_sample_sensor_data(n_machines=2, n_days=3, seed=5, output_path=tmp_path / 'a.csv')
+        large = generate_sample_sensor_data(n_machines=4, n_days=3, seed=5, output_path=tmp_path / 'b.csv')
+        other = generate_sample_sensor_data(n_machines=2, n_days=3, seed=6, output_path=tmp_path / 'c.csv')
+
+        pd.testing.assert_frame_equal(small, large[large['machine_id'] <= 2])
+        assert not small['vibration'].equals(other['vibration'])
+
+    def test_failure_profile_shapes_degradation(self):
+        timestamps = make_timestamps(20, hourly_samples=2)
+        quiet = generate_machine(1, timestamps, seed=1, failure_rate=0.0)
+        sudden = generate_machine(1, timestamps, seed=1, failure_rate=0.01, hourly_samples=2,
+                                  failure_profile='sudden')
+
+        first = np.flatnonzero(sudden['failure'])[0]
+        assert quiet['failure'].sum() == 0
+        # The 6 h ramp covers 12 samples at two samples per hour
+        assert sudden['vibration'].iloc[first - 1] > quiet['vibration'].iloc[first - 1] + 0.3
+        with pytest.raises(ValueError):
+            generate_machine(1, timestamps, failure_profile='unknown')
+
+    def test_streamed_output_is_reproducible(self, tmp_path):
+        """Serial and parallel streaming write the same file as the in-memory generator"""
+        serial = tmp_path / 'serial.csv'
+        parallel = tmp_path / 'parallel.csv'
+        stats = write_sensor_data(serial, n_machines=5, n_days=4, seed=11, rows_per_batch=200)
+        write_sensor_data(parallel, n_machines=5, n_days=4, seed=11, rows_per_batch=100, workers=2)
+
+        assert serial.read_bytes() == parallel.read_bytes()
+        df = pd.read_csv(serial, parse_dates=['timestamp'])
+        expected = generate_sample_sensor_data(n_machines=5, n_days=4, seed=11, output_path=tmp_path / 'x.csv')
+        assert stats['rows'] == len(df) == 5 * 4 * 24
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
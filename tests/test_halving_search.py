@@ -0,0 +1,72 @@
+"""
+Unit tests for the successive halving XGBoost search
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.halving_search import HalvingSearch, sample_candidates, temporal_validation_split
+
+
+@pytest.fixture
+def data():
+    """Imbalanced binary problem with hourly timestamps"""
+    rng = np.random.default_rng(0)
+    n = 4000
+    X = pd.DataFrame(rng.normal(size=(n, 6)), columns=[f'f{i}' for i in range(6)])
+    y = pd.Series((X['f0'] + 0.5 * X['f1'] + rng.normal(0, 0.5, n) > 1.8).astype(int))
+    timestamps = pd.Series(pd.date_range('2024-01-01', periods=n, freq='h')).sample(frac=1, random_state=0)
+    return X, y, timestamps.reset_index(drop=True)
+
+
+class TestHalvingSearch:
+    """Test cases for halving over boosting rounds"""
+
+    def test_candidates_are_plain_and_reproducible(self):
+        first = sample_candidates(5, seed=1)
+        assert first == sample_candidates(5, seed=1)
+        assert first != sample_candidates(5, seed=2)
+        assert all(type(c['max_depth']) is int and type(c['learning_rate']) is float for c in first)
+
+    def test_validation_fold_is_latest(self, data):
+        X, y, timestamps = data
+        X_fit, X_val, y_fit, y_val = temporal_validation_split(X, y, timestamps, validation_fraction=0.25)
+
+        assert len(X_val) == pytest.approx(0.25 * len(X), abs=2)
+        assert timestamps[X_fit.index].max() < timestamps[X_val.index].min()
+
+    def test_rungs_end_at_max_rounds(self):
+        search = HalvingSearch(min_rounds=20, max_rounds=500, eta=3)
+        assert search._rung_rounds(20) == [56, 167, 500]
+        assert [n for n, _ in HalvingSearch(method='hyperband')._brackets()] == [27, 14, 9]
+
+    @pytest.mark.parametrize('method', ['halving', 'hyperband'])
+    def test_search_spends_fewer_rounds(self, data, method):
+        X, y, timestamps = data
+        X_fit, X_val, y_fit, y_val = temporal_validation_split(X, y, timestamps)
+        search = HalvingSearch(
+            base_params={'objective': 'binary:logistic', 'tree_method': 'hist', 'seed': 0},
+            n_candidates=9, min_rounds=10, max_rounds=90, early_stopping_rounds=10,
+            method=method, verbose=False
+        ).fit(X_fit, y_fit, X_val, y_val)
+
+        summary = search.summary()
+        assert summary['rounds_trained'] < summary['candidates'] * 90 / 2
+        assert 0.5 < search.best_score_ <= 1
+        assert search.best_params_['n_estimators'] == search.best_.best_round + 1
+        ranked = search.ranked_candidates()
+        assert ranked[0] == (search.best_params_, search.best_score_)
+        assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+        assert not summary['timed_out']
+
+    def test_time_budget_keeps_best_so_far(self, data):
+        X, y, timestamps = data
+        X_fit, X_val, y_fit, y_val = temporal_validation_split(X, y, timestamps)
+        search = HalvingSearch(n_candidates=200, max_rounds=2000, early_stopping_rounds=2000,
+                               time_budget=1.0, verbose=False).fit(X_fit, y_fit, X_val, y_val)
+
+        assert search.timed_out_
+        assert search.seconds_ < 3
+        assert search.summary()['candidates_trained'] < 200
+        assert search.best_ is not None
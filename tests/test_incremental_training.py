@@ -0,0 +1,98 @@
+"""
+Unit tests for warm-start incremental retraining
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from src.incremental_training import incremental_split, incremental_update, validation_gates
+from src.training import prepare_data, save_model
+
+
+@pytest.fixture
+def data(tmp_path):
+    """Prepared split of 30 days of hourly readings from four machines"""
+    rng = np.random.default_rng(0)
+    timestamps = np.repeat(pd.date_range('2024-01-01', periods=30 * 24, freq='h'), 4)
+    n = len(timestamps)
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'machine_id': np.tile(['M_001', 'M_002', 'M_003', 'M_004'], n // 4),
+        'temperature': rng.normal(70, 5, n),
+        'vibration': rng.normal(0.5, 0.1, n),
+    })
+    df['failure_within_24h'] = (df['temperature'] + 20 * df['vibration'] + rng.normal(0, 2, n) > 86).astype(int)
+    path = tmp_path / 'model_ready_data.csv'
+    df.to_csv(path, index=False)
+    return prepare_data(path, cache_dir=tmp_path / 'matrices')
+
+
+@pytest.fixture
+def models_dir(data, tmp_path):
+    """Production model trained on the training split"""
+    models_dir = tmp_path / 'models'
+    parent = xgb.XGBClassifier(n_estimators=20, max_depth=3, random_state=0)
+    parent.fit(data.X_train, data.y_train)
+    save_model(parent, data.feature_cols, {'f1_score': 0.5, 'recall': 0.5}, models_dir=models_dir,
+               metadata={'best_params': {'max_depth': 3}})
+    return models_dir
+
+
+class TestIncrementalTraining:
+    """Test cases for window selection, gates and promotion"""
+
+    def test_split_rows_are_disjoint_and_ordered(self, data):
+        timestamps = np.concatenate([data.train.timestamps, data.test.timestamps])
+        rows = incremental_split(timestamps, window='7D', replay_fraction=0.5, gap='24h')
+
+        window_start = timestamps[-1] - np.timedelta64(7, 'D')
+        assert (timestamps[rows['new']] > window_start).all()
+        assert (timestamps[rows['replay']] <= window_start).all()
+        assert len(rows['replay']) == round(0.5 * len(rows['new']))
+        assert rows['holdout'][-1] == len(timestamps) - 1
+        assert timestamps[rows['holdout'][0]] - timestamps[rows['new'][-1]] > np.timedelta64(24, 'h')
+
+        with pytest.raises(ValueError):
+            incremental_split(timestamps, window='2h')
+
+    def test_gates_allow_tolerance(self):
+        parent = {'aucpr': 0.8, 'recall': 0.7, 'f1_score': 0.6}
+        passed, gates = validation_gates({'aucpr': 0.795, 'recall': 0.75, 'f1_score': 0.6}, parent, tolerance=0.01)
+        assert passed and len(gates) == 3
+        passed, gates = validation_gates({'aucpr': 0.7, 'recall': 0.75, 'f1_score': 0.6}, parent, tolerance=0.01)
+        assert not passed and [g['metric'] for g in gates if not g['passed']] == ['aucpr']
+
+    def test_update_adds_trees_and_records_parent(self, data, models_dir):
+        parent_metadata = json.loads((models_dir / 'model_metadata.json').read_text())
+        result = incremental_update(data, models_dir=models_dir, window='7D', n_new_trees=15,
+                                    tolerance=1.0)
+
+        assert result['promoted']
+        metadata = json.loads((models_dir / 'model_metadata.json').read_text())
+        assert metadata['training_mode'] == 'incremental'
+        assert metadata['parent_version'] == parent_metadata['version']
+        assert metadata['version'] != parent_metadata['version']
+        assert metadata['lineage'] == [parent_metadata['version']]
+        assert metadata['best_params'] == {'max_depth': 3}
+        assert metadata['incremental']['new_trees'] == 15
+        assert metadata['incremental']['total_trees'] == 35
+        # Holdout scores are not passed off as the test-set metrics the parent records
+        assert metadata['f1_score'] is None and metadata['recall'] is None
+        assert metadata['incremental']['holdout_metrics'] == result['child_metrics']
+        assert metadata['incremental']['parent_holdout_metrics'] == result['parent_metrics']
+
+        # Both versions stay on disk
+        assert len(list(models_dir.glob('xgboost_best_v*.pkl'))) == 2
+
+    def test_failed_gate_keeps_production_model(self, data, models_dir):
+        before = (models_dir / 'model_metadata.json').read_text()
+        result = incremental_update(data, models_dir=models_dir, n_new_trees=5, tolerance=-1.0)
+
+        assert not result['promoted']
+        assert not any(gate['passed'] for gate in result['gates'])
+        assert (models_dir / 'model_metadata.json').read_text() == before
+        assert len(list(models_dir.glob('xgboost_best_v*.pkl'))) == 1
@@ -0,0 +1,106 @@
+"""
+Unit tests for the inference cost of candidate models
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from xgboost import XGBClassifier
+
+from src import inference_cost
+from src.inference_cost import compare_candidates, make_explainer, measure_inference_cost, model_file_cost
+from src.training import update_metadata
+
+
+@pytest.fixture
+def data():
+    """Binary problem with an XGBoost model, a smaller one and a linear model"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(2000, 5)), columns=[f'f{i}' for i in range(5)])
+    y = pd.Series((X['f0'] + X['f1'] + rng.normal(0, 0.5, 2000) > 1).astype(int))
+    return X, y
+
+
+class TestInferenceCost:
+    """Test cases for latency, explanation and model file measurements"""
+
+    def test_cost_report_covers_every_measurement(self, data):
+        X, y = data
+        model = XGBClassifier(n_estimators=20, max_depth=3, n_jobs=1).fit(X, y)
+        cost = measure_inference_cost(model, X, batch_size=100, min_time=0.05)
+
+        for name in ('predict_row', 'predict_batch', 'explain_row', 'explain_batch', 'request'):
+            assert 0 < cost[name]['p50_ms'] <= cost[name]['p99_ms']
+            assert cost[name]['calls'] >= 5
+        assert cost['batch_size'] == 100
+        assert cost['predict_batch']['per_row_us'] == pytest.approx(cost['predict_batch']['p50_ms'] * 10, rel=1e-3)
+        assert cost['model_size_mb'] > 0 and cost['load_seconds'] > 0
+        json.dumps(cost)
+
+    def test_larger_model_costs_more(self, data):
+        X, y = data
+        small = XGBClassifier(n_estimators=10, max_depth=2, n_jobs=1).fit(X, y)
+        large = XGBClassifier(n_estimators=400, max_depth=8, n_jobs=1).fit(X, y)
+
+        assert model_file_cost(large)['model_size_mb'] > 5 * model_file_cost(small)['model_size_mb']
+        small_batch = measure_inference_cost(small, X, batch_size=1000, explain=False, min_time=0.1)
+        large_batch = measure_inference_cost(large, X, batch_size=1000, explain=False, min_time=0.1)
+        assert large_batch['predict_batch']['p50_ms'] > small_batch['predict_batch']['p50_ms']
+
+    def test_linear_explanation_without_shap(self, data, monkeypatch):
+        X, y = data
+        monkeypatch.setattr(inference_cost, 'HAS_SHAP', False)
+        model = LogisticRegression().fit(X, y)
+        explain, backend = make_explainer(model, X)
+
+        # Contributions add up to the log-odds relative to the average row
+        contributions = explain(X.iloc[:10])
+        expected = model.decision_function(X.iloc[:10]) - model.decision_function(X.mean().to_frame().T)
+        np.testing.assert_allclose(contributions.sum(axis=1), expected, rtol=1e-6)
+        assert backend.startswith('linear')
+
+        forest = RandomForestClassifier(n_estimators=5).fit(X, y)
+        assert make_explainer(forest, X) == (None, 'unavailable without shap')
+
+    def test_candidates_are_measured_on_the_same_rows(self, data, tmp_path):
+        X, y = data
+        candidates = {
+            'lr': LogisticRegression().fit(X, y),
+            'xgboost': XGBClassifier(n_estimators=20, n_jobs=1).fit(X, y),
+        }
+        results = compare_candidates(candidates, X, y, batch_size=50, min_time=0.02)
+
+        assert list(results) == ['lr', 'xgboost']
+        assert results['lr']['model'] == 'LogisticRegression'
+        assert 0 <= results['xgboost']['f1_score'] <= 1
+        assert 'report' not in results['lr']
+
+        (tmp_path / 'model_metadata.json').write_text(json.dumps({'version': 'v1', 'f1_score': 0.5}))
+        metadata = update_metadata(tmp_path, model_selection={'candidates': results})
+        saved = json.loads((tmp_path / 'model_metadata.json').read_text())
+        assert saved == metadata and saved['version'] == 'v1'
+        assert saved['model_selection']['candidates']['lr']['predict_row']['calls'] >= 5
+
+    def test_tuning_keeps_best_candidate_within_budget(self, data):
+        from types import SimpleNamespace
+        from src.xgboost_tuning import refit_within_budget
+
+        X, y = data
+        split = SimpleNamespace(X_train=X, y_train=y, scale_pos_weight=1.0)
+        ranked = [{'n_estimators': 300, 'max_depth': 8, 'n_jobs': 1},
+                  {'n_estimators': 5, 'max_depth': 2, 'n_jobs': 1}]
+
+        model, rank, selection = refit_within_budget(split, ranked)
+        assert rank == 0 and selection is None
+
+        # No budget can be met: the fastest refitted candidate is kept
+        model, rank, selection = refit_within_budget(split, ranked, latency_budget_ms=1e-6)
+        assert rank == 1 and model.n_estimators == 5
+        assert not selection['met'] and len(selection['checked']) == 2
+
+        model, rank, selection = refit_within_budget(split, ranked, latency_budget_ms=1e6)
+        assert rank == 0 and selection['met'] and len(selection['checked']) == 1
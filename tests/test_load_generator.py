@@ -0,0 +1,141 @@
+"""
+Unit tests for the open-loop load generator
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from tests.load_generator import (
+    HdrHistogram, arrival_offsets, load_recorded_traffic, record_traffic, run_open_loop
+)
+
+
+async def serve(delay, handler_state):
+    """Tiny keep-alive HTTP server that answers every request after delay seconds, one at a time"""
+    lock = asyncio.Lock()
+
+    async def handle(reader, writer):
+        handler_state['connections'] += 1
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except asyncio.IncompleteReadError:
+                break
+            length = int(next(line.split(b':')[1] for line in head.split(b'\r\n')
+                              if line.lower().startswith(b'content-length')))
+            await reader.readexactly(length)
+            async with lock:
+                await asyncio.sleep(delay)
+            body = b'{"ok": true}'
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body))
+            await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+def run_against_server(delay, offsets, connections):
+    async def scenario():
+        state = {'connections': 0}
+        server = await serve(delay, state)
+        port = server.sockets[0].getsockname()[1]
+        requests = [('/predict', {'machine_id': 'M001'})] * len(offsets)
+        run = await run_open_loop(f'http://127.0.0.1:{port}', offsets, requests, connections=connections)
+        server.close()
+        await server.wait_closed()
+        return run, state
+
+    return asyncio.run(scenario())
+
+
+class TestHdrHistogram:
+    """Test cases for the latency histogram"""
+
+    def test_percentiles_within_precision(self):
+        values = np.random.default_rng(0).lognormal(8, 1.5, 50_000).astype(np.int64) + 1
+        hist = HdrHistogram().record(values)
+
+        for p in [50, 90, 99, 99.9]:
+            exact = np.percentile(values, p, method='inverted_cdf')
+            assert hist.value_at_percentile(p) == pytest.approx(exact, rel=1e-3, abs=1)
+        assert hist.max == values.max()
+        assert hist.mean == pytest.approx(values.mean())
+
+    def test_merge_equals_single_histogram(self):
+        values = np.random.default_rng(1).integers(1, 5_000_000, 10_000)
+        merged = HdrHistogram().record(values[:3000]).merge(HdrHistogram().record(values[3000:]))
+        single = HdrHistogram().record(values)
+
+        np.testing.assert_array_equal(merged.counts, single.counts)
+        assert merged.summary() == single.summary()
+
+    def test_values_above_range_are_clamped(self):
+        hist = HdrHistogram(highest_trackable=1000).record([10, 5000])
+        assert hist.clamped == 1
+        assert hist.max == 1000
+
+
+class TestSchedules:
+    """Test cases for arrival schedules and replay"""
+
+    def test_fixed_and_poisson_rates(self):
+        fixed = arrival_offsets(50, duration=10)
+        assert len(fixed) == 500
+        np.testing.assert_allclose(np.diff(fixed), 0.02)
+
+        poisson = arrival_offsets(50, duration=100, arrival='poisson', seed=3)
+        gaps = np.diff(poisson)
+        assert poisson[0] == 0
+        assert gaps.mean() == pytest.approx(0.02, rel=0.05)
+        # Exponential gaps: standard deviation equals the mean
+        assert gaps.std() == pytest.approx(gaps.mean(), rel=0.1)
+        np.testing.assert_array_equal(poisson, arrival_offsets(50, duration=100, arrival='poisson', seed=3))
+
+    def test_record_and_replay_with_speedup(self, tmp_path):
+        path = tmp_path / 'traffic.jsonl'
+        offsets = np.array([0.0, 1.0, 3.0])
+        requests = [('/predict', {'machine_id': f'M00{i}'}) for i in range(3)]
+        record_traffic(path, offsets, requests, start=1_000)
+
+        replayed, loaded = load_recorded_traffic(path, speedup=2)
+        np.testing.assert_allclose(replayed, [0.0, 0.5, 1.5])
+        assert loaded == requests
+
+    def test_replay_bare_payloads(self, tmp_path):
+        path = tmp_path / 'payloads.jsonl'
+        lines = [{'timestamp': f'2024-01-01T00:00:0{i}', 'machine_id': 'M001'} for i in (0, 2)]
+        path.write_text('\n'.join(json.dumps(line) for line in lines) + '\n')
+
+        offsets, requests = load_recorded_traffic(path)
+        np.testing.assert_allclose(offsets, [0.0, 2.0])
+        assert requests[1] == ('/predict', lines[1])
+
+
+class TestOpenLoop:
+    """Test cases for open-loop sending against a local server"""
+
+    def test_keep_alive_connections_are_reused(self):
+        run, state = run_against_server(0.0, arrival_offsets(200, n_requests=100), connections=4)
+
+        assert run['statuses'] == {200: 100}
+        assert run['errors'] == {}
+        assert run['connections_opened'] <= 4
+        assert state['connections'] == run['connections_opened']
+
+    def test_queueing_counts_from_intended_send_time(self):
+        """A server slower than the arrival rate builds a queue that service time hides"""
+        # 40 requests every 5ms against a server that handles one per 20ms
+        run, _ = run_against_server(0.02, arrival_offsets(200, n_requests=40), connections=2)
+
+        latency, service = run['latency'], run['service']
+        assert latency.total == service.total == 40
+        # The last request waits behind ~39 others: about 0.6s after its intended time,
+        # while each one is served in 20-40ms once it has a connection
+        assert latency.value_at_percentile(99) > 500_000
+        assert service.value_at_percentile(99) < 100_000
+        assert run['send_lag'].value_at_percentile(99) > 400_000
+        # Sends stay on schedule even though responses lag
+        assert run['issue_seconds'] < 0.5
@@ -0,0 +1,120 @@
+"""
+Unit tests for XGBoost model compaction
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from src.model_compaction import (booster_json, compact, drop_trees, ensemble_stats, estimate_resolutions,
+                                  load_booster, prune_splits, refit_leaves, snap_thresholds)
+
+
+@pytest.fixture(scope='module')
+def data():
+    """Readings on sensor grids (one with gaps), a rolling mean, an hour and a continuous feature"""
+    rng = np.random.default_rng(0)
+    n = 4000
+    X = pd.DataFrame({
+        'temperature': np.round(rng.normal(70, 5, n), 2),
+        'vibration': np.round(rng.normal(0.5, 0.1, n), 3),
+        'hour': rng.integers(0, 24, n).astype(float),
+        'noise': rng.normal(size=n),
+    })
+    X['temperature_roll_mean_3'] = X['temperature'].rolling(3, min_periods=1).mean().astype(np.float32)
+    X.loc[rng.random(n) < 0.05, 'temperature'] = np.nan
+    y = pd.Series(((X['temperature'].fillna(70) - 70) / 5 + (X['vibration'] - 0.5) / 0.1
+                   + rng.normal(0, 1, n) > 1.5).astype(int))
+    return X, y
+
+
+@pytest.fixture(scope='module')
+def model(data):
+    """Fitted on the first 3000 rows; the rest validate"""
+    X, y = data
+    return xgb.XGBClassifier(n_estimators=60, max_depth=5, learning_rate=0.2, n_jobs=1).fit(X[:3000], y[:3000])
+
+
+def feature_grid(X, scale=1):
+    return {list(X.columns).index(name): scale * r for name, r in estimate_resolutions(X).items()}
+
+
+class TestModelCompaction:
+    """Test cases for threshold snapping, split pruning, tree dropping and the tolerance search"""
+
+    def test_resolutions_of_quantised_features(self, data):
+        resolutions = estimate_resolutions(data[0])
+
+        assert resolutions['temperature'] == pytest.approx(0.01)
+        assert resolutions['vibration'] == pytest.approx(0.001)
+        assert resolutions['hour'] == 1.0
+        assert resolutions['temperature_roll_mean_3'] == pytest.approx(0.01 / 3)
+        assert 'noise' not in resolutions
+
+    def test_snapping_to_resolution_keeps_predictions(self, data, model):
+        X, _ = data
+        original = booster_json(model.get_booster())
+        snapped = snap_thresholds(original, feature_grid(X))
+
+        # Missing values included: snapping never changes a grid reading's branch
+        np.testing.assert_array_equal(load_booster(snapped).inplace_predict(X), model.get_booster().inplace_predict(X))
+        assert ensemble_stats(snapped)['distinct_thresholds'] <= ensemble_stats(original)['distinct_thresholds']
+
+    def test_coarse_snapping_removes_decided_branches(self, data, model):
+        X, _ = data
+        original = booster_json(model.get_booster())
+        snapped = snap_thresholds(original, {0: 5.0, 1: 0.1})
+
+        assert ensemble_stats(snapped)['nodes'] < ensemble_stats(original)['nodes']
+        thresholds = [t['split_conditions'][n] for t in snapped['learner']['gradient_booster']['model']['trees']
+                      for n in range(len(t['left_children']))
+                      if t['left_children'][n] != -1 and t['split_indices'][n] == 0]
+        np.testing.assert_allclose(np.mod(np.array(thresholds) + 2.5, 5.0), 0, atol=1e-4)
+        assert np.isfinite(load_booster(snapped).inplace_predict(X)).all()
+
+    def test_split_pruning(self, data, model):
+        X, _ = data
+        original = booster_json(model.get_booster())
+        predictions = model.get_booster().inplace_predict(X)
+
+        np.testing.assert_array_equal(load_booster(prune_splits(original, 0.0)).inplace_predict(X), predictions)
+        pruned = prune_splits(original, np.quantile([c for t in original['learner']['gradient_booster']['model']['trees']
+                                                     for c in t['loss_changes'] if c > 0], 0.3))
+        assert ensemble_stats(pruned)['nodes'] < ensemble_stats(original)['nodes']
+        # Every tree collapses to its root leaf
+        assert ensemble_stats(prune_splits(original, np.inf))['nodes'] == 60
+
+    def test_dropping_the_weakest_trees(self, data, model):
+        X, _ = data
+        original = booster_json(model.get_booster())
+        np.testing.assert_array_equal(load_booster(drop_trees(original, 0.0)).inplace_predict(X),
+                                      model.get_booster().inplace_predict(X))
+
+        dropped = drop_trees(original, 0.05)
+        booster = load_booster(dropped)
+        assert 1 <= booster.num_boosted_rounds() < 60
+        assert ensemble_stats(dropped)['trees'] == booster.num_boosted_rounds()
+        assert ensemble_stats(drop_trees(original, 1.0))['trees'] == 1
+
+    def test_leaf_refit_of_rebuilt_trees(self, data, model):
+        X, y = data
+        rebuilt = load_booster(prune_splits(booster_json(model.get_booster()), 0.0))
+        refitted = refit_leaves(rebuilt, X[:3000], y[:3000], model.get_xgb_params())
+
+        # Refitting on the training rows reproduces the trained leaves
+        np.testing.assert_allclose(refitted.inplace_predict(X), model.get_booster().inplace_predict(X), atol=1e-5)
+
+    @pytest.mark.parametrize('refit', [False, True])
+    def test_compaction_stays_within_tolerance(self, data, model, refit):
+        X, y = data
+        compacted, report = compact(model, X[3000:], y[3000:], tolerance=0.01, resolutions=estimate_resolutions(X),
+                                    X_refit=X[:3000] if refit else None, y_refit=y[:3000] if refit else None,
+                                    measure_latency=False)
+
+        assert report['aucpr']['after'] >= report['aucpr']['before'] - 0.01
+        assert report['after']['nodes'] < report['before']['nodes']
+        assert report['reduction']['nodes'] == pytest.approx(1 - report['after']['nodes'] / report['before']['nodes'],
+                                                             abs=1e-4)
+        assert all(step['aucpr'] >= report['aucpr']['before'] - 0.01 for step in report['steps'] if step['accepted'])
+        assert compacted.predict_proba(X).shape == (len(X), 2)
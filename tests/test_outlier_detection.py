@@ -0,0 +1,94 @@
+"""
+Unit tests for the streaming outlier detector
+"""
+
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.outlier_detection import StreamingOutlierDetector
+
+
+@pytest.fixture
+def two_baselines():
+    """Two machines with very different temperature baselines"""
+    rng = np.random.default_rng(11)
+    n = 500
+    df = pd.DataFrame({
+        'machine_id': np.repeat([1, 2], n),
+        'vibration': rng.normal(0.4, 0.02, 2 * n),
+        'temperature': np.concatenate([rng.normal(40, 1, n), rng.normal(90, 1, n)]),
+        'pressure': rng.normal(100, 1, 2 * n),
+    })
+    # 60 degrees is normal for neither machine, but close to the global mean
+    df.loc[[10, 20, n + 10], 'temperature'] = 65.0
+    return df
+
+
+class TestStreamingOutlierDetector:
+    """Test cases for StreamingOutlierDetector"""
+
+    def test_per_machine_baselines(self, two_baselines):
+        """Readings normal globally but abnormal for their machine are removed"""
+        filtered, counts = StreamingOutlierDetector(threshold=4).filter(two_baselines)
+
+        assert counts['temperature'] >= 3
+        assert not {10, 20, 510}.intersection(filtered.index)
+        # Global mean/std would have kept them
+        temps = two_baselines['temperature']
+        assert abs(65.0 - temps.mean()) < 4 * temps.std()
+
+    def test_chunked_matches_single_pass(self, two_baselines):
+        """Streaming in chunks flags the same injected outliers"""
+        shuffled = two_baselines.sample(frac=1, random_state=0)
+        filtered, _ = StreamingOutlierDetector().filter(shuffled, chunk_size=100)
+        assert not {10, 20, 510}.intersection(filtered.index)
+
+    def test_online_update(self, two_baselines):
+        """Online scoring uses the fitted baselines and keeps learning"""
+        detector = StreamingOutlierDetector()
+        detector.partial_fit(two_baselines)
+
+        assert detector.update(1, {'vibration': 0.4, 'temperature': 40.5, 'pressure': 100.0}) == {}
+        flagged = detector.update(2, {'vibration': 0.4, 'temperature': 40.5, 'pressure': 100.0})
+        assert list(flagged) == ['temperature']
+
+        # A new machine has no baseline until a batch of readings arrives
+        assert detector.update('M9', {'vibration': 5.0, 'temperature': 40, 'pressure': 1}) == {}
+        for _ in range(detector.online_batch_size):
+            detector.update('M9', {'vibration': 0.4, 'temperature': 40, 'pressure': 100})
+        assert 'M9' in detector.count.index
+
+    def test_flagged_readings_stay_out_of_the_baseline(self, two_baselines):
+        """A run of anomalous readings does not shift the machine's median"""
+        detector = StreamingOutlierDetector()
+        detector.partial_fit(two_baselines)
+        median = detector.median.loc[1, 'temperature']
+
+        for _ in range(5 * detector.online_batch_size):
+            assert 'temperature' in detector.update(1, {'vibration': 0.4, 'temperature': 90.0, 'pressure': 100.0})
+        assert detector.median.loc[1, 'temperature'] == median
+
+    def test_concurrent_online_updates_and_pickling(self, two_baselines):
+        """Threads sharing a detector lose no readings; pickles keep the state"""
+        detector = StreamingOutlierDetector(online_batch_size=4)
+        detector.partial_fit(two_baselines)
+        count = detector.count.loc[1]
+
+        def feed(machine_id):
+            for _ in range(100):
+                detector.update(machine_id, {'vibration': 0.4, 'temperature': 40.0, 'pressure': 100.0})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(feed, [1] * 4 + [f'M{i}' for i in range(4)]))
+
+        assert detector.count.loc[1] == count + 400
+        assert all(detector.count.loc[f'M{i}'] == 100 for i in range(4))
+
+        restored = pickle.loads(pickle.dumps(detector))
+        pd.testing.assert_frame_equal(restored.median, detector.median)
+        assert restored.update(2, {'vibration': 0.4, 'temperature': 40.5, 'pressure': 100.0}) == \
+            detector.update(2, {'vibration': 0.4, 'temperature': 40.5, 'pressure': 100.0})
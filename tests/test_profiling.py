@@ -0,0 +1,89 @@
+"""
+Unit tests for the streaming data profiler
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.profiling import StreamingProfiler, profile_chunks, profile_dataset
+
+
+@pytest.fixture
+def readings():
+    """Three machines with different baselines and a few gaps"""
+    rng = np.random.default_rng(8)
+    n = 3000
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='min'),
+        'machine_id': rng.choice([3, 1, 2], n),
+        'vibration': rng.normal(0.4, 0.05, n),
+        'temperature': rng.normal(65, 2, n),
+        'delta': rng.normal(0, 1, n),
+    })
+    df['temperature'] += df['machine_id'] * 10
+    df.loc[::37, 'temperature'] = np.nan
+    return df
+
+
+def _chunks(df, size):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+class TestStreamingProfiler:
+    """Test cases for moments, sketches and merging"""
+
+    def test_moments_match_pandas(self, readings):
+        profile = profile_chunks(_chunks(readings, 250)).summary()
+
+        assert profile['rows'] == len(readings)
+        assert profile['machines'] == 3
+        for col in ['vibration', 'temperature', 'delta']:
+            stats = profile['columns'][col]
+            assert stats['nulls'] == readings[col].isna().sum()
+            assert stats['mean'] == pytest.approx(readings[col].mean(), rel=1e-5, abs=1e-9)
+            assert stats['std'] == pytest.approx(readings[col].std(), rel=1e-5)
+            assert stats['max'] == pytest.approx(readings[col].max(), rel=1e-5)
+
+        machine = readings[readings['machine_id'] == 2]
+        stats = profile['per_machine']['2']
+        assert stats['rows'] == len(machine)
+        assert stats['columns']['temperature']['std'] == pytest.approx(machine['temperature'].std(), rel=1e-5)
+        assert stats['time_range'][0] == str(machine['timestamp'].min())
+
+    def test_quantiles_within_relative_accuracy(self, readings):
+        profiler = profile_chunks(_chunks(readings, 400), relative_accuracy=0.01)
+        quantiles = profiler.summary()['columns']
+
+        for col in ['vibration', 'temperature', 'delta']:
+            values = readings[col].dropna().to_numpy()
+            for q in profiler.quantiles:
+                exact = np.quantile(values, q, method='lower')
+                estimate = quantiles[col]['quantiles'][f"p{round(q * 100):02d}"]
+                assert abs(estimate - exact) <= 0.01 * abs(exact) + 1e-5
+
+    def test_partitions_merge_to_whole(self, readings):
+        """Profiling halves separately and merging gives the same profile"""
+        whole = profile_chunks(_chunks(readings, 1000)).summary()
+        merged = profile_chunks([readings.iloc[1700:]]).merge(profile_chunks(_chunks(readings.iloc[:1700], 300)))
+
+        assert json.dumps(merged.summary(), sort_keys=True) == json.dumps(whole, sort_keys=True)
+
+    def test_dataset_profile_json(self, readings, tmp_path):
+        for day, part in readings.groupby(readings['timestamp'].dt.day):
+            part.to_csv(tmp_path / f'day_{day}.csv', index=False)
+
+        profiler = profile_dataset(tmp_path, chunk_size=200, workers=2)
+        path = profiler.to_json(tmp_path / 'profile.json')
+
+        profile = json.loads(path.read_text())
+        assert profile['rows'] == len(readings)
+        assert list(profile['per_machine']) == ['1', '2', '3']
+
+    def test_merge_requires_same_columns(self, readings):
+        left = StreamingProfiler(columns=['vibration']).update(readings)
+        right = StreamingProfiler(columns=['delta']).update(readings)
+        with pytest.raises(ValueError):
+            left.merge(right)
@@ -0,0 +1,91 @@
+"""
+Unit tests for the class-imbalance strategies
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.resampling import STRATEGIES, approx_smote, downsample_negatives, failure_windows, resample, window_oversample
+
+
+@pytest.fixture
+def data():
+    """Hourly readings of three machines, each failing once after a 24 hour window"""
+    rng = np.random.default_rng(0)
+    timestamps = np.tile(pd.date_range('2024-01-01', periods=400, freq='h').to_numpy(), 3)
+    groups = np.repeat([0, 1, 2], 400)
+    y = np.zeros(1200, dtype=np.int8)
+    for machine, failure_hour in enumerate([100, 250, 390]):
+        y[machine * 400 + failure_hour - 24:machine * 400 + failure_hour] = 1
+    X = pd.DataFrame({
+        'temperature': rng.normal(70, 5, 1200) + 10 * y,
+        'vibration': rng.normal(0.5, 0.1, 1200),
+        'machine_level': groups * 100.0,
+    })
+    return X, pd.Series(y), groups, timestamps
+
+
+class TestResampling:
+    """Test cases for downsampling, window oversampling and approximate SMOTE"""
+
+    def test_downsampling_keeps_weighted_class_totals(self, data):
+        X, y, _, _ = data
+        X_res, y_res, weight = downsample_negatives(X, y, negative_ratio=3)
+
+        assert (y_res == 1).sum() == (y == 1).sum()
+        assert (y_res == 0).sum() == pytest.approx(3 * (y == 1).sum(), rel=0.2)
+        assert weight[y_res.to_numpy() == 0].sum() == pytest.approx((y == 0).sum(), rel=0.2)
+        assert (weight[y_res.to_numpy() == 1] == 1).all()
+
+    def test_failure_windows_split_by_machine_and_gap(self, data):
+        _, y, groups, timestamps = data
+        positives, window = failure_windows(y, groups, timestamps)
+        assert len(positives) == 72 and window.max() == 2
+
+        # A missing reading inside a window starts a new one
+        y = y.copy()
+        y.iloc[100 - 12] = 0
+        _, window = failure_windows(y, groups, timestamps)
+        assert window.max() == 3
+
+    def test_window_oversampling_stays_inside_windows(self, data):
+        X, y, groups, timestamps = data
+        X_res, y_res, weight = window_oversample(X, y, groups=groups, timestamps=timestamps,
+                                                 sampling_strategy=0.3)
+        synthetic = X_res.iloc[len(X):]
+
+        assert weight is None
+        assert (y_res == 1).sum() == int(0.3 * (y == 0).sum())
+        pd.testing.assert_frame_equal(X_res.iloc[:len(X)], X.astype(np.float32))
+        # Interpolating within one machine's window never mixes machines
+        assert synthetic['machine_level'].isin([0.0, 100.0, 200.0]).all()
+
+    def test_approx_smote_interpolates_between_minority_rows(self, data):
+        X, y, _, _ = data
+        X_res, y_res, _ = approx_smote(X, y, sampling_strategy=0.5, chunk_rows=50)
+        synthetic = X_res.iloc[len(X):].to_numpy()
+        minority = X[y == 1].to_numpy(dtype=np.float32)
+
+        assert (y_res == 1).sum() == int(0.5 * (y == 0).sum())
+        assert (synthetic >= minority.min(axis=0) - 1e-4).all()
+        assert (synthetic <= minority.max(axis=0) + 1e-4).all()
+
+    @pytest.mark.parametrize('strategy', sorted(STRATEGIES))
+    def test_every_strategy_by_name(self, data, strategy):
+        X, y, groups, timestamps = data
+        X_res, y_res, weight = resample(strategy, X, y, groups=groups, timestamps=timestamps)
+        assert len(X_res) == len(y_res)
+        assert weight is None or len(weight) == len(y_res)
+        assert list(pd.DataFrame(X_res).columns) == list(X.columns)
+
+    @pytest.mark.parametrize('strategy', sorted(set(STRATEGIES) - {'smote'}))  # imblearn needs two classes
+    def test_split_without_positives(self, data, strategy):
+        """A training split with no failures is returned unchanged, unweighted"""
+        X, y, groups, timestamps = data
+        X_res, y_res, weight = resample(strategy, X, y * 0, groups=groups, timestamps=timestamps)
+        assert len(X_res) == len(X) and weight is None
+
+    def test_unknown_strategy(self, data):
+        with pytest.raises(ValueError):
+            resample('adasyn', *data[:2])
@@ -0,0 +1,77 @@
+"""
+Unit tests for the compact data schema
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.schema import optimize_dtypes, read_csv_compact, column_dtype, default_memory_mb
+
+
+class TestSchema:
+    """Test cases for dtype downcasting"""
+
+    def test_column_dtypes(self):
+        """Known columns map to their compact storage types"""
+        assert column_dtype('machine_id') == 'category'
+        assert column_dtype('hour') == 'int8'
+        assert column_dtype('failure_within_24h') == 'int8'
+        assert column_dtype('vibration_roll_mean_3') == 'float32'
+        assert column_dtype('timestamp') is None
+
+    def test_optimize_dtypes(self):
+        """Sensor/feature floats become float32, time parts int8, ids categorical"""
+        df = pd.DataFrame({
+            'machine_id': [1, 1, 2],
+            'vibration': [0.4, 0.5, 0.6],
+            'temperature_lag_1': [60.0, 61.0, 62.0],
+            'hour': [0, 1, 2],
+            'failure_within_24h': [0, 1, 0],
+        })
+        result = optimize_dtypes(df)
+
+        assert isinstance(result['machine_id'].dtype, pd.CategoricalDtype)
+        assert result['vibration'].dtype == np.float32
+        assert result['temperature_lag_1'].dtype == np.float32
+        assert result['hour'].dtype == np.int8
+        assert result['failure_within_24h'].dtype == np.int8
+
+    def test_integer_column_with_gaps_stays_float(self):
+        """Target columns with NaN are not forced to int8"""
+        df = pd.DataFrame({'failure': [0.0, np.nan, 1.0]})
+        assert optimize_dtypes(df)['failure'].dtype == np.float32
+
+    def test_read_csv_compact(self, tmp_path):
+        """CSV is read straight into the compact schema with numeric ids"""
+        path = tmp_path / 'sensors.csv'
+        pd.DataFrame({
+            'timestamp': ['2024-01-01 00:00:00', '2024-01-01 01:00:00'],
+            'machine_id': [10, 2],
+            'pressure': [100.5, np.nan],
+            'failure': [0, 1],
+        }).to_csv(path, index=False)
+
+        df = read_csv_compact(path)
+
+        assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+        assert list(df['machine_id'].cat.categories) == [2, 10]
+        assert df['pressure'].dtype == np.float32
+        assert df['failure'].dtype == np.int8
+
+    def test_default_memory_is_measured(self, tmp_path):
+        """The 'before' figure equals the frame read with default dtypes, string ids included"""
+        path = tmp_path / 'sensors.csv'
+        pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=300, freq='h').strftime('%Y-%m-%d %H:%M:%S'),
+            'machine_id': np.repeat(['MACHINE_0001', 'MACHINE_0002', 'MACHINE_0003'], 100),
+            'pressure': np.linspace(99, 101, 300),
+            'failure': 0,
+        }).to_csv(path, index=False)
+
+        plain = pd.read_csv(path, parse_dates=['timestamp'])
+        compact = read_csv_compact(path)
+
+        expected = plain.memory_usage(deep=True).sum() / 1024 ** 2
+        assert abs(default_memory_mb(compact) - expected) < 0.01 * expected
+        # 8 bytes per value would undercount the string ids
+        assert default_memory_mb(compact) > len(plain) * 8 * plain.shape[1] / 1024 ** 2
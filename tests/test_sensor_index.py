@@ -0,0 +1,109 @@
+"""
+Unit tests for the sensor CSV sidecar index
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import sensor_index
+from src.data_ingestion import read_sensor_csv, read_indexed, load_sensor_data
+from src.sensor_index import build_index, load_index, index_path
+from src.storage import filter_rows
+
+
+@pytest.fixture
+def sensor_csv(tmp_path):
+    """Hourly readings, partly out of order, with a few bad lines"""
+    rng = np.random.default_rng(4)
+    timestamps = pd.date_range('2024-03-01', periods=24 * 6, freq='h')
+    df = pd.DataFrame({
+        'timestamp': np.tile(timestamps.strftime('%Y-%m-%d %H:%M:%S'), 4),
+        'machine_id': np.repeat([4, 1, 3, 2], len(timestamps)),
+        'vibration': rng.normal(0.4, 0.05, 4 * len(timestamps)).round(3),
+        'temperature': rng.normal(65, 2, 4 * len(timestamps)).round(2),
+        'pressure': rng.normal(100, 1, 4 * len(timestamps)).round(2),
+        'failure': 0,
+    })
+    # Interleave one machine's rows with another's
+    df = pd.concat([df.iloc[:200], df.iloc[300:350], df.iloc[200:300], df.iloc[350:]])
+    lines = df.to_csv(index=False).splitlines()
+    lines.insert(10, '2024-03-01 09:30:00,4,0.4,65.0,100.0,0,extra')
+    lines.insert(400, 'not-a-time,1,0.4,65.0,100.0,0')
+    path = tmp_path / 'sensor_logs.csv'
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+class TestSensorIndex:
+    """Test cases for index builds and indexed reads"""
+
+    QUERIES = [
+        ([1], '2024-03-02 06:00', '2024-03-04'),
+        ([2, 4], None, '2024-03-02'),
+        (None, '2024-03-05 12:00', None),
+        ([3], '2024-03-03', '2024-03-03 05:00'),
+    ]
+
+    @pytest.mark.parametrize('use_arrow', [True, False])
+    @pytest.mark.parametrize('block_size', [97, 1 << 20])
+    def test_indexed_reads_match_full_load(self, sensor_csv, monkeypatch, block_size, use_arrow):
+        """Every query returns exactly the rows a full load would keep"""
+        monkeypatch.setattr(sensor_index, 'HAS_PYARROW', use_arrow and sensor_index.HAS_PYARROW)
+        index = build_index(sensor_csv, block_size=block_size)
+        full, _ = read_sensor_csv(sensor_csv)
+
+        assert index.n_rows == len(full) + 2
+        for machines, start, end in self.QUERIES:
+            result, _ = read_indexed(sensor_csv, index, machines, start, end)
+            expected = filter_rows(full, machines, start, end).reset_index(drop=True)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_index_reads_only_matching_runs(self, sensor_csv):
+        index = build_index(sensor_csv)
+        ranges, rows = index.ranges(machines=[3], start='2024-03-03', end='2024-03-04')
+
+        assert rows == 24
+        assert sum(last - first for first, last in ranges) < os.path.getsize(sensor_csv) / 20
+
+    def test_stale_index_is_ignored(self, sensor_csv):
+        build_index(sensor_csv)
+        assert load_index(sensor_csv) is not None
+
+        with open(sensor_csv, 'a') as f:
+            f.write('2024-03-07 00:00:00,1,0.4,65.0,100.0,0\n')
+        assert load_index(sensor_csv) is None
+
+    def test_load_sensor_data_builds_and_uses_index(self, sensor_csv):
+        # A plain full read does not pay for a second scan
+        load_sensor_data(sensor_csv)
+        assert not index_path(sensor_csv).exists()
+
+        full = load_sensor_data(sensor_csv, write_index=True)
+        assert index_path(sensor_csv).exists()
+
+        week = load_sensor_data(sensor_csv, machines=[2], start='2024-03-02', end='2024-03-03')
+        assert len(week) == 24
+        assert (week['machine_id'] == 2).all()
+        assert len(full) == 4 * 24 * 6
+
+    @pytest.mark.parametrize('use_arrow', [True, False])
+    def test_alphanumeric_machine_ids(self, sensor_csv, tmp_path, monkeypatch, use_arrow):
+        """Ids like 'M001' get their own runs and are queried by name"""
+        monkeypatch.setattr(sensor_index, 'HAS_PYARROW', use_arrow and sensor_index.HAS_PYARROW)
+        path = tmp_path / 'named.csv'
+        lines = sensor_csv.read_text().splitlines()
+        path.write_text('\n'.join(line.replace(',1,', ',M001,').replace(',2,', ',M002,') for line in lines) + '\n')
+
+        index = build_index(path, block_size=4096)
+        assert {'M001', 'M002', '3', '4'} <= set(index.machine_ids)
+
+        week = load_sensor_data(path, machines=['M002'], start='2024-03-02', end='2024-03-03')
+        assert len(week) == 24 and (week['machine_id'] == 'M002').all()
+        ranges, rows = index.ranges(machines=['M002', 'M404'])
+        assert rows == 24 * 6
+        # Numeric ids match however they are written
+        numeric = load_sensor_data(path, machines=[3.0], start='2024-03-02', end='2024-03-03')
+        assert len(numeric) == 24 and (numeric['machine_id'].astype(str) == '3').all()
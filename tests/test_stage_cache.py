@@ -0,0 +1,136 @@
+"""
+Unit tests for the pipeline stage cache
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src import stage_cache
+from src.stage_cache import StageCache
+
+
+def double_values(input_path, factor=2):
+    """Toy stage: read a CSV and scale it"""
+    double_values.calls += 1
+    return pd.read_csv(input_path) * factor
+
+
+double_values.calls = 0
+
+
+class TestStageCache:
+    """Test cases for StageCache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return StageCache(cache_dir=tmp_path / 'cache', max_bytes=10 * 1024 ** 2, enabled=True)
+
+    @pytest.fixture
+    def input_csv(self, tmp_path):
+        path = tmp_path / 'input.csv'
+        pd.DataFrame({'a': [1, 2, 3]}).to_csv(path, index=False)
+        return path
+
+    def test_hit_skips_stage(self, cache, input_csv):
+        """Second call with the same inputs loads from cache"""
+        double_values.calls = 0
+        params = {'input_path': str(input_csv)}
+        first = cache.cached('double', double_values, inputs=[input_csv], params=params)
+        second = cache.cached('double', double_values, inputs=[input_csv], params=params)
+
+        assert double_values.calls == 1
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_input_change_invalidates(self, cache, input_csv):
+        """Editing an input file changes the key"""
+        key_before = cache.key('double', inputs=[input_csv])
+        pd.DataFrame({'a': [4, 5, 6]}).to_csv(input_csv, index=False)
+        key_after = cache.key('double', inputs=[input_csv])
+        assert key_before != key_after
+
+    def test_param_change_invalidates(self, cache, input_csv):
+        """Different parameters, including DataFrames, give different keys"""
+        frame = pd.DataFrame({'x': [1.0, 2.0]})
+        assert cache.key('s', params={'factor': 2}) != cache.key('s', params={'factor': 3})
+        assert cache.key('s', params={'X': frame}) != cache.key('s', params={'X': frame * 2})
+
+    def test_lru_eviction(self, tmp_path):
+        """Least recently used entries are evicted beyond the size limit"""
+        cache = StageCache(cache_dir=tmp_path / 'cache', max_bytes=1, enabled=True)
+        cache.save('k1', 'first', np.zeros(1000))
+        cache.save('k2', 'second', np.zeros(1000))
+
+        assert 'k1' not in cache.index['entries']
+        assert 'k2' in cache.index['entries']
+        assert not (tmp_path / 'cache' / 'first-k1.joblib').exists()
+
+    def test_missing_output_forces_recompute(self, cache, input_csv, tmp_path):
+        """A hit requires the stage's output files to be unchanged"""
+        output = tmp_path / 'out.csv'
+
+        def write_stage(input_path):
+            write_stage.calls += 1
+            df = pd.read_csv(input_path)
+            df.to_csv(output, index=False)
+            return df
+
+        write_stage.calls = 0
+        params = {'input_path': str(input_csv)}
+        cache.cached('write', write_stage, inputs=[input_csv], params=params, outputs=[output])
+        output.unlink()
+        cache.cached('write', write_stage, inputs=[input_csv], params=params, outputs=[output])
+
+        assert write_stage.calls == 2
+
+    def test_helper_module_edit_invalidates(self, tmp_path, monkeypatch):
+        """Editing a module the stage imports, even indirectly, changes the key"""
+        package = tmp_path / 'src'
+        package.mkdir()
+        (package / 'stage.py').write_text('from .features import scale\n\n\ndef run(x):\n    return scale(x)\n')
+        (package / 'features.py').write_text('from src.maths import factor\n\n\ndef scale(x):\n    return x * factor()\n')
+        (package / 'maths.py').write_text('def factor():\n    return 2\n')
+        (package / 'unrelated.py').write_text('X = 1\n')
+        monkeypatch.setattr(stage_cache, 'PROJECT_ROOT', tmp_path)
+
+        # Compiled from its file without importing the package (the key only reads source files)
+        namespace = {}
+        exec(compile('def run(x):\n    return x\n', str(package / 'stage.py'), 'exec'), namespace)
+        run = namespace['run']
+
+        cache = StageCache(cache_dir=tmp_path / 'cache', enabled=True)
+        key = cache.key('scale', func=run)
+        (package / 'unrelated.py').write_text('X = 2\n')
+        assert cache.key('scale', func=run) == key
+
+        (package / 'maths.py').write_text('def factor():\n    return 3\n')
+        assert cache.key('scale', func=run) != key
+
+    def test_hit_reports_compute_time(self, cache, input_csv):
+        """timed=True returns the seconds measured on the miss, not the load time"""
+        import time
+
+        def slow_stage(input_path):
+            time.sleep(0.2)
+            return pd.read_csv(input_path)
+
+        params = {'input_path': str(input_csv)}
+        _, computed = cache.cached('slow', slow_stage, inputs=[input_csv], params=params, timed=True)
+        _, reported = cache.cached('slow', slow_stage, inputs=[input_csv], params=params, timed=True)
+
+        assert computed >= 0.2
+        assert reported == computed
+
+    def test_fitted_model_param_keys_on_its_state(self, cache):
+        """A refitted estimator changes the key even though its repr does not"""
+        from sklearn.linear_model import LogisticRegression
+
+        X = np.arange(20, dtype=float).reshape(-1, 1)
+        y = (X[:, 0] > 9).astype(int)
+        first = LogisticRegression().fit(X, y)
+        same = LogisticRegression().fit(X, y)
+        refit = LogisticRegression().fit(X, 1 - y)
+
+        assert repr(first) == repr(refit)
+        assert cache.key('shap', params={'model': first}) == cache.key('shap', params={'model': same})
+        assert cache.key('shap', params={'model': first}) != cache.key('shap', params={'model': refit})
@@ -0,0 +1,106 @@
+"""
+Unit tests for the partitioned Parquet storage layer
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import storage
+from src.schema import read_csv_compact
+from src.storage import read_dataset, write_dataset, resolve_source, parquet_path
+
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def sensor_df():
+    """Two months of hourly readings for three machines"""
+    rng = np.random.default_rng(5)
+    timestamps = pd.date_range('2024-01-25', '2024-02-05', freq='h')
+    frames = [
+        pd.DataFrame({
+            'timestamp': timestamps,
+            'machine_id': machine_id,
+            'vibration': rng.normal(0.4, 0.05, len(timestamps)),
+            'temperature': rng.normal(65, 2, len(timestamps)),
+            'failure': (rng.random(len(timestamps)) < 0.01).astype(int),
+        })
+        for machine_id in [3, 1, 2]
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestStorage:
+    """Test cases for Parquet round trips, pushdown and CSV fallback"""
+
+    def test_round_trip_matches_csv(self, sensor_df, tmp_path):
+        """Parquet and CSV reads give the same frame, layout and dtypes"""
+        path = tmp_path / 'clean_data.csv'
+        target = write_dataset(sensor_df, path)
+
+        assert target == parquet_path(path)
+        assert sorted(p.name for p in target.iterdir()) == ['month=2024-01', 'month=2024-02']
+        assert resolve_source(path)[0] == 'parquet'
+
+        expected = read_csv_compact(path).sort_values(['machine_id', 'timestamp'], kind='stable')
+        pd.testing.assert_frame_equal(
+            read_dataset(path), expected.reset_index(drop=True), check_exact=False
+        )
+
+    def test_projection_and_predicates(self, sensor_df, tmp_path):
+        """Columns, machines and [start, end) filters agree between both formats"""
+        path = tmp_path / 'clean_data.csv'
+        write_dataset(sensor_df, path)
+        query = dict(columns=['timestamp', 'vibration'], machines=[2, 3],
+                     start='2024-01-31 12:00', end='2024-02-02')
+
+        from_parquet = read_dataset(path, **query)
+        # CSV now newer, so the Parquet copy is stale
+        newer = os.path.getmtime(path) + 10
+        os.utime(path, (newer, newer))
+        assert resolve_source(path)[0] == 'csv'
+        from_csv = read_dataset(path, **query)
+
+        assert list(from_parquet.columns) == ['timestamp', 'vibration']
+        assert len(from_parquet) == 2 * 36
+        assert from_parquet['timestamp'].min() == pd.Timestamp('2024-01-31 12:00')
+        assert from_parquet['timestamp'].max() < pd.Timestamp('2024-02-02')
+        pd.testing.assert_frame_equal(from_parquet, from_csv, check_exact=False)
+
+    @pytest.mark.parametrize('source', ['parquet', 'csv'])
+    def test_streamed_batches_match_read(self, sensor_df, tmp_path, source):
+        """iter_dataset yields the read_dataset rows in bounded batches"""
+        path = tmp_path / 'clean_data.csv'
+        write_dataset(sensor_df, path)
+        if source == 'csv':
+            newer = os.path.getmtime(path) + 10
+            os.utime(path, (newer, newer))
+        # A sub-microsecond bound behaves like its ceiling on either source
+        query = dict(columns=['vibration', 'failure'], start='2024-01-31 12:00',
+                     end=pd.Timestamp('2024-02-02') + pd.Timedelta(1, 'ns'))
+
+        batches = list(storage.iter_dataset(path, batch_rows=100, **query))
+        streamed = pd.concat(batches, ignore_index=True)
+
+        assert max(len(batch) for batch in batches) <= 100
+        assert list(streamed.columns) == ['vibration', 'failure']
+        assert len(streamed) == 3 * 37
+        pd.testing.assert_series_equal(streamed['vibration'].sort_values(ignore_index=True),
+                                       read_dataset(path, **query)['vibration'].sort_values(ignore_index=True))
+
+    def test_csv_only_without_pyarrow(self, sensor_df, tmp_path, monkeypatch):
+        """Without pyarrow only the CSV is written and read"""
+        monkeypatch.setattr(storage, 'HAS_PYARROW', False)
+        path = tmp_path / 'model_ready_data.csv'
+
+        assert write_dataset(sensor_df, path) == path
+        assert not parquet_path(path).exists()
+        assert len(read_dataset(path, machines=[1])) == len(sensor_df) // 3
+
+    def test_missing_data(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            read_dataset(tmp_path / 'missing.csv')
@@ -0,0 +1,124 @@
+"""
+Unit tests for rolling-origin temporal CV on a memory-mapped matrix
+"""
+
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.temporal_cv import FeatureMatrix, FoldResultLog, cross_validate, rolling_origin_folds, stratified_kfolds
+
+
+@pytest.fixture
+def frame():
+    """Three machines with hourly readings, rows shuffled"""
+    rng = np.random.default_rng(0)
+    timestamps = np.repeat(pd.date_range('2024-01-01', periods=400, freq='h'), 3)
+    n = len(timestamps)
+    X = pd.DataFrame({
+        'temperature': rng.normal(70, 5, n),
+        'vibration': rng.normal(0.5, 0.1, n),
+        'hour': timestamps.hour,
+    })
+    y = pd.Series((X['temperature'] + rng.normal(0, 3, n) > 76).astype(int))
+    order = rng.permutation(n)
+    return X.iloc[order], y.iloc[order], pd.Series(timestamps[order], index=X.index[order])
+
+
+@pytest.fixture
+def matrix(frame, tmp_path):
+    return FeatureMatrix.create(tmp_path / 'matrix', *frame, chunk_rows=250)
+
+
+class TestTemporalCV:
+    """Test cases for the shared matrix, folds and resumable scoring"""
+
+    def test_matrix_is_time_sorted_float32_memmap(self, frame, matrix, tmp_path):
+        X, y, timestamps = frame
+        order = np.argsort(timestamps.to_numpy(), kind='stable')
+
+        assert isinstance(matrix.X, np.memmap) and matrix.X.dtype == np.float32
+        np.testing.assert_allclose(matrix.X, X.to_numpy()[order], rtol=1e-6)
+        np.testing.assert_array_equal(matrix.y, y.to_numpy()[order])
+        assert (np.diff(matrix.timestamps.astype('int64')) >= 0).all()
+        assert matrix.feature_names == ['temperature', 'vibration', 'hour']
+
+        # Workers receive the directory, not the data
+        assert len(pickle.dumps(matrix)) < 2000
+        again = FeatureMatrix.create(tmp_path / 'again', X, y, timestamps, chunk_rows=1000)
+        assert again.fingerprint == matrix.fingerprint
+
+    def test_open_or_create_rebuilds_stale_matrix(self, frame, matrix, tmp_path):
+        """A directory written from other inputs is rebuilt, not reused"""
+        X, y, timestamps = frame
+        reused = FeatureMatrix.open_or_create(tmp_path / 'matrix', X, y, timestamps)
+        assert reused.fingerprint == matrix.fingerprint
+
+        fewer = FeatureMatrix.open_or_create(tmp_path / 'matrix', X[['temperature', 'hour']], y, timestamps)
+        assert fewer.feature_names == ['temperature', 'hour'] and fewer.X.shape[1] == 2
+
+        shifted = X.assign(temperature=X['temperature'] + 1)
+        rebuilt = FeatureMatrix.open_or_create(tmp_path / 'matrix', shifted, y, timestamps)
+        assert rebuilt.fingerprint == FeatureMatrix.compute_fingerprint(shifted, y, timestamps)
+        assert rebuilt.fingerprint != matrix.fingerprint
+
+    def test_folds_roll_forward_with_gap(self, matrix):
+        timestamps = matrix.timestamps
+        folds = rolling_origin_folds(timestamps, n_folds=3, initial_fraction=0.4, gap='24h')
+
+        assert len(folds) == 3
+        assert folds[-1][3] == len(matrix)
+        for (_, train_end, test_start, test_end), nxt in zip(folds, folds[1:] + [None]):
+            # Test blocks start on a new timestamp and follow each other
+            assert timestamps[test_start] != timestamps[test_start - 1]
+            assert nxt is None or nxt[2] == test_end
+            # Training stops at least 24 hours before the test block
+            assert timestamps[test_start] - timestamps[train_end - 1] > np.timedelta64(24, 'h')
+        assert folds[0][1] < folds[1][1] < folds[2][1]
+
+        sliding = rolling_origin_folds(timestamps, n_folds=3, max_train_rows=100)
+        assert all(train_end - train_start == 100 for train_start, train_end, _, _ in sliding)
+
+    def test_scores_are_logged_and_resumed(self, matrix, tmp_path):
+        folds = rolling_origin_folds(matrix.timestamps, n_folds=2)
+        candidates = [{'max_depth': 2, 'n_estimators': 10}, {'max_depth': 4, 'n_estimators': 30}]
+        log_path = tmp_path / 'folds.jsonl'
+        base = {'random_state': 0, 'n_jobs': 1}
+
+        first = cross_validate(matrix, candidates, folds, log_path, base_params=base, n_jobs=2, verbose=False)
+        assert len(log_path.read_text().splitlines()) == 4
+        assert set(first.columns) >= {'mean_f1', 'std_f1', 'mean_aucpr', 'mean_recall'}
+        assert first['mean_f1'].is_monotonic_decreasing
+
+        # Simulate an interrupted write, then resume: only the lost fold is refitted
+        lines = log_path.read_text().splitlines()
+        log_path.write_text('\n'.join(lines[:3]) + '\n' + lines[3][:20])
+        resumed = cross_validate(matrix, candidates, folds, log_path, base_params=base, n_jobs=1, verbose=False)
+
+        assert len(FoldResultLog(log_path).results) == 4
+        assert len(log_path.read_text().splitlines()) == 4
+        pd.testing.assert_frame_equal(first.drop(columns='fit_seconds'), resumed.drop(columns='fit_seconds'))
+
+    def test_kfold_trials_resume_with_other_thread_counts(self, matrix, tmp_path):
+        folds = stratified_kfolds(matrix.y, n_splits=3)
+        np.testing.assert_array_equal(np.sort(np.concatenate([test for _, test in folds])), np.arange(len(matrix.y)))
+
+        candidates = [{'max_depth': 2, 'n_estimators': 10}, {'max_depth': 3, 'n_estimators': 20}]
+        log_path = tmp_path / 'kfold.jsonl'
+        base = {'random_state': 0}
+        first = cross_validate(matrix, candidates, folds, log_path, base_params=base, threads_per_trial=1,
+                               verbose=False)
+        records = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert len(records) == 6
+        assert all(r['params']['n_jobs'] == 1 and r['fit_seconds'] > 0 and r['score_seconds'] > 0 for r in records)
+
+        # Lose two trials, resume with more threads per trial: only those two are fitted
+        log_path.write_text('\n'.join(log_path.read_text().splitlines()[:4]) + '\n')
+        resumed = cross_validate(matrix, candidates, folds, log_path, base_params=base, threads_per_trial=2,
+                                 verbose=False)
+        records = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert [r['params']['n_jobs'] for r in records] == [1, 1, 1, 1, 2, 2]
+        pd.testing.assert_frame_equal(first.drop(columns='fit_seconds'), resumed.drop(columns='fit_seconds'))
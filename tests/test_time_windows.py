@@ -0,0 +1,137 @@
+"""
+Unit tests for time-based rolling windows
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.time_windows import compute_window_bounds, time_rolling_statistics, OnlineTimeWindows
+from src.feature_engineering import create_rolling_statistics
+
+
+@pytest.fixture
+def irregular_data():
+    """Two machines with dropped samples and mixed sampling rates"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for machine_id in [1, 2]:
+        offsets = np.cumsum(rng.choice([10, 30, 60, 150], size=60))
+        frames.append(pd.DataFrame({
+            'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(offsets, unit='min'),
+            'machine_id': machine_id,
+            'vibration': rng.normal(0.4, 0.05, size=60),
+            'temperature': rng.normal(65, 2, size=60),
+        }))
+    return pd.concat(frames).sort_values(['machine_id', 'timestamp']).reset_index(drop=True)
+
+
+class TestTimeWindows:
+    """Test cases for batch and online time windows"""
+
+    def test_bounds_stay_within_machine(self, irregular_data):
+        """Windows never reach into the previous machine's rows"""
+        bounds = compute_window_bounds(
+            irregular_data['timestamp'], irregular_data['machine_id'], [8]
+        )
+        start, end = bounds[8]
+        first_row_m2 = irregular_data.index[irregular_data['machine_id'] == 2][0]
+        assert start[first_row_m2] == first_row_m2
+        assert (end - start >= 1).all()
+
+    def test_matches_pandas_offset_windows(self, irregular_data):
+        """Batch statistics equal pandas' per-machine '4h' rolling"""
+        features = time_rolling_statistics(irregular_data, ['vibration'], windows=[4])
+        expected = (
+            irregular_data.set_index('timestamp')
+            .groupby('machine_id')['vibration']
+            .rolling('4h', min_periods=1)
+        )
+        for stat in ['mean', 'std', 'max', 'min']:
+            np.testing.assert_allclose(
+                features[f'vibration_rolling_{stat}_4h'],
+                getattr(expected, stat)().to_numpy(),
+                equal_nan=True
+            )
+
+    def test_regular_hourly_data_matches_row_windows(self):
+        """On hourly data, time windows reproduce the old row-count windows"""
+        df = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=24, freq='h'),
+            'machine_id': 1,
+            'pressure': np.arange(24, dtype=float) ** 1.5,
+        })
+        result = create_rolling_statistics(df, ['pressure'], windows=[4])
+        expected = df['pressure'].rolling(window=4, min_periods=1).mean()
+        np.testing.assert_allclose(result['pressure_rolling_mean_4h'], expected)
+
+    def test_online_matches_batch(self, irregular_data):
+        """Incremental updates produce the same values as the batch sweep"""
+        columns = ['vibration', 'temperature']
+        batch = time_rolling_statistics(irregular_data, columns, windows=[1, 4])
+        online = OnlineTimeWindows(columns, windows=[1, 4])
+
+        for i, row in enumerate(irregular_data.itertuples(index=False)):
+            features = online.update(row.machine_id, row.timestamp, row._asdict())
+            for name, value in features.items():
+                np.testing.assert_allclose(value, batch[name][i], equal_nan=True)
+
+    def test_online_scores_late_readings_without_inserting(self):
+        """A reading older than the last one is scored on the current windows and not added"""
+        online = OnlineTimeWindows(['vibration'], windows=[1])
+        online.update('M001', '2024-01-01 10:00:00', {'vibration': 0.4})
+        current = online.update('M001', '2024-01-01 10:30:00', {'vibration': 0.6})
+
+        late = online.update('M001', '2024-01-01 09:00:00', {'vibration': 9.0})
+        assert late == current
+        assert online.late_readings == 1
+        following = online.update('M001', '2024-01-01 10:45:00', {'vibration': 0.8})
+        assert following['vibration_rolling_max_1h'] == 0.8
+        assert following['vibration_rolling_mean_1h'] == pytest.approx(0.6)
+
+    def test_online_ignores_retried_readings(self):
+        """A reading repeated with the same machine and timestamp is counted once"""
+        online = OnlineTimeWindows(['vibration'], windows=[1])
+        online.update('M001', '2024-01-01 10:00:00', {'vibration': 0.4})
+        first = online.update('M001', '2024-01-01 10:30:00', {'vibration': 0.6})
+
+        retry = online.update('M001', '2024-01-01 10:30:00', {'vibration': 0.6})
+        assert retry == first
+        assert online.duplicate_readings == 1 and online.late_readings == 0
+        assert online.update('M001', '2024-01-01 10:45:00', {'vibration': 0.8})[
+            'vibration_rolling_mean_1h'] == pytest.approx(0.6)
+
+    def test_online_concurrent_updates(self):
+        """Threads updating shared machines lose no readings"""
+        online = OnlineTimeWindows(['vibration'], windows=[8])
+        start = pd.Timestamp('2024-01-01')
+
+        def feed(machine):
+            for minute in range(200):
+                online.update(machine, start + pd.Timedelta(minutes=minute), {'vibration': 1.0})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(feed, ['M001', 'M002'] * 4))
+
+        # Four threads per machine send each reading: it lands exactly once, repeats are only scored
+        for machine in ('M001', 'M002'):
+            timestamps = [ts for ts, _ in online.machines[machine].readings]
+            assert timestamps == sorted(set(timestamps))
+        total = sum(online.machines[m].states[('vibration', 8)].count for m in ('M001', 'M002'))
+        assert total == 400
+        assert total + online.late_readings + online.duplicate_readings == 1600
+
+    def test_online_drops_idle_machines(self):
+        """Machines silent for longer than the largest window are forgotten"""
+        online = OnlineTimeWindows(['vibration'], windows=[1, 4])
+        online.update('M001', '2024-01-01 00:00:00', {'vibration': 0.4})
+        online.update('M002', '2024-01-01 03:00:00', {'vibration': 0.4})
+        assert set(online.machines) == {'M001', 'M002'}
+
+        online.update('M002', '2024-01-01 05:00:00', {'vibration': 0.5})
+        assert set(online.machines) == {'M002'}
+        # A returning machine starts with empty windows, as it would have anyway
+        features = online.update('M001', '2024-01-01 05:30:00', {'vibration': 0.7})
+        assert features['vibration_rolling_mean_4h'] == 0.7
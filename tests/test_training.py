@@ -0,0 +1,118 @@
+"""
+Unit tests for the shared training library
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import training
+from src.training import TrainTestData, feature_columns, json_safe, prepare_data, save_model
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    """Small modeling-ready CSV with two label horizons, rows out of time order"""
+    rng = np.random.default_rng(0)
+    timestamps = np.repeat(pd.date_range('2024-01-01', periods=200, freq='h'), 2)
+    n = len(timestamps)
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'machine_id': np.tile(['M_001', 'M_002'], 200),
+        'temperature': rng.normal(70, 5, n),
+        'vibration': rng.normal(0.5, 0.1, n),
+        'failure': rng.integers(0, 2, n),
+        'failure_within_12h': rng.integers(0, 2, n),
+        'failure_within_24h': (rng.random(n) < 0.2).astype(int),
+    }).sample(frac=1, random_state=0)
+    path = tmp_path / 'model_ready_data.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+class TestTraining:
+    """Test cases for data preparation, evaluation and saving"""
+
+    def test_feature_columns_exclude_every_label(self, data_path):
+        df = pd.read_csv(data_path)
+        assert feature_columns(df) == ['temperature', 'vibration']
+
+    def test_prepared_split_is_cached_and_time_ordered(self, data_path, tmp_path, monkeypatch):
+        cache_dir = tmp_path / 'matrices'
+        data = prepare_data(data_path, cache_dir=cache_dir)
+
+        assert isinstance(data, TrainTestData)
+        assert isinstance(data.train.X, np.memmap) and data.train.X.dtype == np.float32
+        assert len(data.train) + len(data.test) == 400
+        assert data.t_train.max() < data.t_test.min()
+        assert data.X_train.columns.tolist() == ['temperature', 'vibration']
+        assert sorted(data.train.meta['group_names']) == ['M_001', 'M_002']
+        assert set(np.unique(data.train.groups)) == {0, 1}
+        assert data.scale_pos_weight == pytest.approx((data.y_train == 0).sum() / (data.y_train == 1).sum())
+
+        # A second call maps the cached matrices without reading the dataset
+        def fail(*args, **kwargs):
+            raise AssertionError("dataset read again")
+        monkeypatch.setattr(training, 'load_model_data', fail)
+        again = prepare_data(data_path, cache_dir=cache_dir)
+        assert again.directory == data.directory
+        pd.testing.assert_frame_equal(again.X_test, data.X_test)
+
+        # A different split setting is cached separately
+        monkeypatch.undo()
+        other = prepare_data(data_path, train_fraction=0.5, cache_dir=cache_dir)
+        assert other.directory != data.directory
+        assert len(list(cache_dir.iterdir())) == 2
+
+    def test_save_model_writes_json_safe_metadata(self, data_path, tmp_path):
+        from sklearn.linear_model import LogisticRegression
+
+        data = prepare_data(data_path, cache_dir=tmp_path / 'matrices')
+        model = LogisticRegression().fit(data.X_train, data.y_train)
+        metrics = training.evaluate(model, data.X_test, data.y_test)
+        assert set(metrics) == {'f1_score', 'recall', 'precision', 'report'}
+
+        best_params = {'max_depth': np.int64(5), 'learning_rate': np.float64(0.1), 'weights': np.ones(2)}
+        assert json_safe(best_params) == {'max_depth': 5, 'learning_rate': 0.1, 'weights': [1.0, 1.0]}
+
+        models_dir = tmp_path / 'models'
+        save_model(model, data.feature_cols, metrics, models_dir=models_dir, metadata={'best_params': best_params})
+        metadata = json.loads((models_dir / 'model_metadata.json').read_text())
+        assert metadata['best_params']['max_depth'] == 5
+        assert metadata['feature_count'] == 2
+        assert (models_dir / 'xgboost_best.pkl').exists()
+        assert (models_dir / 'feature_names.pkl').exists()
+
+
+class TestImbalanceHandling:
+    """Test cases for the random forest imbalance script"""
+
+    def test_resample_split_uses_the_shared_strategies(self, data_path, tmp_path, monkeypatch):
+        """'smote' goes through resampling.smote, errors included, not a silent fallback"""
+        from src import imbalance_handling
+        from src.resampling import STRATEGIES
+
+        data = prepare_data(data_path, cache_dir=tmp_path / 'matrices')
+        calls = []
+
+        def smote(X, y, **kwargs):
+            calls.append(len(y))
+            raise ValueError("not enough minority samples")
+
+        monkeypatch.setitem(STRATEGIES, 'smote', smote)
+        with pytest.raises(ValueError):
+            imbalance_handling.resample_split(str(data.directory), strategy='smote')
+        assert calls == [len(data.y_train)]
+
+    def test_sample_weights_replace_class_weight(self, data_path, tmp_path):
+        """Downsampling weights are not multiplied with class_weight='balanced'"""
+        from src.imbalance_handling import resample_split, train_random_forest
+
+        data = prepare_data(data_path, cache_dir=tmp_path / 'matrices')
+        X, y, weight = resample_split(str(data.directory), strategy='downsample')
+        assert weight is not None
+
+        assert train_random_forest(X, y, sample_weight=weight).class_weight is None
+        assert train_random_forest(X, y).class_weight == 'balanced'
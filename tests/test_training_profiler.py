@@ -0,0 +1,87 @@
+"""
+Unit tests for the per-phase training profiler
+"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from src import training_profiler
+from src.training_profiler import PROFILES_LOG, TrainingProfiler, profile_path, profile_phase
+
+
+def busy(seconds):
+    total = 0
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        total += 1
+    return total
+
+
+class TestTrainingProfiler:
+    """Test cases for phase records, memory peaks and saved reports"""
+
+    def test_nested_phases_record_time(self):
+        with TrainingProfiler('test') as profiler:
+            with profile_phase('tune'):
+                with profile_phase('cv_fit'):
+                    busy(0.05)
+                with profile_phase('refit_best'):
+                    pass
+
+        phases = {record['phase']: record for record in profiler.phases}
+        assert list(phases) == ['tune', 'tune/cv_fit', 'tune/refit_best']
+        assert phases['tune']['depth'] == 0 and phases['tune/cv_fit']['depth'] == 1
+        assert phases['tune/cv_fit']['cpu_seconds'] >= 0.04
+        assert phases['tune']['wall_seconds'] >= phases['tune/cv_fit']['wall_seconds']
+        assert not any(record['failed'] for record in profiler.phases)
+        assert profiler.status == 'ok'
+
+    def test_peak_rss_sees_a_freed_allocation(self):
+        with TrainingProfiler('test', sample_interval=0.01) as profiler:
+            with profile_phase('allocate'):
+                block = np.ones(64 * 1024 ** 2 // 8)
+                busy(0.05)
+                del block
+
+        record = profiler.phases[0]
+        assert record['peak_rss_mb'] >= record['rss_end_mb'] + 48
+
+    def test_failed_run_is_still_saved(self, tmp_path):
+        with pytest.raises(ValueError):
+            with TrainingProfiler('test', models_dir=tmp_path):
+                with profile_phase('fit'):
+                    raise ValueError('diverged')
+
+        report = json.loads(profile_path(tmp_path, 'test').read_text())
+        assert report['status'] == 'failed: ValueError'
+        assert report['phases'][0]['phase'] == 'fit' and report['phases'][0]['failed']
+
+    def test_phases_without_profiler_are_ignored(self):
+        assert training_profiler._active is None
+        with profile_phase('prepare_data'):
+            pass
+        with TrainingProfiler('test'):
+            pass
+        assert training_profiler._active is None
+
+    def test_profiles_accumulate_per_model_version(self, tmp_path):
+        for version in ('20240101_000000', '20240102_000000'):
+            with TrainingProfiler('xgboost_tuning', models_dir=tmp_path) as profiler:
+                with profile_phase('tune'):
+                    pass
+                profiler.model_version = version
+
+        history = [json.loads(line) for line in (tmp_path / PROFILES_LOG).read_text().splitlines()]
+        assert [report['model_version'] for report in history] == ['20240101_000000', '20240102_000000']
+        latest = json.loads(profile_path(tmp_path, 'xgboost_tuning').read_text())
+        assert latest['model_version'] == '20240102_000000'
+        assert latest['phases'][0]['phase'] == 'tune'
+
+        # Each model version keeps its own profile, not overwritten by the next run
+        first = profile_path(tmp_path, 'xgboost_tuning', '20240101_000000')
+        assert first.name == 'training_profile_xgboost_tuning_v20240101_000000.json'
+        assert json.loads(first.read_text())['model_version'] == '20240101_000000'
+        assert profiler.save() == profile_path(tmp_path, 'xgboost_tuning', '20240102_000000')
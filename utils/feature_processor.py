@@ -3,10 +3,22 @@ FactoryGuard AI - Feature Processor for Real-time Predictions
 Handles feature engineering for single prediction requests
 """
 
+import re
+
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+try:
+    # The serving app and scripts put src/ on sys.path and import its modules by
+    # that name; using it here too keeps one copy of the module per process
+    from time_windows import OnlineTimeWindows
+except ImportError:  # imported from the project root (tests)
+    from src.time_windows import OnlineTimeWindows
+
+
+ROLLING_FEATURE_PATTERN = re.compile(r'^(\w+)_rolling_(mean|std|max|min)_(\d+)h$')
+
 
 class FeatureProcessor:
     """
@@ -24,6 +36,17 @@ class FeatureProcessor:
         self.feature_names = feature_names
         self.sensor_cols = ['vibration', 'temperature', 'pressure']
         
+        # Time-based rolling features are tracked per machine across requests
+        rolling_windows = sorted({
+            int(match.group(3))
+            for match in map(ROLLING_FEATURE_PATTERN.match, feature_names)
+            if match
+        })
+        self.rolling_windows = (
+            OnlineTimeWindows(self.sensor_cols, windows=rolling_windows)
+            if rolling_windows else None
+        )
+        
     def create_time_features(self, timestamp):
         """
         Extract time-based features from timestamp
@@ -83,6 +106,14 @@ class FeatureProcessor:
                 # Use current value as default
                 features[f'{col}_roll_mean_{window}'] = sensor_data[col]
         
+        # Add time-based rolling statistics from this machine's recent readings
+        if self.rolling_windows is not None:
+            features.update(self.rolling_windows.update(
+                sensor_data['machine_id'],
+                sensor_data['timestamp'],
+                sensor_data
+            ))
+        
         # Create DataFrame with all features
         df = pd.DataFrame([features])
         